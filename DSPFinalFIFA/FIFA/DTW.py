@@ -1,12 +1,25 @@
 """
 DTW (Dynamic Time Warping) Similarity Search for FIFA World Cup 2022 Sequences
-Finds similar sequences based on temporal/spatial patterns using FastDTW algorithm
+Finds similar sequences based on temporal/spatial patterns using an exact
+vectorized DTW engine (default) or the FastDTW approximation
 """
+import atexit
+import heapq
+import itertools
 import math
+import multiprocessing
+import os
+import threading
 import numpy as np
-from typing import List, Dict, Tuple, Optional, Any
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Any, Callable, Union
 from pathlib import Path
 import json
+from .ingest import IndexBuilder, MatchSequences, run_ingest
+from .topk import BoundedHeap
 
 # FastDTW for efficient DTW computation (REQUIRED)
 try:
@@ -25,6 +38,20 @@ TOP_N = 10                      # Default number of results to return
 NEAR_BALL_RADIUS = 15           # meters - players within this distance of ball
 MAX_DISTANCE = 150              # Maximum possible distance for normalization
 
+# DTW backend: 'exact' builds the full cost matrix with NumPy and runs the exact
+# DP recurrence; 'fastdtw' uses the FastDTW approximation with a Python callback
+DTW_BACKENDS = ('exact', 'fastdtw')
+DTW_BACKEND = 'exact'
+
+# Skip candidates whose lower bound already exceeds the current k-th best
+# distance, and abandon DTW once its running cost does (results unchanged)
+DTW_PRUNING = True
+
+# Parallel search: a persistent process pool scores index partitions that it
+# reads from shared memory. Smaller scans stay in the request thread.
+DTW_WORKERS = None                  # None = os.cpu_count()
+PARALLEL_MIN_SEQUENCES = 2000       # Fall back to in-process scanning below this
+
 # Feature weights (equal by default, tune as needed)
 WEIGHTS = {
     'ball_position': 1.0,
@@ -253,6 +280,140 @@ def extract_sequence_features(sequence: Dict) -> List[Dict[str, Any]]:
     return [extract_event_features(event) for event in events]
 
 
+# =============================================================================
+# NUMERIC FEATURE ENCODING (for the exact vectorized engine)
+# =============================================================================
+class _PenaltyCodebook:
+    """
+    Maps categorical feature values to small ints and caches the pairwise
+    penalty matrix, so a penalty lookup becomes matrix[code1, code2].
+    Unseen values get new codes on demand; the matrix is rebuilt lazily.
+    """
+
+    def __init__(self, penalty_func: Callable[[str, str], float], seed_values: List[str]):
+        self._penalty_func = penalty_func
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        for value in [''] + list(seed_values):
+            self.encode(value)
+
+    def encode(self, value: Optional[str]) -> int:
+        """Return the code for a value, registering it if unseen."""
+        value = value or ''
+        code = self._codes.get(value)
+        if code is not None:
+            return code
+        with self._lock:
+            if value not in self._codes:
+                self._codes[value] = len(self._values)
+                self._values.append(value)
+                self._matrix = None
+            return self._codes[value]
+
+    def decode(self, code: int) -> str:
+        """Return the value registered under a code."""
+        return self._values[code]
+
+    def snapshot(self) -> List[str]:
+        """Registered values in code order (to share codes with workers)."""
+        return list(self._values)
+
+    def restore(self, values: List[str]) -> None:
+        """Adopt another process's codes; the matrix is rebuilt if they changed."""
+        with self._lock:
+            if values == self._values:
+                return
+            self._values = list(values)
+            self._codes = {value: code for code, value in enumerate(self._values)}
+            self._matrix = None
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Penalty matrix indexed by codes (rebuilt when new values appear)."""
+        matrix = self._matrix
+        if matrix is None:
+            with self._lock:
+                values = list(self._values)
+                matrix = np.array(
+                    [[self._penalty_func(a, b) for b in values] for a in values],
+                    dtype=np.float64
+                )
+                self._matrix = matrix
+        return matrix
+
+
+_EVENT_TYPE_CODES = _PenaltyCodebook(event_type_penalty, EVENT_TYPES)
+_OPTIONAL_CODEBOOKS = {
+    'pass_type': _PenaltyCodebook(pass_type_penalty, PASS_TYPES),
+    'shot_type': _PenaltyCodebook(shot_type_penalty, []),
+    'pressure_type': _PenaltyCodebook(pressure_type_penalty, PRESSURE_TYPES),
+}
+
+
+@dataclass
+class SequenceArrays:
+    """Numeric features of one sequence, laid out for broadcasting."""
+    ball: np.ndarray            # (n, 2) ball x/y
+    event_type: np.ndarray      # (n,) event type codes
+    pass_type: np.ndarray       # (n,) pass type codes
+    shot_type: np.ndarray       # (n,) shot type codes
+    pressure_type: np.ndarray   # (n,) pressure type codes
+    near_players: np.ndarray    # (n, P, 2) near-ball players, zero padded
+    near_counts: np.ndarray     # (n,) valid rows in near_players
+
+    def __len__(self) -> int:
+        return len(self.event_type)
+
+
+def encode_sequence_features(features: List[Dict[str, Any]]) -> SequenceArrays:
+    """Convert per-event feature dicts into a SequenceArrays block."""
+    n = len(features)
+    max_near = max((len(f['near_players']) for f in features), default=0)
+
+    near_players = np.zeros((n, max_near, 2), dtype=np.float64)
+    near_counts = np.zeros(n, dtype=np.int32)
+    for i, f in enumerate(features):
+        players = f['near_players']
+        if players:
+            near_players[i, :len(players)] = players
+            near_counts[i] = len(players)
+
+    return SequenceArrays(
+        ball=np.array([f['ball_position'] for f in features], dtype=np.float64).reshape(n, 2),
+        event_type=np.array([_EVENT_TYPE_CODES.encode(f['event_type']) for f in features], dtype=np.int32),
+        pass_type=np.array([_OPTIONAL_CODEBOOKS['pass_type'].encode(f['pass_type']) for f in features], dtype=np.int32),
+        shot_type=np.array([_OPTIONAL_CODEBOOKS['shot_type'].encode(f['shot_type']) for f in features], dtype=np.int32),
+        pressure_type=np.array([_OPTIONAL_CODEBOOKS['pressure_type'].encode(f['pressure_type']) for f in features], dtype=np.int32),
+        near_players=near_players,
+        near_counts=near_counts
+    )
+
+
+def decode_sequence_arrays(arrays: SequenceArrays) -> List[Dict[str, Any]]:
+    """Rebuild per-event feature dicts from numeric arrays (fastdtw backend)."""
+    features = []
+    for i in range(len(arrays)):
+        count = int(arrays.near_counts[i])
+        features.append({
+            'ball_position': (float(arrays.ball[i, 0]), float(arrays.ball[i, 1])),
+            'event_type': _EVENT_TYPE_CODES.decode(int(arrays.event_type[i])),
+            'near_players': [(float(x), float(y)) for x, y in arrays.near_players[i, :count]],
+            'pass_type': _OPTIONAL_CODEBOOKS['pass_type'].decode(int(arrays.pass_type[i])),
+            'shot_type': _OPTIONAL_CODEBOOKS['shot_type'].decode(int(arrays.shot_type[i])),
+            'pressure_type': _OPTIONAL_CODEBOOKS['pressure_type'].decode(int(arrays.pressure_type[i]))
+        })
+    return features
+
+
+def _as_sequence_arrays(features: Union[SequenceArrays, List[Dict[str, Any]]]) -> SequenceArrays:
+    """Accept either encoded arrays or feature dicts."""
+    if isinstance(features, SequenceArrays):
+        return features
+    return encode_sequence_features(features)
+
+
 # =============================================================================
 # DISTANCE FUNCTIONS
 # =============================================================================
@@ -335,19 +496,183 @@ def event_distance(features1: Dict[str, Any], features2: Dict[str, Any],
     return total_distance
 
 
+def _formation_cost_matrix(a: SequenceArrays, b: SequenceArrays) -> np.ndarray:
+    """Vectorized player_formation_distance for every (i, j) event pair."""
+    n, m = len(a), len(b)
+    a_empty = a.near_counts == 0
+    b_empty = b.near_counts == 0
+
+    # One side without near players = moderate penalty, both empty = 0
+    cost = np.where(a_empty[:, None] ^ b_empty[None, :], 10.0, 0.0)
+
+    pa, pb = a.near_players.shape[1], b.near_players.shape[1]
+    if pa == 0 or pb == 0:
+        return cost
+
+    # (n, m, pa, pb) pairwise player distances
+    diff = a.near_players[:, None, :, None, :] - b.near_players[None, :, None, :, :]
+    dist = np.sqrt((diff ** 2).sum(axis=-1))
+
+    a_mask = np.arange(pa)[None, :] < a.near_counts[:, None]   # (n, pa)
+    b_mask = np.arange(pb)[None, :] < b.near_counts[:, None]   # (m, pb)
+
+    # Average nearest-neighbor distance a -> b
+    forward = np.where(b_mask[None, :, None, :], dist, np.inf).min(axis=3)
+    forward = np.where(a_mask[:, None, :], forward, 0.0).sum(axis=2)
+    forward /= np.maximum(a.near_counts, 1)[:, None]
+
+    # Average nearest-neighbor distance b -> a
+    reverse = np.where(a_mask[:, None, :, None], dist, np.inf).min(axis=2)
+    reverse = np.where(b_mask[None, :, :], reverse, 0.0).sum(axis=2)
+    reverse /= np.maximum(b.near_counts, 1)[None, :]
+
+    both = ~a_empty[:, None] & ~b_empty[None, :]
+    return np.where(both, (forward + reverse) / 2, cost)
+
+
+def cost_matrix(a: SequenceArrays, b: SequenceArrays,
+                config: Optional[Dict] = None) -> np.ndarray:
+    """
+    Build the full (len(a), len(b)) matrix of event_distance values
+    in one broadcast instead of one Python call per cell.
+    """
+    if config is None:
+        config = OPTIONAL_FEATURES
+
+    # 1. Ball position distance (Euclidean)
+    diff = a.ball[:, None, :] - b.ball[None, :, :]
+    cost = WEIGHTS['ball_position'] * np.sqrt((diff ** 2).sum(axis=-1))
+
+    # 2. Event type penalty (matrix lookup)
+    cost += WEIGHTS['event_type'] * _EVENT_TYPE_CODES.matrix[a.event_type[:, None], b.event_type[None, :]]
+
+    # 3. Player formation distance
+    cost += WEIGHTS['player_formation'] * _formation_cost_matrix(a, b)
+
+    # 4-6. Optional categorical penalties
+    for feature, codebook in _OPTIONAL_CODEBOOKS.items():
+        if config.get(feature, False):
+            codes1 = getattr(a, feature)
+            codes2 = getattr(b, feature)
+            cost += WEIGHTS[feature] * codebook.matrix[codes1[:, None], codes2[None, :]]
+
+    return cost
+
+
 # =============================================================================
 # DTW CORE
 # =============================================================================
-def dtw_distance(seq1_features: List[Dict], seq2_features: List[Dict],
-                 config: Optional[Dict] = None) -> Tuple[float, List]:
+def _accumulate_cost(cost: np.ndarray, max_distance: Optional[float] = None) -> Optional[np.ndarray]:
     """
-    Calculate DTW distance between two sequences of event features using FastDTW.
+    Exact DTW recurrence acc[i, j] = cost[i, j] + min(up, left, diagonal),
+    vectorized per row: the left-to-right dependency is a min-plus scan,
+    solved with a prefix sum and np.minimum.accumulate.
+
+    Every warping path crosses every row and costs are non-negative, so once
+    a whole row exceeds max_distance the final distance will too: returns None.
+    """
+    n, m = cost.shape
+    acc = np.empty((n, m), dtype=np.float64)
+    acc[0] = np.cumsum(cost[0])
+    if max_distance is not None and acc[0, 0] > max_distance:
+        return None
+
+    step = np.empty(m, dtype=np.float64)
+    for i in range(1, n):
+        prev = acc[i - 1]
+        step[0] = prev[0]
+        np.minimum(prev[1:], prev[:-1], out=step[1:])
+        from_above = cost[i] + step
+        prefix = np.cumsum(cost[i])
+        acc[i] = np.minimum.accumulate(from_above - prefix) + prefix
+        if max_distance is not None and acc[i].min() > max_distance:
+            return None
+
+    return acc
+
+
+def _backtrack_path(acc: np.ndarray) -> List[Tuple[int, int]]:
+    """Recover the optimal warping path from an accumulated cost matrix."""
+    i, j = acc.shape[0] - 1, acc.shape[1] - 1
+    path = [(i, j)]
+    while i > 0 or j > 0:
+        if i == 0:
+            j -= 1
+        elif j == 0:
+            i -= 1
+        else:
+            diagonal, up, left = acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1]
+            if diagonal <= up and diagonal <= left:
+                i, j = i - 1, j - 1
+            elif up <= left:
+                i -= 1
+            else:
+                j -= 1
+        path.append((i, j))
+    path.reverse()
+    return path
+
+
+def exact_dtw_distance(seq1: SequenceArrays, seq2: SequenceArrays,
+                       config: Optional[Dict] = None,
+                       max_distance: Optional[float] = None,
+                       with_path: bool = True) -> Tuple[float, List]:
+    """
+    Exact DTW over numeric sequence features.
+    Abandons early with (inf, []) once the distance must exceed max_distance.
+    with_path=False skips the backtrack and returns an empty path.
 
     Returns: (total_distance, alignment_path)
     """
-    if not seq1_features or not seq2_features:
+    if len(seq1) == 0 or len(seq2) == 0:
         return (float('inf'), [])
 
+    acc = _accumulate_cost(cost_matrix(seq1, seq2, config), max_distance)
+    if acc is None or (max_distance is not None and acc[-1, -1] > max_distance):
+        return (float('inf'), [])
+    return (float(acc[-1, -1]), _backtrack_path(acc) if with_path else [])
+
+
+def dtw_distance(seq1_features: Union[SequenceArrays, List[Dict]],
+                 seq2_features: Union[SequenceArrays, List[Dict]],
+                 config: Optional[Dict] = None,
+                 backend: Optional[str] = None,
+                 max_distance: Optional[float] = None,
+                 with_path: bool = True) -> Tuple[float, List]:
+    """
+    Calculate DTW distance between two sequences of event features.
+    Uses the backend selected by DTW_BACKEND unless one is given.
+    max_distance enables early abandoning and with_path=False skips the
+    path backtrack (exact backend only; fastdtw always returns its path).
+
+    Returns: (total_distance, alignment_path)
+    """
+    if len(seq1_features) == 0 or len(seq2_features) == 0:
+        return (float('inf'), [])
+
+    if (backend or DTW_BACKEND) == 'fastdtw':
+        if isinstance(seq1_features, SequenceArrays):
+            seq1_features = decode_sequence_arrays(seq1_features)
+        if isinstance(seq2_features, SequenceArrays):
+            seq2_features = decode_sequence_arrays(seq2_features)
+        return _fastdtw_distance(seq1_features, seq2_features, config)
+
+    return exact_dtw_distance(
+        _as_sequence_arrays(seq1_features),
+        _as_sequence_arrays(seq2_features),
+        config,
+        max_distance,
+        with_path
+    )
+
+
+def _fastdtw_distance(seq1_features: List[Dict], seq2_features: List[Dict],
+                      config: Optional[Dict] = None) -> Tuple[float, List]:
+    """
+    Calculate DTW distance between two sequences of event features using FastDTW.
+
+    Returns: (total_distance, alignment_path)
+    """
     n, m = len(seq1_features), len(seq2_features)
 
     # Create distance function for fastdtw
@@ -365,46 +690,238 @@ def dtw_distance(seq1_features: List[Dict], seq2_features: List[Dict],
     return (distance, path)
 
 
+# =============================================================================
+# NUMERIC FEATURE STORE
+# =============================================================================
+class SequenceFeatureStore:
+    """
+    Features of every indexed sequence kept in contiguous arrays.
+    Events of sequence k occupy rows offsets[k]:offsets[k + 1] (sequences are
+    non-empty); near-ball players are padded to the widest event in the index.
+    """
+
+    def __init__(self, blocks: Optional[List[SequenceArrays]] = None):
+        blocks = blocks or []
+        lengths = np.array([len(b) for b in blocks], dtype=np.int64)
+        self.offsets = np.zeros(len(blocks) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+
+        total = int(self.offsets[-1])
+        width = max((b.near_players.shape[1] for b in blocks), default=0)
+
+        self.ball = np.zeros((total, 2), dtype=np.float32)
+        self.event_type = np.zeros(total, dtype=np.int16)
+        self.pass_type = np.zeros(total, dtype=np.int16)
+        self.shot_type = np.zeros(total, dtype=np.int16)
+        self.pressure_type = np.zeros(total, dtype=np.int16)
+        self.near_players = np.zeros((total, width, 2), dtype=np.float32)
+        self.near_counts = np.zeros(total, dtype=np.uint8)
+        self.max_near = np.zeros(len(blocks), dtype=np.uint8)
+
+        for k, block in enumerate(blocks):
+            start, end = self.offsets[k], self.offsets[k + 1]
+            self.ball[start:end] = block.ball
+            self.event_type[start:end] = block.event_type
+            self.pass_type[start:end] = block.pass_type
+            self.shot_type[start:end] = block.shot_type
+            self.pressure_type[start:end] = block.pressure_type
+            self.near_players[start:end, :block.near_players.shape[1]] = block.near_players
+            self.near_counts[start:end] = block.near_counts
+            self.max_near[k] = block.near_counts.max() if len(block) else 0
+
+        # Per-sequence summaries for lower bounds: endpoints and ball envelope
+        starts, ends = self.offsets[:-1], self.offsets[1:] - 1
+        self.first_ball = self.ball[starts].astype(np.float64) if total else np.zeros((0, 2))
+        self.last_ball = self.ball[ends].astype(np.float64) if total else np.zeros((0, 2))
+        self.first_type = self.event_type[starts] if total else np.zeros(0, dtype=np.int16)
+        self.last_type = self.event_type[ends] if total else np.zeros(0, dtype=np.int16)
+        self.ball_min = np.minimum.reduceat(self.ball, starts).astype(np.float64) if total else np.zeros((0, 2))
+        self.ball_max = np.maximum.reduceat(self.ball, starts).astype(np.float64) if total else np.zeros((0, 2))
+
+    # Every array attribute, in shared-memory layout order
+    ARRAY_FIELDS = (
+        'offsets', 'ball', 'event_type', 'pass_type', 'shot_type', 'pressure_type',
+        'near_players', 'near_counts', 'max_near', 'first_ball', 'last_ball',
+        'first_type', 'last_type', 'ball_min', 'ball_max'
+    )
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'SequenceFeatureStore':
+        """Wrap existing arrays (e.g. views into shared memory) without copying."""
+        store = cls.__new__(cls)
+        for name in cls.ARRAY_FIELDS:
+            setattr(store, name, arrays[name])
+        return store
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def sequence_length(self, k: int) -> int:
+        """Number of events in sequence k."""
+        return int(self.offsets[k + 1] - self.offsets[k])
+
+    def sequence(self, k: int) -> SequenceArrays:
+        """Zero-copy view of sequence k's features."""
+        start, end = self.offsets[k], self.offsets[k + 1]
+        width = self.max_near[k]
+        return SequenceArrays(
+            ball=self.ball[start:end],
+            event_type=self.event_type[start:end],
+            pass_type=self.pass_type[start:end],
+            shot_type=self.shot_type[start:end],
+            pressure_type=self.pressure_type[start:end],
+            near_players=self.near_players[start:end, :width],
+            near_counts=self.near_counts[start:end]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Total bytes held by the feature arrays."""
+        return sum(getattr(self, name).nbytes for name in self.ARRAY_FIELDS)
+
+
+# =============================================================================
+# LOWER BOUNDS
+# =============================================================================
+# Every event_distance term is non-negative, so the ball and event type terms
+# of the cells a warping path must visit bound the full DTW distance from below.
+_PRUNE_TOLERANCE = 1e-9  # Guards exactness against float rounding in the bounds
+
+
+def _box_distance(points: np.ndarray, box_min: np.ndarray, box_max: np.ndarray) -> np.ndarray:
+    """Euclidean distance from points to axis-aligned boxes (0 inside)."""
+    gap = np.maximum(box_min - points, 0.0) + np.maximum(points - box_max, 0.0)
+    return np.sqrt((gap ** 2).sum(axis=-1))
+
+
+def _all_sequences(store: SequenceFeatureStore, candidates: Optional[np.ndarray]) -> np.ndarray:
+    return np.arange(len(store)) if candidates is None else candidates
+
+
+def lower_bound_kim(query: SequenceArrays, store: SequenceFeatureStore,
+                    candidates: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    LB_Kim-style bound for the candidate sequences (default: every stored
+    one): any warping path starts at (0, 0) and ends at (n-1, m-1), so both
+    endpoint cells are always paid.
+    """
+    candidates = _all_sequences(store, candidates)
+    type_penalty = _EVENT_TYPE_CODES.matrix
+    first = (WEIGHTS['ball_position'] * np.sqrt(((store.first_ball[candidates] - query.ball[0]) ** 2).sum(axis=1))
+             + WEIGHTS['event_type'] * type_penalty[query.event_type[0], store.first_type[candidates]])
+    last = (WEIGHTS['ball_position'] * np.sqrt(((store.last_ball[candidates] - query.ball[-1]) ** 2).sum(axis=1))
+            + WEIGHTS['event_type'] * type_penalty[query.event_type[-1], store.last_type[candidates]])
+
+    # A single-cell alignment pays the endpoint cell only once
+    lengths = store.offsets[candidates + 1] - store.offsets[candidates]
+    single_cell = (len(query) == 1) & (lengths == 1)
+    return first + np.where(single_cell, 0.0, last)
+
+
+def lower_bound_envelope(query: SequenceArrays, store: SequenceFeatureStore,
+                         candidates: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Envelope bound on the ball trajectory for the candidate sequences
+    (default: every stored one). Each query event is matched to at least one
+    candidate event, which lies inside the candidate's ball bounding box (and
+    vice versa), so the summed distance to the other sequence's envelope
+    bounds the ball term of the DTW cost.
+    """
+    candidates = _all_sequences(store, candidates)
+    query_ball = query.ball.astype(np.float64)
+
+    # Query events -> candidate envelopes: (C, n)
+    forward = _box_distance(query_ball[None, :, :], store.ball_min[candidates, None, :],
+                            store.ball_max[candidates, None, :]).sum(axis=1)
+
+    # Candidate events -> query envelope, summed per sequence over the candidates' spans only
+    if len(candidates) == 0:
+        return forward
+    starts = store.offsets[candidates]
+    lengths = store.offsets[candidates + 1] - starts
+    span_starts = np.zeros(len(candidates), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=span_starts[1:])
+    rows = np.repeat(starts - span_starts, lengths) + np.arange(int(lengths.sum()))
+    per_event = _box_distance(store.ball[rows].astype(np.float64), query_ball.min(axis=0), query_ball.max(axis=0))
+    reverse = np.add.reduceat(per_event, span_starts)
+
+    return WEIGHTS['ball_position'] * np.maximum(forward, reverse)
+
+
+def _pruning_supported() -> bool:
+    """Bounds are only valid while every feature weight is non-negative."""
+    return all(weight >= 0 for weight in WEIGHTS.values())
+
+
 # =============================================================================
 # SEQUENCE INDEX CACHE
 # =============================================================================
+# _sequence_index[k] holds the metadata of sequence k (ids, teams, time and
+# lightweight events for results); its features live in _feature_store.
 _sequence_index: List[Dict] = []
+_sequence_positions: Dict[Tuple[str, Any], int] = {}  # (matchId, sequenceId) -> k
+_feature_store = SequenceFeatureStore()
 _cache_initialized = False
 
 
-def _build_matches_data_from_repository() -> List[Dict]:
-    """Load matches and shape them into the DTW indexing format."""
-    from DSPFinalFIFA.FIFA.fifa import MatchRepository
-
-    matches = MatchRepository.get_all_matches()
-    matches_data = []
+class SequenceIndexBuilder(IndexBuilder):
+    """Encodes the features of every sequence from the shared ingest"""
+
+    name = 'dtw'
+
+    def __init__(self):
+        self.entries: List[Dict] = []
+        self.blocks: List[SequenceArrays] = []
+
+    def is_ready(self) -> bool:
+        return _cache_initialized and len(_sequence_index) > 0
+
+    def load_snapshot(self) -> bool:
+        # Prebuilt snapshot from `manage.py build_fifa_store`, if still valid
+        from .fifa_store import load_index_snapshot
+        snapshot = load_index_snapshot('dtw', index_settings())
+        if snapshot is None:
+            return False
+        _install_index(snapshot)
+        print(f"[DTW] Loaded prebuilt index ({len(_sequence_index)} sequences)")
+        return True
+
+    def add_sequence(self, match_id: Any, home_team: Dict, away_team: Dict,
+                     seq_id: Any, events: List[Dict], time: str, setpiece_type: str) -> None:
+        if not events:
+            return
+
+        # Pre-compute numeric features for all events
+        features = extract_sequence_features({'events': events})
+        self.blocks.append(encode_sequence_features(features))
+
+        self.entries.append({
+            'matchId': str(match_id),
+            'sequenceId': seq_id,
+            'events': _lightweight_events(events),  # Key players only, for results
+            'homeTeam': home_team,
+            'awayTeam': away_team,
+            'time': time,
+            'setpieceType': setpiece_type
+        })
 
-    for match in matches:
-        plays = match.get_all_plays()
+    def add_match(self, match: MatchSequences) -> None:
+        for group in match.sequences:
+            if group['sequenceId'] is None:
+                continue  # Plays without a sequence are not indexed
+            self.add_sequence(match.match_id, match.home_team or {}, match.away_team or {},
+                              group['sequenceId'], group['events'], group['time'], group['setpieceLabel'])
 
-        # Group plays by sequence
-        sequences_dict = {}
-        for play in plays:
-            seq_id = play.get('sequence')
-            if seq_id is None:
-                continue
-            if seq_id not in sequences_dict:
-                sequences_dict[seq_id] = {
-                    'sequenceId': seq_id,
-                    'events': [],
-                    'time': play.get('time', ''),
-                    'setpieceType': play.get('setpieceLabel', 'Open Play')
-                }
-            sequences_dict[seq_id]['events'].append(play)
-
-        matches_data.append({
-            'matchId': match.match_id,
-            'homeTeam': match.home_team.to_dict() if match.home_team else {},
-            'awayTeam': match.away_team.to_dict() if match.away_team else {},
-            'sequences': list(sequences_dict.values())
-        })
+    def finish(self) -> None:
+        global _sequence_index, _sequence_positions, _feature_store, _cache_initialized
 
-    return matches_data
+        shutdown_search_pool()  # Workers hold the previous index
+        _feature_store = SequenceFeatureStore(self.blocks)
+        _sequence_index = self.entries
+        _sequence_positions = {(e['matchId'], e['sequenceId']): k for k, e in enumerate(self.entries)}
+        _cache_initialized = True
+        print(f"[DTW] Index built with {len(_sequence_index)} sequences "
+              f"({_feature_store.nbytes / 1024:.0f} KB of features)")
 
 
 def build_sequence_index(matches_data: List[Dict]) -> None:
@@ -412,46 +929,25 @@ def build_sequence_index(matches_data: List[Dict]) -> None:
     Build and cache index of all sequences from all matches.
     Each entry contains sequence features pre-computed for fast comparison.
     """
-    global _sequence_index, _cache_initialized
-
     print("[DTW] Building sequence index...")
-    _sequence_index = []
+    builder = SequenceIndexBuilder()
 
     for match in matches_data:
         match_id = match.get('matchId', match.get('id', ''))
         home_team = match.get('homeTeam', {})
         away_team = match.get('awayTeam', {})
 
-        sequences = match.get('sequences', match.get('plays', []))
-
-        for seq in sequences:
-            seq_id = seq.get('sequenceId', seq.get('sequence', 0))
-            events = seq.get('events', [])
-
-            if not events:
-                continue
-
-            # Pre-compute features for all events
-            features = extract_sequence_features({'events': events})
-
-            _sequence_index.append({
-                'matchId': str(match_id),
-                'sequenceId': seq_id,
-                'features': features,
-                'events': events,  # Keep original events for result
-                'homeTeam': home_team,
-                'awayTeam': away_team,
-                'time': seq.get('time', ''),
-                'setpieceType': seq.get('setpieceType', 'Open Play')
-            })
+        for seq in match.get('sequences', match.get('plays', [])):
+            builder.add_sequence(match_id, home_team, away_team,
+                                 seq.get('sequenceId', seq.get('sequence', 0)), seq.get('events', []),
+                                 seq.get('time', ''), seq.get('setpieceType', 'Open Play'))
 
-    _cache_initialized = True
-    print(f"[DTW] Index built with {len(_sequence_index)} sequences")
+    builder.finish()
 
 
 def ensure_index_initialized() -> None:
     """Ensure the sequence index is initialized"""
-    global _cache_initialized, _sequence_index
+    global _cache_initialized, _sequence_index, _feature_store
 
     # Check both flag and actual data (in case module was reloaded but data persists)
     if _cache_initialized and len(_sequence_index) > 0:
@@ -465,31 +961,314 @@ def ensure_index_initialized() -> None:
 
     # Need to build the index
     try:
-        matches_data = _build_matches_data_from_repository()
-        build_sequence_index(matches_data)
+        builder = SequenceIndexBuilder()
+        if not builder.load_snapshot():
+            print("[DTW] Building sequence index...")
+            run_ingest([builder])
     except Exception as e:
         print(f"[DTW] Error initializing index: {e}")
         _sequence_index = []
+        _feature_store = SequenceFeatureStore()
         _cache_initialized = True
 
 
+# =============================================================================
+# PARALLEL SEARCH (process pool over shared-memory index partitions)
+# =============================================================================
+_search_pool: Optional[ProcessPoolExecutor] = None
+_search_pool_shm: Optional[shared_memory.SharedMemory] = None
+_search_pool_lock = threading.Lock()
+_worker_shm: Optional[shared_memory.SharedMemory] = None  # Set inside pool workers
+
+
+def _worker_count() -> int:
+    """Configured number of search worker processes."""
+    return max(1, DTW_WORKERS or os.cpu_count() or 1)
+
+
+def _export_store(store: SequenceFeatureStore) -> Tuple[shared_memory.SharedMemory, Dict[str, Tuple]]:
+    """Copy every store array into one shared-memory block; returns (block, layout)."""
+    layout = {}
+    size = 0
+    for name in SequenceFeatureStore.ARRAY_FIELDS:
+        array = getattr(store, name)
+        size = (size + 63) // 64 * 64  # 64-byte aligned arrays
+        layout[name] = (size, array.dtype.str, array.shape)
+        size += array.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, (start, dtype, shape) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+        view[...] = getattr(store, name)
+        del view  # Exported views would keep the block from closing
+    return shm, layout
+
+
+def _init_search_worker(shm_name: str, layout: Dict[str, Tuple]) -> None:
+    """Pool initializer: attach to the shared index once per worker process."""
+    global _worker_shm, _feature_store
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+
+    arrays = {}
+    for name, (start, dtype, shape) in layout.items():
+        array = np.ndarray(shape, dtype=dtype, buffer=_worker_shm.buf, offset=start)
+        array.flags.writeable = False
+        arrays[name] = array
+    _feature_store = SequenceFeatureStore.from_arrays(arrays)
+
+
+def _scoring_context(config: Dict) -> Dict:
+    """Settings a worker needs to score exactly like this process."""
+    return {
+        'config': dict(config),
+        'weights': dict(WEIGHTS),
+        'backend': DTW_BACKEND,
+        'pruning': DTW_PRUNING,
+        'workers': _worker_count(),
+        'event_types': _EVENT_TYPE_CODES.snapshot(),
+        'optional_codes': {feature: codebook.snapshot() for feature, codebook in _OPTIONAL_CODEBOOKS.items()}
+    }
+
+
+def _scan_partition(query: SequenceArrays, candidates: np.ndarray, top_n: int,
+                    context: Dict) -> Tuple[List[Tuple[float, int]], Dict[str, int]]:
+    """Worker task: top-k scan of one partition of the shared index."""
+    global DTW_BACKEND, DTW_PRUNING
+    WEIGHTS.update(context['weights'])
+    DTW_BACKEND = context['backend']
+    DTW_PRUNING = context['pruning']
+    _EVENT_TYPE_CODES.restore(context['event_types'])
+    for feature, values in context['optional_codes'].items():
+        _OPTIONAL_CODEBOOKS[feature].restore(values)
+
+    stats = dict.fromkeys(_PRUNE_STAT_KEYS, 0)
+    ranked = _scan_candidates(query, candidates, top_n, context['config'], stats)
+    return ranked, stats
+
+
+def _get_search_pool() -> ProcessPoolExecutor:
+    """Start the persistent pool (and publish the index) on first use."""
+    global _search_pool, _search_pool_shm
+    with _search_pool_lock:
+        if _search_pool is None:
+            _search_pool_shm, layout = _export_store(_feature_store)
+            _search_pool = ProcessPoolExecutor(
+                max_workers=_worker_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_search_worker,
+                initargs=(_search_pool_shm.name, layout)
+            )
+            print(f"[DTW] Search pool started with {_worker_count()} workers "
+                  f"({_feature_store.nbytes / 1024:.0f} KB shared)")
+        return _search_pool
+
+
+def shutdown_search_pool() -> None:
+    """Stop the search pool and release the shared index."""
+    global _search_pool, _search_pool_shm
+    with _search_pool_lock:
+        if _search_pool is not None:
+            _search_pool.shutdown(wait=True, cancel_futures=True)
+            _search_pool = None
+        if _search_pool_shm is not None:
+            _search_pool_shm.close()
+            _search_pool_shm.unlink()
+            _search_pool_shm = None
+
+
+atexit.register(shutdown_search_pool)
+
+
+def _parallel_scan(query: SequenceArrays, candidates: np.ndarray, top_n: int,
+                   config: Dict, stats: Dict[str, int]) -> List[Tuple[float, int]]:
+    """
+    Score candidates across the pool, one partition per worker, and merge the
+    per-partition top-k lists. Small scans run in-process.
+    """
+    workers = _worker_count()
+    if workers < 2 or len(candidates) < PARALLEL_MIN_SEQUENCES:
+        return _scan_candidates(query, candidates, top_n, config, stats)
+
+    try:
+        pool = _get_search_pool()
+        context = _scoring_context(config)
+        futures = [
+            pool.submit(_scan_partition, query, partition, top_n, context)
+            for partition in np.array_split(candidates, workers)
+        ]
+        partials = [future.result() for future in futures]
+    except CancelledError:
+        # The pool was shut down by an index rebuild while this search ran
+        print("[DTW] Parallel search cancelled, scanning in-process")
+        return _scan_candidates(query, candidates, top_n, config, stats)
+    except (BrokenProcessPool, RuntimeError, OSError) as e:
+        print(f"[DTW] Parallel search failed, scanning in-process: {e}")
+        shutdown_search_pool()
+        return _scan_candidates(query, candidates, top_n, config, stats)
+
+    for _, partition_stats in partials:
+        for key in _PRUNE_STAT_KEYS:
+            stats[key] += partition_stats[key]
+
+    merged = heapq.merge(*(ranked for ranked, _ in partials))
+    return list(itertools.islice(merged, top_n))
+
+
 # =============================================================================
 # SEARCH FUNCTION
 # =============================================================================
-def search_similar_sequences_dtw(query_sequence: Dict,
+# Pruning counters: 'last' holds the most recent search, 'total' accumulates
+_PRUNE_STAT_KEYS = ('candidates', 'pruned_kim', 'pruned_envelope', 'abandoned', 'full_dtw')
+_prune_stats = {
+    'last': dict.fromkeys(_PRUNE_STAT_KEYS, 0),
+    'total': dict.fromkeys(('searches',) + _PRUNE_STAT_KEYS, 0)
+}
+_prune_stats_lock = threading.Lock()
+
+
+def _record_prune_stats(stats: Dict[str, int]) -> None:
+    """Publish one search's pruning counters."""
+    with _prune_stats_lock:
+        _prune_stats['last'] = dict(stats)
+        _prune_stats['total']['searches'] += 1
+        for key in _PRUNE_STAT_KEYS:
+            _prune_stats['total'][key] += stats[key]
+
+
+def get_prune_stats() -> Dict[str, Dict[str, int]]:
+    """Get pruning counters for the last search and since startup"""
+    with _prune_stats_lock:
+        return {'last': dict(_prune_stats['last']), 'total': dict(_prune_stats['total'])}
+
+
+def _scan_candidates(query: SequenceArrays, candidates: np.ndarray, top_n: int,
+                     config: Optional[Dict], stats: Dict[str, int]) -> List[Tuple[float, int]]:
+    """
+    Find the top_n (distance, index) among candidate index positions.
+
+    Candidates are visited in order of their lower bound; once top_n results
+    exist, a candidate is skipped when a bound exceeds the k-th best distance
+    and DTW is abandoned as soon as its running cost does. Ties are broken by
+    index position, so the result equals an exhaustive stable sort.
+    """
+    if top_n <= 0 or len(candidates) == 0:
+        return []
+
+    pruning = DTW_PRUNING and _pruning_supported()
+    if pruning:
+        kim = lower_bound_kim(query, _feature_store, candidates)
+        envelope = lower_bound_envelope(query, _feature_store, candidates)
+        order = np.argsort(np.maximum(kim, envelope), kind='stable')
+    else:
+        order = np.arange(len(candidates))
+
+    heap = BoundedHeap(top_n)  # keyed on (distance, index)
+    for pos in order:
+        k = int(candidates[pos])
+        stats['candidates'] += 1
+
+        limit = None
+        if pruning and heap.full:
+            worst = heap.worst_key[0]
+            limit = worst + _PRUNE_TOLERANCE * max(1.0, worst)
+            if kim[pos] > limit:
+                stats['pruned_kim'] += 1
+                continue
+            if envelope[pos] > limit:
+                stats['pruned_envelope'] += 1
+                continue
+
+        # Paths are only backtracked later, for the winners
+        distance, _ = dtw_distance(query, _feature_store.sequence(k), config,
+                                   max_distance=limit, with_path=False)
+        if math.isinf(distance):
+            stats['abandoned'] += 1
+            continue
+        stats['full_dtw'] += 1
+        heap.push((distance, k))
+
+    return [key for key, _ in heap.items()]
+
+
+def _alignment_path(query: SequenceArrays, k: int, config: Optional[Dict]) -> List:
+    """Alignment path between the query and one indexed sequence."""
+    return dtw_distance(query, _feature_store.sequence(k), config)[1]
+
+
+def _reference_position(query_key: Optional[Tuple[Any, Any]]) -> Optional[int]:
+    """Index position of a (matchId, sequenceId) reference, if indexed."""
+    if query_key is None:
+        return None
+    match_id, seq_id = query_key
+    return _sequence_positions.get((str(match_id), seq_id))
+
+
+def _query_arrays(query_sequence: Optional[Dict],
+                  query_key: Optional[Tuple[Any, Any]]) -> Optional[SequenceArrays]:
+    """
+    Numeric features of the query: the stored view for an indexed reference
+    (no feature extraction), otherwise encoded from query_sequence['events'].
+    """
+    k = _reference_position(query_key)
+    if k is not None:
+        return _feature_store.sequence(k)
+
+    query_events = (query_sequence or {}).get('events', [])
+    if not query_events:
+        return None
+    return encode_sequence_features([extract_event_features(e) for e in query_events])
+
+
+def attach_alignment_paths(query_sequence: Optional[Dict], results: List[Dict],
+                           config: Optional[Dict] = None,
+                           query_key: Optional[Tuple[Any, Any]] = None) -> List[Dict]:
+    """
+    Fill 'alignmentPath' for DTW results returned with include_paths=False,
+    e.g. only for the hybrid winners.
+    """
+    ensure_index_initialized()
+
+    if config is None:
+        config = OPTIONAL_FEATURES
+
+    pending = [r for r in results if r.get('alignmentPath') is None]
+    if not pending:
+        return results
+
+    query = _query_arrays(query_sequence, query_key)
+    if query is None:
+        return results
+
+    for result in pending:
+        k = _sequence_positions.get((result['matchId'], result['sequenceId']))
+        if k is not None:
+            result['alignmentPath'] = _alignment_path(query, k, config)
+
+    return results
+
+
+def search_similar_sequences_dtw(query_sequence: Optional[Dict],
                                   top_n: int = TOP_N,
                                   config: Optional[Dict] = None,
                                   exclude_match_id: str = None,
-                                  exclude_seq_id: int = None) -> List[Dict]:
+                                  exclude_seq_id: int = None,
+                                  candidates: Optional[List[Tuple[str, Any]]] = None,
+                                  include_paths: bool = True,
+                                  query_key: Optional[Tuple[Any, Any]] = None) -> List[Dict]:
     """
     Search for sequences similar to the query using DTW.
 
     Args:
-        query_sequence: Dict with 'events' list
+        query_sequence: Dict with 'events' list (may be None when query_key is indexed)
         top_n: Number of results to return
         config: Optional feature configuration
         exclude_match_id: Match ID to exclude from results
         exclude_seq_id: Sequence ID to exclude (used with exclude_match_id)
+        candidates: Optional (matchId, sequenceId) keys to restrict the scan to
+        include_paths: Backtrack alignment paths for the winners (otherwise None;
+            see attach_alignment_paths)
+        query_key: Optional (matchId, sequenceId) of an indexed sequence to use
+            as the query; its stored features are reused instead of re-extracted
 
     Returns:
         List of similar sequences with distance and similarity scores
@@ -499,51 +1278,60 @@ def search_similar_sequences_dtw(query_sequence: Dict,
     if config is None:
         config = OPTIONAL_FEATURES
 
-    # Extract features from query
-    query_events = query_sequence.get('events', [])
-    if not query_events:
+    # Query features: stored view for a reference, extracted otherwise
+    query = _query_arrays(query_sequence, query_key)
+    if query is None or len(query) == 0:
         return []
 
-    query_features = [extract_event_features(e) for e in query_events]
-
-    # Compare with all indexed sequences
-    results = []
-
-    for entry in _sequence_index:
-        # Skip excluded sequence
-        if exclude_match_id and exclude_seq_id is not None:
-            if entry['matchId'] == exclude_match_id and entry['sequenceId'] == exclude_seq_id:
-                continue
-
-        # Calculate DTW distance
-        distance, path = dtw_distance(query_features, entry['features'], config)
-
-        # Normalize distance to similarity score (0-1)
-        # Use sequence length for normalization
-        path_length = max(len(query_features), len(entry['features']))
-        normalized_distance = distance / path_length if path_length > 0 else distance
-
-        # Convert to similarity (higher = more similar)
-        similarity = max(0, 1 - (normalized_distance / MAX_DISTANCE))
-
-        results.append({
-            'matchId': entry['matchId'],
-            'sequenceId': entry['sequenceId'],
-            'distance': distance,
-            'similarity': similarity,
-            'events': _lightweight_events(entry['events']),
-            'eventCount': len(entry['events']),
-            'homeTeam': entry['homeTeam'],
-            'awayTeam': entry['awayTeam'],
-            'time': entry['time'],
-            'setpieceType': entry['setpieceType'],
-            'alignmentPath': path
-        })
+    # Candidate index positions (skip excluded sequence)
+    if candidates is None:
+        positions = np.arange(len(_sequence_index), dtype=np.int64)
+    else:
+        positions = np.array(sorted({
+            _sequence_positions[(str(match_id), seq_id)] for match_id, seq_id in candidates
+            if (str(match_id), seq_id) in _sequence_positions
+        }), dtype=np.int64)
+    if exclude_match_id and exclude_seq_id is not None:
+        excluded = _sequence_positions.get((exclude_match_id, exclude_seq_id))
+        if excluded is not None:
+            positions = positions[positions != excluded]
+
+    stats = dict.fromkeys(_PRUNE_STAT_KEYS, 0)
+    ranked = _parallel_scan(query, positions, top_n, config, stats)
+    _record_prune_stats(stats)
+
+    # Hydrate only the winners
+    return [
+        _sequence_result(k, distance, _similarity(distance, len(query), k),
+                         _alignment_path(query, k, config) if include_paths else None)
+        for distance, k in ranked
+    ]
+
+
+def _similarity(distance: float, query_length: int, k: int) -> float:
+    """Normalize a DTW distance to a 0-1 similarity (higher = more similar)."""
+    # Use sequence length for normalization
+    path_length = max(query_length, _feature_store.sequence_length(k))
+    normalized_distance = distance / path_length if path_length > 0 else distance
+    return max(0, 1 - (normalized_distance / MAX_DISTANCE))
 
-    # Sort by distance (ascending) and take top N
-    results.sort(key=lambda x: x['distance'])
 
-    return results[:top_n]
+def _sequence_result(k: int, distance: float, similarity: float, path: Optional[List]) -> Dict:
+    """Build the response entry for one indexed sequence."""
+    entry = _sequence_index[k]
+    return {
+        'matchId': entry['matchId'],
+        'sequenceId': entry['sequenceId'],
+        'distance': distance,
+        'similarity': similarity,
+        'events': entry['events'],
+        'eventCount': len(entry['events']),
+        'homeTeam': entry['homeTeam'],
+        'awayTeam': entry['awayTeam'],
+        'time': entry['time'],
+        'setpieceType': entry['setpieceType'],
+        'alignmentPath': path
+    }
 
 
 def _ensure_key_player_ids(event: Dict) -> List[int]:
@@ -660,9 +1448,35 @@ def set_weight(feature: str, weight: float) -> None:
         print(f"[DTW] Weight for '{feature}' set to {weight}")
 
 
+def set_backend(backend: str) -> None:
+    """Select the DTW backend ('exact' or 'fastdtw')"""
+    global DTW_BACKEND
+    if backend in DTW_BACKENDS:
+        DTW_BACKEND = backend
+        print(f"[DTW] Backend set to '{backend}'")
+
+
+def set_workers(workers: Optional[int]) -> None:
+    """Set the number of search worker processes (None = all cores)"""
+    global DTW_WORKERS
+    DTW_WORKERS = workers
+    shutdown_search_pool()
+    print(f"[DTW] Search workers set to {_worker_count()}")
+
+
+def set_pruning(enabled: bool) -> None:
+    """Enable or disable lower-bound pruning and early abandoning"""
+    global DTW_PRUNING
+    DTW_PRUNING = enabled
+    print(f"[DTW] Pruning set to {enabled}")
+
+
 def get_config() -> Dict:
     """Get current configuration"""
     return {
+        'backend': DTW_BACKEND,
+        'pruning': DTW_PRUNING,
+        'workers': _worker_count(),
         'weights': WEIGHTS.copy(),
         'optional_features': OPTIONAL_FEATURES.copy(),
         'top_n': TOP_N,
@@ -670,9 +1484,32 @@ def get_config() -> Dict:
     }
 
 
+def index_settings() -> Dict:
+    """Settings the index contents depend on (a snapshot is reused only if they match)"""
+    return {'near_ball_radius': NEAR_BALL_RADIUS}
+
+
+def export_index() -> Dict:
+    """Current index state, for persisting with fifa_store.save_index_snapshot"""
+    ensure_index_initialized()
+    return {'sequence_index': _sequence_index, 'feature_store': _feature_store}
+
+
+def _install_index(state: Dict) -> None:
+    global _sequence_index, _sequence_positions, _feature_store, _cache_initialized
+    shutdown_search_pool()  # Workers hold the previous index
+    _sequence_index = state['sequence_index']
+    _feature_store = state['feature_store']
+    _sequence_positions = {(e['matchId'], e['sequenceId']): k for k, e in enumerate(_sequence_index)}
+    _cache_initialized = True
+
+
 def reset_cache() -> None:
     """Reset the sequence index cache"""
-    global _sequence_index, _cache_initialized
+    global _sequence_index, _sequence_positions, _feature_store, _cache_initialized
+    shutdown_search_pool()
     _sequence_index = []
+    _sequence_positions = {}
+    _feature_store = SequenceFeatureStore()
     _cache_initialized = False
     print("[DTW] Cache reset")
\ No newline at end of file
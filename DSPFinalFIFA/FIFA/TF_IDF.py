@@ -3,10 +3,12 @@ TF-IDF Similarity Search for FIFA World Cup 2022 Plays
 Finds similar events and sequences across all matches using text-based similarity
 """
 import math
-import numpy as np
+import time
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Dict, Tuple, Optional
+from .ingest import IndexBuilder, MatchSequences, run_ingest
+from .topk import top_k_indices
 
 
 # =============================================================================
@@ -24,6 +26,8 @@ _event_vectors = None  # sparse matrix
 _sequence_vectors = None  # sparse matrix
 _event_index: List[Dict] = []  # maps row index to (match_id, sequence_id, event_index, event_data)
 _sequence_index: List[Dict] = []  # maps row index to (match_id, sequence_id, sequence_data)
+_event_positions: Dict[Tuple, int] = {}  # (match_id, sequence_id, event_index) -> row index
+_sequence_positions: Dict[Tuple, int] = {}  # (match_id, sequence_id) -> row index
 _cache_initialized = False
 
 
@@ -309,62 +313,99 @@ def sequence_to_text(events: List[Dict]) -> str:
 # =============================================================================
 # CACHE INITIALIZATION
 # =============================================================================
-def _load_all_plays() -> Tuple[List[Dict], List[Dict]]:
-    """
-    Load all plays from all matches.
-    Returns: (all_events, all_sequences)
-    """
-    from .fifa import MatchRepository
-    
-    all_events = []
-    all_sequences = []
-    
-    match_ids = MatchRepository.get_all_match_ids()
-    
-    for match_id in match_ids:
-        match = MatchRepository.get_match(match_id)
-        if not match:
-            continue
-        
-        plays = match.get_all_plays()
-        
-        # Group plays by sequence
-        sequences_map = {}
-        for play in plays:
-            seq_id = play.get('sequence')
-            if seq_id is None:
-                seq_id = -1
-            
-            if seq_id not in sequences_map:
-                sequences_map[seq_id] = {
-                    'matchId': match_id,
-                    'sequenceId': seq_id,
-                    'events': [],
-                    'setpieceType': play.get('setpieceLabel', ''),
-                    'teamId': play.get('teamId', ''),
-                    'time': play.get('time', ''),
-                    'homeTeam': match.home_team.to_dict() if match.home_team else None,
-                    'awayTeam': match.away_team.to_dict() if match.away_team else None
-                }
-            
-            sequences_map[seq_id]['events'].append(play)
-            
-            # Add event with metadata
-            event_entry = {
-                'matchId': match_id,
+def _new_vectorizer() -> TfidfVectorizer:
+    return TfidfVectorizer(
+        lowercase=False,
+        token_pattern=r'\S+',  # Split on whitespace
+        min_df=2,  # Ignore terms that appear in less than 2 docs
+        max_df=0.95  # Ignore terms that appear in more than 95% of docs
+    )
+
+
+class TfidfIndexBuilder(IndexBuilder):
+    """Collects event and sequence texts from the shared ingest, then fits both vectorizers"""
+
+    name = 'tfidf'
+
+    def __init__(self):
+        self.events: List[Dict] = []
+        self.sequences: List[Dict] = []
+        self.event_texts: List[str] = []
+        self.sequence_texts: List[str] = []
+
+    def is_ready(self) -> bool:
+        return _cache_initialized
+
+    def load_snapshot(self) -> bool:
+        # Prebuilt snapshot from `manage.py build_fifa_store`, if still valid
+        from .fifa_store import load_index_snapshot
+        snapshot = load_index_snapshot('tfidf', index_settings())
+        if snapshot is None:
+            return False
+        _install_index(snapshot)
+        print(f"[Search] Loaded prebuilt TF-IDF index ({len(_event_index)} events, "
+              f"{len(_sequence_index)} sequences)")
+        return True
+
+    def add_match(self, match: MatchSequences) -> None:
+        # Plays without a sequence are indexed under sequence -1
+        entries = {}
+        for group in match.sequences:
+            seq_id = -1 if group['sequenceId'] is None else group['sequenceId']
+            entries[group['sequenceId']] = {
+                'matchId': match.match_id,
                 'sequenceId': seq_id,
-                'eventIndex': len(sequences_map[seq_id]['events']) - 1,
-                'event': play,
-                'homeTeam': match.home_team.to_dict() if match.home_team else None,
-                'awayTeam': match.away_team.to_dict() if match.away_team else None
+                'events': group['events'],
+                'setpieceType': group['setpieceLabel'],
+                'teamId': group['teamId'],
+                'time': group['time'],
+                'homeTeam': match.home_team,
+                'awayTeam': match.away_team
             }
-            all_events.append(event_entry)
-        
-        # Add sequences
-        for seq_data in sequences_map.values():
-            all_sequences.append(seq_data)
-    
-    return all_events, all_sequences
+
+        # Events in match order, numbered within their sequence
+        counts = dict.fromkeys(entries, 0)
+        for play in match.plays:
+            group_id = play.get('sequence')
+            self.events.append({
+                'matchId': match.match_id,
+                'sequenceId': entries[group_id]['sequenceId'],
+                'eventIndex': counts[group_id],
+                'event': play,
+                'homeTeam': match.home_team,
+                'awayTeam': match.away_team
+            })
+            self.event_texts.append(event_to_text(play))
+            counts[group_id] += 1
+
+        for entry in entries.values():
+            self.sequences.append(entry)
+            self.sequence_texts.append(sequence_to_text(entry['events']))
+
+    def finish(self) -> None:
+        global _event_vectorizer, _sequence_vectorizer
+        global _event_vectors, _sequence_vectors
+        global _event_index, _sequence_index
+        global _event_positions, _sequence_positions
+        global _cache_initialized
+
+        print(f"[Search] Loaded {len(self.events)} events from {len(self.sequences)} sequences")
+
+        _event_index = self.events
+        _event_positions = {
+            (e['matchId'], e['sequenceId'], e['eventIndex']): row for row, e in enumerate(self.events)
+        }
+        _sequence_index = self.sequences
+        _sequence_positions = {(s['matchId'], s['sequenceId']): row for row, s in enumerate(self.sequences)}
+
+        _event_vectorizer = _new_vectorizer()
+        _event_vectors = _event_vectorizer.fit_transform(self.event_texts)
+        _sequence_vectorizer = _new_vectorizer()
+        _sequence_vectors = _sequence_vectorizer.fit_transform(self.sequence_texts)
+
+        _cache_initialized = True
+        print(f"[Search] Cache initialized. Event vocab size: {len(_event_vectorizer.vocabulary_)}, "
+              f"Sequence vocab size: {len(_sequence_vectorizer.vocabulary_)}")
 
 
 def initialize_cache():
@@ -372,58 +413,13 @@ def initialize_cache():
     Initialize TF-IDF cache. Called on first search request.
     Builds vectorizers and transforms all events/sequences.
     """
-    global _event_vectorizer, _sequence_vectorizer
-    global _event_vectors, _sequence_vectors
-    global _event_index, _sequence_index
-    global _cache_initialized
-    
     if _cache_initialized:
         return
-    
-    print("[Search] Initializing TF-IDF cache...")
-    
-    # Load all plays
-    all_events, all_sequences = _load_all_plays()
-    
-    print(f"[Search] Loaded {len(all_events)} events from {len(all_sequences)} sequences")
-    
-    # Build event texts
-    event_texts = []
-    _event_index = []
-    for entry in all_events:
-        text = event_to_text(entry['event'])
-        event_texts.append(text)
-        _event_index.append(entry)
-    
-    # Build sequence texts
-    sequence_texts = []
-    _sequence_index = []
-    for seq in all_sequences:
-        text = sequence_to_text(seq['events'])
-        sequence_texts.append(text)
-        _sequence_index.append(seq)
-    
-    # Fit and transform event vectorizer
-    _event_vectorizer = TfidfVectorizer(
-        lowercase=False,
-        token_pattern=r'\S+',  # Split on whitespace
-        min_df=2,  # Ignore terms that appear in less than 2 docs
-        max_df=0.95  # Ignore terms that appear in more than 95% of docs
-    )
-    _event_vectors = _event_vectorizer.fit_transform(event_texts)
-    
-    # Fit and transform sequence vectorizer
-    _sequence_vectorizer = TfidfVectorizer(
-        lowercase=False,
-        token_pattern=r'\S+',
-        min_df=2,
-        max_df=0.95
-    )
-    _sequence_vectors = _sequence_vectorizer.fit_transform(sequence_texts)
-    
-    _cache_initialized = True
-    print(f"[Search] Cache initialized. Event vocab size: {len(_event_vectorizer.vocabulary_)}, "
-          f"Sequence vocab size: {len(_sequence_vectorizer.vocabulary_)}")
+
+    builder = TfidfIndexBuilder()
+    if not builder.load_snapshot():
+        print("[Search] Initializing TF-IDF cache...")
+        run_ingest([builder])
 
 
 # =============================================================================
@@ -498,9 +494,39 @@ def _lightweight_event(event: Dict) -> Dict:
     }
 
 
-def search_similar_events(query_event: Dict, exclude_match_id: str = None, 
+def _event_row(query_key: Optional[Tuple]) -> Optional[int]:
+    """Row index of a (matchId, sequenceId, eventIndex) reference, if indexed."""
+    if query_key is None:
+        return None
+    match_id, seq_id, event_idx = query_key
+    return _event_positions.get((str(match_id), seq_id, event_idx))
+
+
+def _sequence_row(query_key: Optional[Tuple]) -> Optional[int]:
+    """Row index of a (matchId, sequenceId) reference, if indexed."""
+    if query_key is None:
+        return None
+    match_id, seq_id = query_key
+    return _sequence_positions.get((str(match_id), seq_id))
+
+
+def get_indexed_event(match_id, seq_id, event_idx) -> Optional[Dict]:
+    """Index entry (matchId, sequenceId, eventIndex, event, teams) of a referenced event"""
+    initialize_cache()
+    row = _event_row((match_id, seq_id, event_idx))
+    return _event_index[row] if row is not None else None
+
+
+def get_indexed_sequence(match_id, seq_id) -> Optional[Dict]:
+    """Index entry (matchId, sequenceId, events, metadata) of a referenced sequence"""
+    initialize_cache()
+    row = _sequence_row((match_id, seq_id))
+    return _sequence_index[row] if row is not None else None
+
+
+def search_similar_events(query_event: Optional[Dict], exclude_match_id: str = None, 
                           exclude_seq_id: int = None, exclude_event_idx: int = None,
-                          top_n: int = 10) -> List[Dict]:
+                          top_n: int = 10, query_key: Optional[Tuple] = None) -> List[Dict]:
     """
     Search for events similar to the query event.
     
@@ -510,38 +536,38 @@ def search_similar_events(query_event: Dict, exclude_match_id: str = None,
         exclude_seq_id: Sequence ID to exclude
         exclude_event_idx: Event index to exclude
         top_n: Number of results to return
+        query_key: Optional (matchId, sequenceId, eventIndex) of an indexed event;
+                   its stored vector is used instead of query_event
     
     Returns:
         List of dicts with match info, event data, and similarity score
     """
     initialize_cache()
     
-    # Convert query to text and vectorize
-    query_text = event_to_text(query_event)
-    query_vector = _event_vectorizer.transform([query_text])
+    # Stored vector for a reference, otherwise convert query to text and vectorize
+    row = _event_row(query_key)
+    if row is not None:
+        query_vector = _event_vectors[row]
+    elif query_event:
+        query_vector = _event_vectorizer.transform([event_to_text(query_event)])
+    else:
+        return []
     
     # Compute similarities
     similarities = cosine_similarity(query_vector, _event_vectors).flatten()
     
     # Get top indices (excluding query itself)
+    excluded = _event_row((exclude_match_id, exclude_seq_id, exclude_event_idx))
+    top_indices = top_k_indices(similarities, top_n, exclude=() if excluded is None else (excluded,))
+
+    # Build payloads only for the winners
     results = []
-    sorted_indices = np.argsort(similarities)[::-1]  # Descending
-    
-    for idx in sorted_indices:
-        if len(results) >= top_n:
-            break
-        
+    for idx in top_indices:
         entry = _event_index[idx]
         
-        # Exclude exact query event
-        if (entry['matchId'] == exclude_match_id and 
-            entry['sequenceId'] == exclude_seq_id and 
-            entry['eventIndex'] == exclude_event_idx):
-            continue
-        
         score = float(similarities[idx])
         if score < 0.01:  # Skip very low similarity
-            continue
+            break  # Sorted descending: everything after scores lower
         
         results.append({
             'matchId': entry['matchId'],
@@ -556,8 +582,60 @@ def search_similar_events(query_event: Dict, exclude_match_id: str = None,
     return results
 
 
-def search_similar_sequences(query_events: List[Dict], exclude_match_id: str = None,
-                              exclude_seq_id: int = None, top_n: int = 10) -> List[Dict]:
+def _rank_sequences(query_events: Optional[List[Dict]], exclude_match_id: str = None,
+                    exclude_seq_id: int = None, limit: int = 10,
+                    min_score: float = 0.0,
+                    query_key: Optional[Tuple] = None) -> List[Tuple[int, float]]:
+    """Return (row index, cosine similarity) of the best sequences, best first."""
+    initialize_cache()
+
+    # Stored vector for a reference, otherwise convert query to text and vectorize
+    row = _sequence_row(query_key)
+    if row is not None:
+        query_vector = _sequence_vectors[row]
+    elif query_events:
+        query_vector = _sequence_vectorizer.transform([sequence_to_text(query_events)])
+    else:
+        return []
+
+    # Compute similarities
+    similarities = cosine_similarity(query_vector, _sequence_vectors).flatten()
+
+    # Get top indices (excluding query itself)
+    excluded = _sequence_row((exclude_match_id, exclude_seq_id))
+    top_indices = top_k_indices(similarities, limit, exclude=() if excluded is None else (excluded,))
+
+    ranked = []
+    for idx in top_indices:
+        score = float(similarities[idx])
+        if score < min_score:
+            break  # Sorted descending: everything after scores lower
+
+        ranked.append((int(idx), score))
+
+    return ranked
+
+
+def _sequence_result(idx: int, score: float) -> Dict:
+    """Build the response entry for one indexed sequence."""
+    entry = _sequence_index[idx]
+    return {
+        'matchId': entry['matchId'],
+        'sequenceId': entry['sequenceId'],
+        'setpieceType': entry['setpieceType'],
+        'teamId': entry['teamId'],
+        'time': entry['time'],
+        'events': [_lightweight_event(e) for e in entry['events']],
+        'homeTeam': entry['homeTeam'],
+        'awayTeam': entry['awayTeam'],
+        'eventCount': len(entry['events']),
+        'similarity': round(score, 3)
+    }
+
+
+def search_similar_sequences(query_events: Optional[List[Dict]], exclude_match_id: str = None,
+                              exclude_seq_id: int = None, top_n: int = 10,
+                              query_key: Optional[Tuple] = None) -> List[Dict]:
     """
     Search for sequences similar to the query sequence.
     
@@ -566,51 +644,15 @@ def search_similar_sequences(query_events: List[Dict], exclude_match_id: str = N
         exclude_match_id: Match ID to exclude
         exclude_seq_id: Sequence ID to exclude
         top_n: Number of results to return
+        query_key: Optional (matchId, sequenceId) of an indexed sequence;
+                   its stored vector is used instead of query_events
     
     Returns:
         List of dicts with match info, sequence data, and similarity score
     """
-    initialize_cache()
-    
-    # Convert query to text and vectorize
-    query_text = sequence_to_text(query_events)
-    query_vector = _sequence_vectorizer.transform([query_text])
-    
-    # Compute similarities
-    similarities = cosine_similarity(query_vector, _sequence_vectors).flatten()
-    
-    # Get top indices
-    results = []
-    sorted_indices = np.argsort(similarities)[::-1]
-    
-    for idx in sorted_indices:
-        if len(results) >= top_n:
-            break
-        
-        entry = _sequence_index[idx]
-        
-        # Exclude exact query sequence
-        if entry['matchId'] == exclude_match_id and entry['sequenceId'] == exclude_seq_id:
-            continue
-        
-        score = float(similarities[idx])
-        if score < 0.01:
-            continue
-        
-        results.append({
-            'matchId': entry['matchId'],
-            'sequenceId': entry['sequenceId'],
-            'setpieceType': entry['setpieceType'],
-            'teamId': entry['teamId'],
-            'time': entry['time'],
-            'events': [_lightweight_event(e) for e in entry['events']],
-            'homeTeam': entry['homeTeam'],
-            'awayTeam': entry['awayTeam'],
-            'eventCount': len(entry['events']),
-            'similarity': round(score, 3)
-        })
-    
-    return results
+    ranked = _rank_sequences(query_events, exclude_match_id, exclude_seq_id,
+                             limit=top_n, min_score=0.01, query_key=query_key)
+    return [_sequence_result(idx, score) for idx, score in ranked]
 
 
 def is_cache_ready() -> bool:
@@ -618,6 +660,44 @@ def is_cache_ready() -> bool:
     return _cache_initialized
 
 
+# =============================================================================
+# INDEX SNAPSHOTS
+# =============================================================================
+_INDEX_STATE = (
+    '_event_vectorizer', '_sequence_vectorizer', '_event_vectors', '_sequence_vectors',
+    '_event_index', '_sequence_index', '_event_positions', '_sequence_positions'
+)
+
+
+def index_settings() -> Dict:
+    """Settings the index contents depend on (a snapshot is reused only if they match)"""
+    return {'near_ball_radius': NEAR_BALL_RADIUS}
+
+
+def export_index() -> Dict:
+    """Current index state, for persisting with fifa_store.save_index_snapshot"""
+    initialize_cache()
+    return {name: globals()[name] for name in _INDEX_STATE}
+
+
+def _install_index(state: Dict) -> None:
+    global _cache_initialized
+    globals().update({name: state[name] for name in _INDEX_STATE})
+    _cache_initialized = True
+
+
+def reset_cache() -> None:
+    """Reset the TF-IDF cache (rebuilt on next use)"""
+    global _event_vectorizer, _sequence_vectorizer, _event_vectors, _sequence_vectors
+    global _event_index, _sequence_index, _event_positions, _sequence_positions
+    global _cache_initialized
+    _event_vectorizer = _sequence_vectorizer = None
+    _event_vectors = _sequence_vectors = None
+    _event_index, _sequence_index = [], []
+    _event_positions, _sequence_positions = {}, {}
+    _cache_initialized = False
+
+
 # =============================================================================
 # HYBRID SEARCH: Combines DTW + TF-IDF
 # =============================================================================
@@ -627,97 +707,194 @@ HYBRID_WEIGHT_DTW = 0.6
 HYBRID_WEIGHT_TFIDF = 0.4
 HYBRID_INTERNAL_TOP_N = 50  # Fetch more results internally for better merging
 
+# 'exhaustive' runs a full DTW scan and a full TF-IDF scan; 'cascade' lets the
+# cheap TF-IDF cosine pick CASCADE_CANDIDATES sequences and runs DTW only on them
+HYBRID_MODES = ('exhaustive', 'cascade')
+HYBRID_MODE = 'exhaustive'
+CASCADE_CANDIDATES = 300
+
+
+def _elapsed_ms(start: float) -> float:
+    """Milliseconds since a perf_counter() reading."""
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def _fuse_hybrid_results(dtw_results: List[Dict], tfidf_ranked: List[Tuple[int, float]],
+                         top_n: int) -> List[Dict]:
+    """
+    Merge DTW results and TF-IDF (row index, score) pairs by (matchId, sequenceId)
+    key and rank them by (0.6 * DTW_sim) + (0.4 * TFIDF_sim); a missing score
+    counts as 0. TF-IDF payloads are only built for the winners.
+    """
+    # Build lookup maps by (matchId, sequenceId) key
+    dtw_map = {}
+    for r in dtw_results:
+        key = (str(r['matchId']), r['sequenceId'])
+        dtw_map[key] = r
+
+    tfidf_map = {}
+    for idx, score in tfidf_ranked:
+        entry = _sequence_index[idx]
+        key = (str(entry['matchId']), entry['sequenceId'])
+        tfidf_map[key] = (idx, score)
+
+    merged_results = []
+    for combined_score, key, dtw_sim, tfidf_sim in _hybrid_scores(dtw_map, tfidf_map)[:top_n]:
+        dtw_entry = dtw_map.get(key)
 
-def search_similar_sequences_hybrid(query_events: List[Dict],
+        # Use whichever entry exists for metadata (prefer DTW since it has alignment info)
+        base_entry = dtw_entry if dtw_entry else _sequence_result(*tfidf_map[key])
+        merged_results.append(_hybrid_result(base_entry, combined_score, dtw_sim, tfidf_sim))
+
+    return merged_results
+
+
+def _hybrid_scores(dtw_map: Dict[Tuple, Dict],
+                   tfidf_map: Dict[Tuple, Tuple[int, float]]) -> List[Tuple[float, Tuple, float, float]]:
+    """
+    (combined, key, dtw_sim, tfidf_sim) for every key in either map, best first;
+    ties are broken by key so the order is reproducible across processes.
+    """
+    scored = []
+    for key in set(dtw_map.keys()) | set(tfidf_map.keys()):
+        dtw_entry = dtw_map.get(key)
+
+        # Get similarity scores (0 if missing)
+        dtw_sim = dtw_entry['similarity'] if dtw_entry else 0.0
+        tfidf_sim = round(tfidf_map[key][1], 3) if key in tfidf_map else 0.0
+
+        # Combined score
+        combined_score = (HYBRID_WEIGHT_DTW * dtw_sim) + (HYBRID_WEIGHT_TFIDF * tfidf_sim)
+        scored.append((round(combined_score, 3), key, dtw_sim, tfidf_sim))
+
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return scored
+
+
+def _hybrid_result(base_entry: Dict, combined_score: float, dtw_sim: float, tfidf_sim: float) -> Dict:
+    """Build the hybrid response entry from a DTW or TF-IDF result."""
+    return {
+        'matchId': base_entry['matchId'],
+        'sequenceId': base_entry['sequenceId'],
+        'setpieceType': base_entry.get('setpieceType', ''),
+        'teamId': base_entry.get('teamId', ''),
+        'time': base_entry.get('time', ''),
+        'events': base_entry.get('events', []),
+        'homeTeam': base_entry.get('homeTeam', ''),
+        'awayTeam': base_entry.get('awayTeam', ''),
+        'eventCount': base_entry.get('eventCount', 0),
+        'similarity': combined_score,
+        'dtwSimilarity': round(dtw_sim, 3),
+        'tfidfSimilarity': round(tfidf_sim, 3),
+        'alignmentPath': base_entry.get('alignmentPath')
+    }
+
+
+def search_similar_sequences_hybrid(query_events: Optional[List[Dict]],
                                      exclude_match_id: str = None,
                                      exclude_seq_id: int = None,
-                                     top_n: int = 10) -> List[Dict]:
+                                     top_n: int = 10,
+                                     mode: Optional[str] = None,
+                                     candidate_count: Optional[int] = None,
+                                     stats: Optional[Dict] = None,
+                                     query_key: Optional[Tuple] = None) -> List[Dict]:
     """
     Hybrid search combining DTW (spatial/temporal) and TF-IDF (semantic) similarity.
     
-    Algorithm:
+    Algorithm (exhaustive mode):
     1. Run DTW search with internal top N (e.g., 50)
     2. Run TF-IDF search with internal top N (e.g., 50)
     3. Merge results by (matchId, sequenceId) key
     4. Compute combined score: (0.6 * DTW_sim) + (0.4 * TFIDF_sim)
        - Missing algorithm score = 0 (rewards consensus)
     5. Sort by combined score and return top N
+
+    Cascade mode replaces steps 1-2: the TF-IDF cosine ranks every sequence,
+    its best candidate_count form the candidate set, and DTW only scores those.
     
     Args:
         query_events: List of events in the query sequence
         exclude_match_id: Match ID to exclude
         exclude_seq_id: Sequence ID to exclude
         top_n: Number of results to return
+        mode: 'exhaustive' or 'cascade' (default: HYBRID_MODE)
+        candidate_count: Cascade candidate-set size (default: CASCADE_CANDIDATES)
+        stats: Optional dict filled with the mode, candidate-set size and
+               per-stage timings in milliseconds
+        query_key: Optional (matchId, sequenceId) of an indexed sequence; both
+                   stages reuse its stored vector and DTW features
     
     Returns:
         List of dicts with match info, sequence data, and combined similarity score
     """
-    from .DTW import search_similar_sequences_dtw
+    from .DTW import search_similar_sequences_dtw, attach_alignment_paths
 
-    # 1. Get DTW results (more than top_n for better merging)
+    mode = mode if mode in HYBRID_MODES else HYBRID_MODE
     query_sequence = {'events': query_events}
-    dtw_results = search_similar_sequences_dtw(
-        query_sequence=query_sequence,
-        top_n=HYBRID_INTERNAL_TOP_N,
-        exclude_match_id=str(exclude_match_id) if exclude_match_id else None,
-        exclude_seq_id=exclude_seq_id
-    )
-
-    # 2. Get TF-IDF results
-    tfidf_results = search_similar_sequences(
-        query_events=query_events,
-        exclude_match_id=exclude_match_id,
-        exclude_seq_id=exclude_seq_id,
-        top_n=HYBRID_INTERNAL_TOP_N
-    )
-
-    # 3. Build lookup maps by (matchId, sequenceId) key
-    dtw_map = {}
-    for r in dtw_results:
-        key = (str(r['matchId']), r['sequenceId'])
-        dtw_map[key] = r
-
-    tfidf_map = {}
-    for r in tfidf_results:
-        key = (str(r['matchId']), r['sequenceId'])
-        tfidf_map[key] = r
-
-    # 4. Collect all unique keys
-    all_keys = set(dtw_map.keys()) | set(tfidf_map.keys())
-
-    # 5. Compute combined scores
-    merged_results = []
-    for key in all_keys:
-        dtw_entry = dtw_map.get(key)
-        tfidf_entry = tfidf_map.get(key)
-
-        # Get similarity scores (0 if missing)
-        dtw_sim = dtw_entry['similarity'] if dtw_entry else 0.0
-        tfidf_sim = tfidf_entry['similarity'] if tfidf_entry else 0.0
-
-        # Combined score
-        combined_score = (HYBRID_WEIGHT_DTW * dtw_sim) + (HYBRID_WEIGHT_TFIDF * tfidf_sim)
-
-        # Use whichever entry exists for metadata (prefer DTW since it has alignment info)
-        base_entry = dtw_entry if dtw_entry else tfidf_entry
-
-        merged_results.append({
-            'matchId': base_entry['matchId'],
-            'sequenceId': base_entry['sequenceId'],
-            'setpieceType': base_entry.get('setpieceType', ''),
-            'teamId': base_entry.get('teamId', ''),
-            'time': base_entry.get('time', ''),
-            'events': base_entry.get('events', []),
-            'homeTeam': base_entry.get('homeTeam', ''),
-            'awayTeam': base_entry.get('awayTeam', ''),
-            'eventCount': base_entry.get('eventCount', 0),
-            'similarity': round(combined_score, 3),
-            'dtwSimilarity': round(dtw_sim, 3),
-            'tfidfSimilarity': round(tfidf_sim, 3),
-            'alignmentPath': dtw_entry.get('alignmentPath') if dtw_entry else None
-        })
-
-    # 6. Sort by combined score (descending) and return top N
-    merged_results.sort(key=lambda x: x['similarity'], reverse=True)
+    dtw_exclude_match_id = str(exclude_match_id) if exclude_match_id else None
+    timings = {}
+    total_start = time.perf_counter()
+
+    if mode == 'cascade':
+        if candidate_count is None:
+            candidate_count = CASCADE_CANDIDATES
+
+        # 1. TF-IDF candidate generation (sparse cosine over all sequences)
+        stage_start = time.perf_counter()
+        ranked = _rank_sequences(query_events, exclude_match_id, exclude_seq_id,
+                                 limit=max(candidate_count, 0), query_key=query_key)
+        tfidf_ranked = [(idx, score) for idx, score in ranked[:HYBRID_INTERNAL_TOP_N] if score >= 0.01]
+        timings['tfidfMs'] = _elapsed_ms(stage_start)
+
+        # 2. DTW re-ranking restricted to the candidate set
+        stage_start = time.perf_counter()
+        candidates = [
+            (str(_sequence_index[idx]['matchId']), _sequence_index[idx]['sequenceId'])
+            for idx, _ in ranked
+        ]
+        dtw_results = search_similar_sequences_dtw(
+            query_sequence=query_sequence,
+            top_n=HYBRID_INTERNAL_TOP_N,
+            exclude_match_id=dtw_exclude_match_id,
+            exclude_seq_id=exclude_seq_id,
+            candidates=candidates,
+            include_paths=False,
+            query_key=query_key
+        ) if candidates else []
+        timings['dtwMs'] = _elapsed_ms(stage_start)
+        candidate_total = len(candidates)
+    else:
+        # 1. Get DTW results (more than top_n for better merging)
+        stage_start = time.perf_counter()
+        dtw_results = search_similar_sequences_dtw(
+            query_sequence=query_sequence,
+            top_n=HYBRID_INTERNAL_TOP_N,
+            exclude_match_id=dtw_exclude_match_id,
+            exclude_seq_id=exclude_seq_id,
+            include_paths=False,
+            query_key=query_key
+        )
+        timings['dtwMs'] = _elapsed_ms(stage_start)
+
+        # 2. Get TF-IDF results
+        stage_start = time.perf_counter()
+        tfidf_ranked = _rank_sequences(query_events, exclude_match_id, exclude_seq_id,
+                                       limit=HYBRID_INTERNAL_TOP_N, min_score=0.01,
+                                       query_key=query_key)
+        timings['tfidfMs'] = _elapsed_ms(stage_start)
+        candidate_total = len(_sequence_index)
+
+    # 3-5. Merge, score and rank; alignment paths only for the DTW-backed winners
+    stage_start = time.perf_counter()
+    results = _fuse_hybrid_results(dtw_results, tfidf_ranked, top_n)
+    dtw_keys = {(str(r['matchId']), r['sequenceId']) for r in dtw_results}
+    attach_alignment_paths(query_sequence, [
+        r for r in results if (str(r['matchId']), r['sequenceId']) in dtw_keys
+    ], query_key=query_key)
+    timings['fusionMs'] = _elapsed_ms(stage_start)
+    timings['totalMs'] = _elapsed_ms(total_start)
+
+    if stats is not None:
+        stats.update({'mode': mode, 'candidateCount': candidate_total, 'timings': timings})
 
-    return merged_results[:top_n]
+    return results
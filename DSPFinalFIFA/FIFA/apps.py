@@ -26,18 +26,19 @@ class FIFAConfig(AppConfig):
         thread.start()
 
     def _warm_caches(self):
-        """Initialize both search caches in background"""
+        """Build the match manifest and initialize both search caches in background"""
         try:
             # Import here to avoid circular imports
-            from . import TF_IDF, DTW
+            from .ingest import warm_indexes
+            from .match_manifest import get_match_manifest
 
             print("[FIFA] Warming search caches in background...")
 
-            # Initialize TF-IDF cache
-            TF_IDF.initialize_cache()
+            # Match listing and per-match statistics served by / and /api/matches/
+            get_match_manifest()
 
-            # Initialize DTW cache
-            DTW.ensure_index_initialized()
+            # TF-IDF, DTW and any registered index: snapshots or one shared ingest pass
+            warm_indexes()
 
             print("[FIFA] Search caches ready!")
 
@@ -0,0 +1,192 @@
+"""
+Match Data Access Layer
+Single owner of the Metadata / Event Data / Rosters files: reads them, keeps
+the parsed results in one shared cache, and serves both fifa.Match and
+views.DataLoader. Concurrent first loads of a file are collapsed into one.
+"""
+import json
+import threading
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Any, Callable, Hashable, NamedTuple
+
+from .fifa import DATA_DIR
+from .lru import ByteBudgetLRU, estimate_size
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+DATA_CACHE_BYTES = 512 * 1024 * 1024  # Budget for parsed events and rosters of all matches
+
+
+class MatchEvents(NamedTuple):
+    """A match's events plus the columnar store backing them (None = parsed JSON)"""
+    events: Any
+    store: Any
+
+
+def data_path(folder: str, match_id: str) -> Path:
+    return DATA_DIR / folder / f'{match_id}.json'
+
+
+def file_stamp(folder: str, match_id: str) -> Optional[Tuple[int, int]]:
+    """(size, mtime) of a match's data file, None when it does not exist"""
+    try:
+        stat = data_path(folder, match_id).stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_json(folder: str, match_id: str) -> Any:
+    with open(data_path(folder, match_id), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# =============================================================================
+# SINGLE-FLIGHT LOADING
+# =============================================================================
+class _Flight:
+    """One in-progress load that other threads wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+_flights: Dict[Hashable, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def _single_flight(key: Hashable, load: Callable[[], Any]) -> Any:
+    """Run load() once for all threads asking for key at the same time"""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        flight.value = load()
+        return flight.value
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+# =============================================================================
+# CACHES
+# =============================================================================
+_metadata: Dict[str, Tuple[Any, Optional[Dict]]] = {}  # Small: kept for every match
+_data = ByteBudgetLRU(DATA_CACHE_BYTES, name='MatchData')  # (kind, match_id) -> (stamp, value)
+
+
+def _cached(kind: str, folder: str, match_id: str, parse: Callable[[], Any],
+            sizeof: Optional[Callable[[Any], int]] = None) -> Any:
+    """
+    Parsed value of one data file, reloaded when the file's size or mtime
+    changes. parse() runs without locks held, once per concurrent miss.
+    """
+    match_id = str(match_id)
+    key = (kind, match_id)
+    stamp = file_stamp(folder, match_id)
+    entry = _data.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+
+    def load():
+        value = parse() if stamp is not None else None
+        _data.put(key, (stamp, value), size=sizeof(value) if sizeof else None)
+        return value
+
+    return _single_flight((key, stamp), load)
+
+
+def load_metadata(match_id: str) -> Optional[Dict]:
+    """Match metadata (teams, kits, stadium, ...), None when the file is missing"""
+    match_id = str(match_id)
+    stamp = file_stamp('Metadata', match_id)
+    entry = _metadata.get(match_id)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+
+    def load():
+        data = _read_json('Metadata', match_id) if stamp is not None else None
+        # Metadata format: single object wrapped in array
+        data = data[0] if isinstance(data, list) and data else data
+        _metadata[match_id] = (stamp, data)
+        return data
+
+    return _single_flight(('metadata', match_id, stamp), load)
+
+
+def load_events(match_id: str) -> MatchEvents:
+    """
+    A match's raw events: rows decoded lazily from the columnar store when
+    one is available, else the parsed JSON ([] when the file is missing).
+    """
+    match_id = str(match_id)
+
+    def parse() -> MatchEvents:
+        from .event_store import open_event_store
+
+        store = open_event_store(match_id)
+        if store is not None:
+            return MatchEvents(store.rows(), store)
+        return MatchEvents(_read_json('Event Data', match_id), None)
+
+    def sizeof(value: Optional[MatchEvents]) -> int:
+        # Store rows are memory-mapped
+        return estimate_size(value.events) if value is not None and value.store is None else 0
+
+    return _cached('events', 'Event Data', match_id, parse, sizeof) or MatchEvents([], None)
+
+
+def load_roster(match_id: str) -> List[Dict]:
+    """A match's roster entries ([] when the file is missing)"""
+    match_id = str(match_id)
+    return _cached('roster', 'Rosters', match_id, lambda: _read_json('Rosters', match_id)) or []
+
+
+def roster_names(match_id: str) -> Dict[Any, str]:
+    """Player id (as stored in the roster) -> nickname"""
+    match_id = str(match_id)
+
+    def parse() -> Dict[Any, str]:
+        return {
+            p.get('player', {}).get('id'): p.get('player', {}).get('nickname', '')
+            for p in load_roster(match_id)
+            if p.get('player', {}).get('id')
+        }
+
+    return _cached('roster_names', 'Rosters', match_id, parse) or {}
+
+
+def get_all_match_ids() -> List[str]:
+    """IDs of every match with a metadata file, sorted"""
+    metadata_dir = DATA_DIR / 'Metadata'
+    if not metadata_dir.exists():
+        return []
+    return sorted(f.stem for f in metadata_dir.glob('*.json'))
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Events/roster cache usage and hit/miss/eviction counters"""
+    return dict(_data.stats(), metadata=len(_metadata))
+
+
+def clear_cache() -> None:
+    """Forget every parsed file (metadata included)"""
+    _metadata.clear()
+    _data.clear()
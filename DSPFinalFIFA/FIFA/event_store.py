@@ -0,0 +1,572 @@
+"""
+Columnar Event Store
+Converts each Event Data JSON file into one memory-mapped file of fixed-width
+columns, so loading a match is a page-in shared by every worker process
+"""
+import json
+import os
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Any, Iterator
+
+import numpy as np
+
+from .fifa import CACHE_DIR, DATA_DIR
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+EVENT_STORE_ENABLED = True          # False = always json.load the Event Data files
+EVENT_STORE_DIR = CACHE_DIR / 'events'
+STORE_VERSION = 1
+ITER_BLOCK_SIZE = 512               # Events decoded per batch when iterating
+
+# Top-level list-of-dict fields stored as fixed-width record slots, with the
+# numeric keys in a dense (rows, slots, 3) float64 block
+RECORD_FIELDS = {
+    'ball': ('ball', ('x', 'y', 'z')),
+    'homePlayers': ('players', ('x', 'y', 'speed')),
+    'awayPlayers': ('players', ('x', 'y', 'speed')),
+}
+
+_MAGIC = b'FIFAEVT1'
+_ALIGN = 64
+
+
+# =============================================================================
+# VALUE COLUMNS
+# =============================================================================
+# Every scalar field is stored so that decoding returns exactly what json.load
+# returned: integers as int64 (two sentinels for None / absent key), numbers as
+# float64 with a state byte, anything else dictionary-encoded (nested values
+# as JSON text). Absent keys decode to _MISSING and are left out of the dict.
+_MISSING = object()
+
+_INT_MISSING = np.iinfo(np.int64).min
+_INT_NONE = _INT_MISSING + 1
+_MAX_EXACT_FLOAT_INT = 2 ** 53
+
+_STATE_FLOAT, _STATE_INT, _STATE_NONE, _STATE_MISSING = 0, 1, 2, 3
+
+_COUNT_NONE, _COUNT_MISSING = -1, -2  # Record slot counts for None / absent lists
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _encode_values(values: List[Any], shape: Tuple[int, ...]) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Encode one column of JSON values. Returns (spec, arrays)."""
+    present = [v for v in values if v is not _MISSING and v is not None]
+
+    if present and all(_is_int(v) and _INT_NONE < v <= np.iinfo(np.int64).max for v in present):
+        data = np.array([
+            _INT_MISSING if v is _MISSING else _INT_NONE if v is None else v for v in values
+        ], dtype=np.int64)
+        return {'kind': 'int'}, {'data': data.reshape(shape)}
+
+    if present and all(_is_number(v) and (not _is_int(v) or abs(v) <= _MAX_EXACT_FLOAT_INT) for v in present):
+        data = np.array([v if _is_number(v) else np.nan for v in values], dtype=np.float64)
+        state = np.array([
+            _STATE_MISSING if v is _MISSING else _STATE_NONE if v is None else
+            _STATE_INT if _is_int(v) else _STATE_FLOAT
+            for v in values
+        ], dtype=np.int8)
+        return {'kind': 'float'}, {'data': data.reshape(shape), 'state': state.reshape(shape)}
+
+    nested = any(isinstance(v, (dict, list)) for v in present)
+    vocab: List[Any] = []
+    lookup: Dict[Any, int] = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for n, value in enumerate(values):
+        if value is _MISSING:
+            codes[n] = -1
+            continue
+        token = json.dumps(value) if nested else value
+        key = (type(token).__name__, token)  # keeps True apart from 1
+        code = lookup.get(key)
+        if code is None:
+            code = lookup[key] = len(vocab)
+            vocab.append(token)
+        codes[n] = code
+    return {'kind': 'json' if nested else 'dict', 'vocab': vocab}, {'codes': codes.reshape(shape)}
+
+
+def _decode_values(spec: Dict, arrays: Dict[str, np.ndarray]) -> List[Any]:
+    """Decode (already row-selected, flattened) column arrays to Python values."""
+    kind = spec['kind']
+    if kind == 'int':
+        data = arrays['data']
+        values = data.tolist()
+        if data.size and data.min() <= _INT_NONE:
+            values = [_MISSING if v == _INT_MISSING else None if v == _INT_NONE else v for v in values]
+        return values
+
+    if kind == 'float':
+        values = arrays['data'].tolist()
+        state = arrays['state']
+        if not state.any():
+            return values
+        return [
+            v if s == _STATE_FLOAT else int(v) if s == _STATE_INT else None if s == _STATE_NONE else _MISSING
+            for v, s in zip(values, state.tolist())
+        ]
+
+    vocab = spec['vocab']
+    if kind == 'json':
+        return [_MISSING if c < 0 else json.loads(vocab[c]) for c in arrays['codes'].tolist()]
+    return [_MISSING if c < 0 else vocab[c] for c in arrays['codes'].tolist()]
+
+
+# =============================================================================
+# INGEST
+# =============================================================================
+def _field_layout(events: List[Dict]) -> List[Dict]:
+    """Decide how each top-level key is stored, in first-seen key order."""
+    seen: Dict[str, List[Any]] = {}
+    for event in events:
+        for key, value in event.items():
+            seen.setdefault(key, []).append(value)
+
+    fields = []
+    for key, values in seen.items():
+        present = [v for v in values if v is not None]
+        if key in RECORD_FIELDS and all(
+            isinstance(v, list) and all(isinstance(r, dict) for r in v) for v in present
+        ):
+            group, dense = RECORD_FIELDS[key]
+            keys: Dict[str, None] = {}
+            for records in present:
+                for record in records:
+                    keys.update(dict.fromkeys(record))
+            width = max((len(v) for v in present), default=0)
+            fields.append({'key': key, 'type': 'records', 'group': group, 'dense': list(dense),
+                           'keys': list(keys), 'width': width})
+        elif present and all(isinstance(v, dict) for v in present):
+            keys = {}
+            for value in present:
+                keys.update(dict.fromkeys(value))
+            fields.append({'key': key, 'type': 'object', 'keys': list(keys)})
+        else:
+            fields.append({'key': key, 'type': 'value'})
+    return fields
+
+
+def _encode_key_orders(values: List[Any], shape: Tuple[int, ...],
+                       orders: List[List[str]], lookup: Dict[Tuple, int]) -> np.ndarray:
+    """
+    Code each dict's key order into the shared orders vocabulary, so decoded
+    dicts serialize byte-identically (-2 = absent, -1 = None).
+    """
+    codes = np.empty(len(values), dtype=np.int32)
+    for n, value in enumerate(values):
+        if value is _MISSING:
+            codes[n] = _COUNT_MISSING
+        elif value is None:
+            codes[n] = _COUNT_NONE
+        else:
+            key = tuple(value)
+            code = lookup.get(key)
+            if code is None:
+                code = lookup[key] = len(orders)
+                orders.append(list(key))
+            codes[n] = code
+    return codes.reshape(shape)
+
+
+def _encode_events(events: List[Dict]) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Columnar encoding of a match's events. Returns (header, arrays)."""
+    n = len(events)
+    fields = _field_layout(events)
+    columns: Dict[str, Dict] = {}
+    arrays: Dict[str, np.ndarray] = {}
+    orders: List[List[str]] = []
+    order_lookup: Dict[Tuple, int] = {}
+
+    arrays['#order'] = _encode_key_orders(events, (n,), orders, order_lookup)
+
+    def add_column(name: str, values: List[Any], shape: Tuple[int, ...]) -> None:
+        spec, parts = _encode_values(values, shape)
+        columns[name] = spec
+        for part, array in parts.items():
+            arrays[f'{name}:{part}'] = array
+
+    # Record groups sharing one dense block (home and away players -> N x 22 x 3)
+    groups: Dict[str, List[Dict]] = {}
+    for field in fields:
+        if field['type'] == 'records':
+            field['start'] = sum(f['width'] for f in groups.get(field['group'], []))
+            groups.setdefault(field['group'], []).append(field)
+    for group, members in groups.items():
+        width = sum(f['width'] for f in members)
+        arrays[f'{group}.#dense'] = np.full((n, width, 3), np.nan, dtype=np.float64)
+        arrays[f'{group}.#dense_state'] = np.full((n, width, 3), _STATE_MISSING, dtype=np.int8)
+
+    for field in fields:
+        key = field['key']
+        raw = [event.get(key, _MISSING) for event in events]
+
+        if field['type'] == 'value':
+            add_column(key, raw, (n,))
+
+        elif field['type'] == 'object':
+            arrays[f'{key}.#order'] = _encode_key_orders(raw, (n,), orders, order_lookup)
+            for sub in field['keys']:
+                add_column(f'{key}.{sub}', [
+                    v.get(sub, _MISSING) if isinstance(v, dict) else _MISSING for v in raw
+                ], (n,))
+
+        else:
+            width, start, dense = field['width'], field['start'], field['dense']
+            arrays[f'{key}.#count'] = np.array([
+                _COUNT_MISSING if v is _MISSING else _COUNT_NONE if v is None else len(v) for v in raw
+            ], dtype=np.int16)
+            block = arrays[f"{field['group']}.#dense"]
+            block_state = arrays[f"{field['group']}.#dense_state"]
+            slots = [(v if isinstance(v, list) else []) for v in raw]
+            for row, records in enumerate(slots):
+                for slot, record in enumerate(records):
+                    for d, name in enumerate(dense):
+                        value = record.get(name, _MISSING)
+                        if _is_number(value) and (not _is_int(value) or abs(value) <= _MAX_EXACT_FLOAT_INT):
+                            block[row, start + slot, d] = value
+                            block_state[row, start + slot, d] = _STATE_INT if _is_int(value) else _STATE_FLOAT
+                        elif value is None:
+                            block_state[row, start + slot, d] = _STATE_NONE
+                        elif value is not _MISSING:
+                            raise ValueError(f"non-numeric {key}.{name} in event {row}")
+            arrays[f'{key}.#order'] = _encode_key_orders([
+                records[slot] if slot < len(records) else _MISSING
+                for records in slots for slot in range(width)
+            ], (n, width), orders, order_lookup)
+            for attr in field['keys']:
+                if attr in dense:
+                    continue
+                add_column(f'{key}.{attr}', [
+                    records[slot].get(attr, _MISSING) if slot < len(records) else _MISSING
+                    for records in slots for slot in range(width)
+                ], (n, width))
+
+    return {'rows': n, 'fields': fields, 'columns': columns, 'orders': orders}, arrays
+
+
+def _write_store(path: Path, header: Dict, arrays: Dict[str, np.ndarray]) -> None:
+    """One file: magic, header length, JSON header, then 64-byte aligned arrays."""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // _ALIGN) * _ALIGN
+        layout[name] = [offset, array.dtype.str, list(array.shape)]
+        offset += array.nbytes
+    header = dict(header, arrays=layout)
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = -(-(len(_MAGIC) + 8 + len(header_bytes)) // _ALIGN) * _ALIGN
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_MAGIC)
+        f.write(len(header_bytes).to_bytes(8, 'little'))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][0])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def events_path(match_id: str) -> Path:
+    return DATA_DIR / 'Event Data' / f'{match_id}.json'
+
+
+def store_path(match_id: str) -> Path:
+    return EVENT_STORE_DIR / f'{match_id}.events'
+
+
+def _source_stamp(path: Path) -> Optional[Dict[str, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return {'size': stat.st_size, 'mtimeNs': stat.st_mtime_ns}
+
+
+def build_event_store(match_id: str, events: Optional[List[Dict]] = None) -> Optional[Path]:
+    """
+    Convert one Event Data JSON file into its columnar store file.
+    Returns the store path, or None if the match has no event file.
+    """
+    source = events_path(match_id)
+    stamp = _source_stamp(source)  # Taken before reading: a concurrent edit forces a rebuild
+    if stamp is None:
+        return None
+
+    if events is None:
+        with open(source, 'r', encoding='utf-8') as f:
+            events = json.load(f)
+
+    header, arrays = _encode_events(events)
+    header.update({'version': STORE_VERSION, 'matchId': match_id, 'source': stamp})
+    path = store_path(match_id)
+    _write_store(path, header, arrays)
+    print(f"[EventStore] Built {path.name}: {header['rows']} events, "
+          f"{path.stat().st_size / 1024:.0f} KB (source {stamp['size'] / 1024:.0f} KB)")
+    return path
+
+
+# =============================================================================
+# READING
+# =============================================================================
+class EventStore:
+    """
+    Read-only view of one match's columnar events. Arrays are slices of a
+    single np.memmap, so nothing is read until it is touched.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not an event store")
+            header_length = int.from_bytes(f.read(8), 'little')
+            self.header = json.loads(f.read(header_length).decode('utf-8'))
+        data_start = -(-(len(_MAGIC) + 8 + header_length) // _ALIGN) * _ALIGN
+
+        self.path = path
+        self._mmap = np.memmap(path, dtype=np.uint8, mode='r')
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (offset, dtype, shape) in self.header['arrays'].items():
+            self.arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=self._mmap,
+                                           offset=data_start + offset)
+        self.fields = self.header['fields']
+        self.columns = self.header['columns']
+
+    def __len__(self) -> int:
+        return self.header['rows']
+
+    @property
+    def source(self) -> Dict[str, int]:
+        return self.header['source']
+
+    # ---- Numeric views --------------------------------------------------------
+    @property
+    def ball_xyz(self) -> np.ndarray:
+        """(N, 3) ball x, y, z (NaN where absent)."""
+        return self.arrays['ball.#dense'][:, 0, :]
+
+    @property
+    def player_xys(self) -> np.ndarray:
+        """(N, slots, 3) player x, y, speed; home slots first, then away."""
+        return self.arrays['players.#dense']
+
+    def column(self, name: str, rows: Optional[np.ndarray] = None) -> List[Any]:
+        """Decoded values of one scalar column (absent keys as None)."""
+        values = self._decode(name, rows)
+        return [None if v is _MISSING else v for v in values]
+
+    # ---- Vectorized predicates ------------------------------------------------
+    def equals(self, name: str, value: Any) -> np.ndarray:
+        """Boolean mask of rows whose column equals value."""
+        spec = self.columns.get(name)
+        if spec is None:
+            return np.zeros(len(self), dtype=bool)
+        if spec['kind'] == 'int':
+            return self.arrays[f'{name}:data'] == value if _is_int(value) else np.zeros(len(self), dtype=bool)
+        if spec['kind'] == 'float':
+            state = self.arrays[f'{name}:state']
+            return (self.arrays[f'{name}:data'] == value) & (state <= _STATE_INT) if _is_number(value) \
+                else np.zeros(len(self), dtype=bool)
+        matches = [c for c, token in enumerate(spec['vocab']) if spec['kind'] == 'dict' and
+                   type(token) is type(value) and token == value]
+        return np.isin(self.arrays[f'{name}:codes'], matches)
+
+    def truthy(self, name: str) -> np.ndarray:
+        """Boolean mask of rows whose column holds a truthy value."""
+        spec = self.columns.get(name)
+        if spec is None:
+            return np.zeros(len(self), dtype=bool)
+        if spec['kind'] == 'int':
+            data = self.arrays[f'{name}:data']
+            return (data != 0) & (data > _INT_NONE)
+        if spec['kind'] == 'float':
+            return (self.arrays[f'{name}:data'] != 0) & (self.arrays[f'{name}:state'] <= _STATE_INT)
+        vocab = spec['vocab']
+        truthy_codes = [c for c, token in enumerate(vocab)
+                        if (json.loads(token) if spec['kind'] == 'json' else token)]
+        return np.isin(self.arrays[f'{name}:codes'], truthy_codes)
+
+    # ---- Event reconstruction -------------------------------------------------
+    def _decode(self, name: str, rows: Optional[np.ndarray]) -> List[Any]:
+        spec = self.columns[name]
+        parts = {}
+        for part in ('data', 'state', 'codes'):
+            array = self.arrays.get(f'{name}:{part}')
+            if array is not None:
+                parts[part] = (array if rows is None else array[rows]).reshape(-1)
+        return _decode_values(spec, parts)
+
+    def events(self, rows: np.ndarray) -> List[Dict]:
+        """Rebuild the original JSON events for the given row indices."""
+        rows = np.asarray(rows, dtype=np.int64)
+        orders = self.header['orders']
+        out: List[Dict] = [{} for _ in range(len(rows))]
+
+        for field in self.fields:
+            key = field['key']
+
+            if field['type'] == 'value':
+                for event, value in zip(out, self._decode(key, rows)):
+                    if value is not _MISSING:
+                        event[key] = value
+
+            elif field['type'] == 'object':
+                codes = self.arrays[f'{key}.#order'][rows].tolist()
+                subs = {sub: self._decode(f'{key}.{sub}', rows) for sub in field['keys']}
+                for r, event in enumerate(out):
+                    code = codes[r]
+                    if code == _COUNT_MISSING:
+                        continue
+                    event[key] = None if code == _COUNT_NONE else {
+                        sub: subs[sub][r] for sub in orders[code]
+                    }
+
+            else:
+                width, start, dense = field['width'], field['start'], field['dense']
+                counts = self.arrays[f'{key}.#count'][rows].tolist()
+                slot_orders = self.arrays[f'{key}.#order'][rows].tolist()
+                block = self.arrays[f"{field['group']}.#dense"][rows, start:start + width].tolist()
+                block_state = self.arrays[f"{field['group']}.#dense_state"][rows, start:start + width].tolist()
+                attrs = {attr: self._decode(f'{key}.{attr}', rows) for attr in field['keys'] if attr not in dense}
+                dense_index = {name: d for d, name in enumerate(dense)}
+
+                for r, event in enumerate(out):
+                    count = counts[r]
+                    if count == _COUNT_MISSING:
+                        continue
+                    if count == _COUNT_NONE:
+                        event[key] = None
+                        continue
+                    records = []
+                    for slot in range(count):
+                        record = {}
+                        for attr in orders[slot_orders[r][slot]]:
+                            d = dense_index.get(attr)
+                            if d is None:
+                                value = attrs[attr][r * width + slot]
+                            else:
+                                s = block_state[r][slot][d]
+                                value = (block[r][slot][d] if s == _STATE_FLOAT else
+                                         int(block[r][slot][d]) if s == _STATE_INT else None)
+                            record[attr] = value
+                        records.append(record)
+                    event[key] = records
+
+        # Restore each event's own key order
+        codes = self.arrays['#order'][rows].tolist()
+        return [{name: event[name] for name in orders[code]} for event, code in zip(out, codes)]
+
+    def rows(self) -> 'EventRows':
+        return EventRows(self)
+
+
+class EventRows(Sequence):
+    """
+    List-like access to a store's events, decoded on demand.
+    Drop-in for the json.load list: len(), [i], iteration.
+    """
+
+    def __init__(self, store: EventStore):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.store.events(np.arange(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('event index out of range')
+        return self.store.events(np.array([index]))[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        for _, event in self.iter_rows(np.arange(len(self))):
+            yield event
+
+    def iter_rows(self, rows: np.ndarray) -> Iterator[Tuple[int, Dict]]:
+        """(row index, event) for the given rows, decoded in blocks."""
+        for start in range(0, len(rows), ITER_BLOCK_SIZE):
+            block = rows[start:start + ITER_BLOCK_SIZE]
+            yield from zip(block.tolist(), self.store.events(block))
+
+
+# =============================================================================
+# STORE CACHE
+# =============================================================================
+_open_stores: Dict[str, EventStore] = {}
+_failed_stores: Dict[str, Dict[str, int]] = {}  # match_id -> source stamp whose store could not be used
+_store_lock = threading.Lock()  # Guards the two dicts; stores are built without it
+
+
+def open_event_store(match_id: str, build: bool = True) -> Optional[EventStore]:
+    """
+    Open a match's event store, (re)building it first when it is missing or
+    older than its JSON source. Returns None when stores are disabled, the
+    match has no event file, or the store cannot be built (not retried until
+    the source changes). Concurrent first opens of a match share one build.
+    """
+    from .data_access import _single_flight
+
+    if not EVENT_STORE_ENABLED:
+        return None
+
+    stamp = _source_stamp(events_path(match_id))
+    if stamp is None:
+        return None
+
+    with _store_lock:
+        store = _open_stores.get(match_id)
+        if store is not None and store.source == stamp:
+            return store
+        if _failed_stores.get(match_id) == stamp:
+            return None
+
+    def load() -> Optional[EventStore]:
+        path = store_path(match_id)
+        failed = False
+        try:
+            store = EventStore(path) if path.exists() else None
+            if store is not None and (store.source != stamp or store.header.get('version') != STORE_VERSION):
+                store = None
+            if store is None and build:
+                built = build_event_store(match_id)
+                store = EventStore(built) if built is not None else None
+        except Exception as e:
+            print(f"[EventStore] Cannot use store for {match_id}, falling back to JSON: {e}")
+            store, failed = None, True
+
+        with _store_lock:
+            if store is None:
+                _open_stores.pop(match_id, None)
+            else:
+                _open_stores[match_id] = store
+            if failed:
+                _failed_stores[match_id] = stamp
+            else:
+                _failed_stores.pop(match_id, None)
+        return store
+
+    return _single_flight(('event_store', match_id, stamp['size'], stamp['mtimeNs'], build), load)
+
+
+def reset_event_stores() -> None:
+    """Forget opened stores and failed builds (files stay on disk)"""
+    with _store_lock:
+        _open_stores.clear()
+        _failed_stores.clear()
@@ -2,21 +2,29 @@
 FIFA World Cup 2022 Data Visualization
 OOP-based implementation with 4 principles: Encapsulation, Abstraction, Inheritance, Polymorphism
 """
+import hashlib
 import json
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Tuple
 from pathlib import Path
-from django.http import JsonResponse
+import numpy as np
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 
+from .http_cache import conditional_get
+from .lru import ByteBudgetLRU
+
 
 # =============================================================================
 # DATA PATH CONFIGURATION
 # =============================================================================
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / 'FIFA_datan'
+DATA_FOLDERS = ('Metadata', 'Event Data', 'Rosters')
+CACHE_DIR = DATA_DIR / 'cache'  # Derived artifacts (event stores, neighbour tables)
+MATCH_CACHE_BYTES = 256 * 1024 * 1024  # Budget for derived plays/goals of all matches together
 
 # Event type mapping for display
 EVENT_LABELS = {
@@ -42,6 +50,27 @@ SETPIECE_LABELS = {
     'F': 'Free Kick'
 }
 
+# Goal context: passes of the goal's sequence and the GOAL_PRECEDING_SEQUENCES
+# before it, among the last GOAL_LOOKBACK_EVENTS events; the last GOAL_PASS_LIMIT are kept
+GOAL_PRECEDING_SEQUENCES = 3
+GOAL_LOOKBACK_EVENTS = 20     # None = whole sequences, no event window
+GOAL_PASS_LIMIT = 5
+
+# api_match_plays pagination: largest page a client may ask for
+PLAYS_PAGE_MAX = 500
+
+# Search parameters that must be non-negative integers (GET query or POST body)
+SEARCH_COUNT_PARAMS = ('topN', 'candidates')
+
+
+def goal_settings() -> Dict[str, Any]:
+    """Settings find_goals output depends on (prebuilt goals are reused only if they match)"""
+    return {
+        'precedingSequences': GOAL_PRECEDING_SEQUENCES,
+        'lookbackEvents': GOAL_LOOKBACK_EVENTS,
+        'passLimit': GOAL_PASS_LIMIT
+    }
+
 
 # =============================================================================
 # ENCAPSULATION: Data classes encapsulate related data and behavior
@@ -105,6 +134,167 @@ class Team:
         }
 
 
+def parse_game_clock(value: Any) -> Optional[float]:
+    """Seconds of a 'MM:SS' game clock (or a plain number of seconds), None when unparseable"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parts = [float(part) for part in str(value).strip().split(':')]
+    except ValueError:
+        return None
+    if not 1 <= len(parts) <= 3:
+        return None
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+@dataclass(frozen=True)
+class SequenceWindows:
+    """
+    Period and game-clock span of each api_match_plays sequence, as arrays
+    aligned with PlaysTable.sequences, so pages are selected without
+    touching the sequence dicts.
+    """
+    sequence_ids: np.ndarray      # Ascending, as served
+    periods: np.ndarray           # Period of each sequence's first event
+    start_clocks: np.ndarray      # Earliest game clock (seconds) of each sequence, NaN when unknown
+    end_clocks: np.ndarray        # Latest game clock (seconds) of each sequence, NaN when unknown
+
+    @classmethod
+    def build(cls, sequences: Tuple[Dict, ...]) -> 'SequenceWindows':
+        starts, ends = [], []
+        for sequence in sequences:
+            clocks = [c for c in (parse_game_clock(p.get('time')) for p in sequence['events']) if c is not None]
+            starts.append(min(clocks) if clocks else np.nan)
+            ends.append(max(clocks) if clocks else np.nan)
+        return cls(
+            np.array([s['sequenceId'] for s in sequences], dtype=np.int64),
+            np.array([s['events'][0].get('period') or 0 for s in sequences], dtype=np.int64),
+            np.array(starts, dtype=np.float64),
+            np.array(ends, dtype=np.float64)
+        )
+
+    def select(self, period: Optional[int] = None, clock_from: Optional[float] = None,
+               clock_to: Optional[float] = None) -> np.ndarray:
+        """Positions of the sequences in period that overlap [clock_from, clock_to]"""
+        mask = np.ones(len(self.sequence_ids), dtype=bool)
+        if period is not None:
+            mask &= self.periods == period
+        if clock_from is not None:
+            mask &= self.end_clocks >= clock_from
+        if clock_to is not None:
+            mask &= self.start_clocks <= clock_to
+        return np.flatnonzero(mask)
+
+
+@dataclass(frozen=True)
+class PlaysTable:
+    """
+    Read-only plays of one match, built once per version of its data files.
+    The play and sequence dicts are shared by every caller: never mutate them.
+    """
+    plays: Tuple[Dict, ...]
+    groups: Tuple[Dict, ...]      # Every sequence (None included) in first-seen order, for indexing
+    sequences: Tuple[Dict, ...]   # api_match_plays grouping: sorted, plays without a sequence left out
+    windows: SequenceWindows      # Period and clock span of each of sequences
+
+    def page(self, period: Optional[int] = None, clock_from: Optional[float] = None,
+             clock_to: Optional[float] = None, cursor: Optional[int] = None,
+             offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict], int, int]:
+        """
+        One page of sequences matching the filters: those after sequence id
+        `cursor` (if given), skipping `offset`, at most `limit` (None = all).
+        Returns (sequences, number matching the filters, number following the page);
+        the next page starts at offset total - remaining of the filtered list.
+        """
+        rows = self.windows.select(period, clock_from, clock_to)
+        total = len(rows)
+        if cursor is not None:
+            rows = rows[self.windows.sequence_ids[rows] > cursor]
+        rows = rows[offset:]
+        page = rows if limit is None else rows[:limit]
+        return [self.sequences[row] for row in page.tolist()], total, len(rows) - len(page)
+
+    def sequence(self, sequence_id: int) -> Optional[Dict]:
+        """The served sequence with this id, None when there is none"""
+        ids = self.windows.sequence_ids
+        row = int(np.searchsorted(ids, sequence_id))
+        return self.sequences[row] if row < len(ids) and ids[row] == sequence_id else None
+
+
+@dataclass(frozen=True)
+class SequenceIndex:
+    """
+    Event offsets of one match: the event range each sequence spans and the
+    rows of its passes, so a goal's build-up is a slice instead of a scan.
+    """
+    sequence_keys: np.ndarray     # Sorted sequence numbers
+    sequence_starts: np.ndarray   # First event row of each sequence
+    sequence_ends: np.ndarray     # Last event row + 1 of each sequence
+    pass_rows: np.ndarray         # Rows of passes that belong to a sequence, ascending
+    pass_sequences: np.ndarray    # Sequence number of each pass row
+
+    @classmethod
+    def build(cls, sequences: List[Any], is_pass: np.ndarray) -> 'SequenceIndex':
+        """From each event's 'sequence' value and a pass mask, in event order"""
+        seq = np.array([np.nan if v is None else v for v in sequences], dtype=np.float64)
+        valid = ~np.isnan(seq)
+        rows = np.flatnonzero(valid)
+        keys, first = np.unique(seq[rows], return_index=True)
+        last = len(rows) - 1 - np.unique(seq[rows][::-1], return_index=True)[1]
+        pass_rows = np.flatnonzero(valid & is_pass)
+        return cls(keys, rows[first], rows[last] + 1, pass_rows, seq[pass_rows])
+
+    def context_pass_rows(self, goal_row: int, sequence: float,
+                          preceding: int, window: Optional[int]) -> np.ndarray:
+        """
+        Pass rows before goal_row in sequences [sequence - preceding, sequence],
+        limited to the last `window` events (None = no limit).
+        """
+        low_seq = sequence - preceding
+
+        # Earliest event of the sequences in range bounds the slice
+        a = np.searchsorted(self.sequence_keys, low_seq, side='left')
+        b = np.searchsorted(self.sequence_keys, sequence, side='right')
+        start = int(self.sequence_starts[a:b].min()) if b > a else goal_row
+        if window is not None:
+            start = max(start, goal_row - window)
+
+        lo, hi = np.searchsorted(self.pass_rows, [max(start, 0), goal_row])
+        seqs = self.pass_sequences[lo:hi]
+        return self.pass_rows[lo:hi][(seqs >= low_seq) & (seqs <= sequence)]
+
+
+def _player_slots(event: Dict) -> Dict[Any, Tuple[bool, Dict]]:
+    """playerId -> (is home player, position record) for one event"""
+    slots = {}
+    for is_home, key in ((True, 'homePlayers'), (False, 'awayPlayers')):
+        for p in event.get(key) or []:
+            slots.setdefault(p.get('playerId'), (is_home, p))
+    return slots
+
+
+def _api_sequences(groups: Tuple[Dict, ...]) -> List[Dict]:
+    """Sequence grouping served by api_match_plays"""
+    sequences = []
+    for group in groups:
+        seq_id = group['sequenceId']
+        if seq_id is None:
+            continue  # Skip events without sequence
+        first = group['events'][0]
+        sequences.append({
+            'sequenceId': int(seq_id) if seq_id else 0,
+            'teamId': first.get('teamId'),
+            'setpieceType': first.get('setpieceLabel') or first.get('setpieceType') or 'Open Play',
+            'time': next((p.get('time') for p in group['events'] if p.get('time')), ''),
+            'events': group['events']
+        })
+    sequences.sort(key=lambda s: s['sequenceId'])
+    return sequences
+
+
 # =============================================================================
 # ABSTRACTION & INHERITANCE: Abstract base class for events
 # =============================================================================
@@ -301,27 +491,76 @@ class EventFactory:
 class Match:
     """Encapsulates all data for a single match"""
     
-    def __init__(self, match_id: str):
+    def __init__(self, match_id: str, use_prebuilt: bool = True):
         self.match_id = match_id
         self._metadata = None
-        self._events = None
-        self._roster = None
-        self._roster_map = None
+        self._use_prebuilt = use_prebuilt
+        self._prebuilt = None  # Plays/goals from build_fifa_store ({} = none available)
+        self._plays_table: Optional[PlaysTable] = None
+        self._summary: Optional[Dict] = None
+        self._sequence_index: Optional[SequenceIndex] = None
+        self._budgeted = False  # Repository-owned: derived data counts against MatchRepository's budget
+        self._source_version = self._source_stamp()
         self.home_team: Optional[Team] = None
         self.away_team: Optional[Team] = None
         self._load_metadata()
+
+    def _source_stamp(self) -> Tuple:
+        """(folder, size, mtime) of each of this match's data files"""
+        stamp = []
+        for folder in DATA_FOLDERS:
+            try:
+                stat = (DATA_DIR / folder / f'{self.match_id}.json').stat()
+            except OSError:
+                continue
+            stamp.append((folder, stat.st_size, stat.st_mtime_ns))
+        return tuple(stamp)
+
+    def _refresh_if_changed(self):
+        """Drop everything loaded or derived when a data file of this match changed"""
+        stamp = self._source_stamp()
+        if stamp == self._source_version:
+            return
+        print(f"[Match] Data files of {self.match_id} changed, reloading")
+        self._source_version = stamp
+        self.release_data()
+        if self._budgeted:
+            MatchRepository._data_cache.pop(self.match_id)
+        self._load_metadata()
+
+    def data_version(self) -> Tuple:
+        """Version of this match's data files; changes whenever one of them does"""
+        self._refresh_if_changed()
+        return self._source_version
+
+    def release_data(self):
+        """Drop derived plays and goals; metadata and teams stay loaded"""
+        self._prebuilt = None
+        self._plays_table = None
+        self._summary = None
+        self._sequence_index = None
+
+    def data_nbytes(self) -> int:
+        """Estimated heap bytes held by derived plays and goals"""
+        from .lru import estimate_size
+
+        return estimate_size((self._prebuilt, self._plays_table, self._summary, self._sequence_index))
+
+    def _track_data(self, loaded: bool):
+        """Report data use to the memory budget; loading may evict other matches"""
+        if not self._budgeted:
+            return
+        if loaded:
+            MatchRepository._data_cache.put(self.match_id, self, size=self.data_nbytes())
+        else:
+            MatchRepository._data_cache.get(self.match_id)
     
     def _load_metadata(self):
         """Load match metadata"""
-        metadata_path = DATA_DIR / 'Metadata' / f'{self.match_id}.json'
-        if metadata_path.exists():
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list) and len(data) > 0:
-                    self._metadata = data[0]
-                else:
-                    self._metadata = data
-            
+        from . import data_access
+
+        self._metadata = data_access.load_metadata(self.match_id)
+        if self._metadata is not None:
             # Parse teams
             home_data = self._metadata.get('homeTeam', {})
             away_data = self._metadata.get('awayTeam', {})
@@ -346,46 +585,26 @@ class Match:
                 text_color=away_kit.get('primaryTextColor', '#000000')
             )
     
-    def _load_events(self):
-        """Lazy load events data"""
-        if self._events is not None:
-            return
-        
-        events_path = DATA_DIR / 'Event Data' / f'{self.match_id}.json'
-        if events_path.exists():
-            with open(events_path, 'r', encoding='utf-8') as f:
-                self._events = json.load(f)
-        else:
-            self._events = []
+    def _load_events(self) -> Tuple[Any, Any]:
+        """
+        Events data from the shared data layer. Returns (events, store) so
+        callers keep working on them even if the layer evicts them meanwhile.
+        """
+        from . import data_access
+        return data_access.load_events(self.match_id)
     
-    def _load_roster(self):
-        """Load roster data"""
-        if self._roster is not None:
-            return
-            
-        roster_path = DATA_DIR / 'Rosters' / f'{self.match_id}.json'
-        if roster_path.exists():
-            with open(roster_path, 'r', encoding='utf-8') as f:
-                self._roster = json.load(f)
-        else:
-            self._roster = []
-
-        # Build a fast lookup map for player names
-        self._roster_map = {
-            p.get('player', {}).get('id'): p.get('player', {}).get('nickname', '')
-            for p in self._roster
-            if p.get('player', {}).get('id')
-        }
+    def _load_roster(self) -> Dict:
+        """Player name lookup from the shared data layer"""
+        from . import data_access
+        return data_access.roster_names(self.match_id)
     
     def get_player_name(self, player_id: int) -> str:
         """Get player name from roster"""
         if not player_id:
             return ''
-        self._load_roster()
+        roster_map = self._load_roster()
         str_id = str(player_id)
-        if self._roster_map is None:
-            return ''
-        return self._roster_map.get(str_id, '')
+        return roster_map.get(str_id, '')
 
     @staticmethod
     def _extract_ball_position(event: Dict) -> Optional[Dict]:
@@ -476,13 +695,74 @@ class Match:
                 key_player_ids.append(away_duel_id)
         return key_player_ids
 
+    def _load_prebuilt(self) -> Optional[Dict]:
+        """Prebuilt plays and goals, if build_fifa_store ran on the current files"""
+        if not self._use_prebuilt:
+            return None
+        prebuilt = self._prebuilt
+        if prebuilt is None:
+            from .fifa_store import load_match_artifact
+            prebuilt = self._prebuilt = load_match_artifact(self.match_id) or {}
+            self._track_data(loaded=True)
+        else:
+            self._track_data(loaded=False)
+        return prebuilt or None
+
+    @staticmethod
+    def _iter_events(events, rows: Optional[np.ndarray]) -> Iterable[Tuple[int, Dict]]:
+        """(index, event) pairs for the given rows, or for every event when rows is None"""
+        if rows is None:
+            return enumerate(events)
+        if hasattr(events, 'iter_rows'):
+            return events.iter_rows(rows)  # Store rows: decoded in batches
+        return ((row, events[row]) for row in rows.tolist())
+
+    def _get_sequence_index(self, events, store) -> SequenceIndex:
+        """Sequence offsets and pass rows of the match, built once per data version"""
+        index = self._sequence_index
+        if index is None:
+            if store is not None:
+                index = SequenceIndex.build(store.column('sequence'),
+                                            store.equals('possessionEvents.possessionEventType', 'PA'))
+            else:
+                index = SequenceIndex.build(
+                    [e.get('sequence') for e in events],
+                    np.array([(e.get('possessionEvents') or {}).get('possessionEventType') == 'PA'
+                              for e in events], dtype=bool)
+                )
+            self._sequence_index = index
+            self._track_data(loaded=True)
+        return index
+
+    @staticmethod
+    def _goal_rows(store) -> Optional[np.ndarray]:
+        """Indices of valid goal shots, computed on the store columns (None without a store)"""
+        if store is None:
+            return None
+        return np.flatnonzero(store.equals('possessionEvents.shotOutcomeType', 'G') &
+                              ~store.truthy('possessionEvents.nonEvent'))
+
+    @staticmethod
+    def _play_rows(store) -> Optional[np.ndarray]:
+        """Indices of events with a possession type that are not nonEvent (None without a store)"""
+        if store is None:
+            return None
+        return np.flatnonzero(store.truthy('possessionEvents.possessionEventType') &
+                              ~store.truthy('possessionEvents.nonEvent'))
+
     def find_goals(self) -> List[Dict]:
         """Find all goals in the match with preceding pass sequence"""
-        self._load_events()
+        self._refresh_if_changed()
+        prebuilt = self._load_prebuilt()
+        if prebuilt is not None and prebuilt.get('goalSettings') == goal_settings():
+            return prebuilt['goals']
+
+        events, store = self._load_events()
+        index = self._get_sequence_index(events, store)
         goals = []
         seen_goal_times = set()  # Track goals by time to avoid duplicates
 
-        for i, event in enumerate(self._events):
+        for i, event in self._iter_events(events, self._goal_rows(store)):
             game_events = event.get('gameEvents', {})
             poss_events = event.get('possessionEvents', {})
 
@@ -512,64 +792,48 @@ class Match:
 
                 # For penalties, skip pass sequence entirely
                 if not is_penalty and sequence is not None:
-                    # Look back for passes in same or recent sequences
-                    lookback_start = max(0, i - 20)
-                    for j in range(lookback_start, i):
-                        prev_event = self._events[j]
+                    # Passes of the same or the preceding sequences: a slice of the pass rows
+                    rows = index.context_pass_rows(i, sequence, GOAL_PRECEDING_SEQUENCES, GOAL_LOOKBACK_EVENTS)
+                    for _, prev_event in self._iter_events(events, rows):
                         prev_poss = prev_event.get('possessionEvents', {})
                         prev_game = prev_event.get('gameEvents', {})
-                        prev_seq = prev_event.get('sequence')
-
-                        # Include passes from same sequence or 1-2 sequences before
-                        if prev_seq is not None and sequence is not None:
-                            if sequence - 3 <= prev_seq <= sequence:
-                                if prev_poss.get('possessionEventType') == 'PA':
-                                    passer_id = prev_poss.get('passerPlayerId')
-                                    passer_name = prev_poss.get('passerPlayerName', '')
-                                    receiver_id = prev_poss.get('receiverPlayerId') or prev_poss.get('targetPlayerId')
-                                    receiver_name = prev_poss.get('receiverPlayerName', '') or prev_poss.get('targetPlayerName', '')
-
-                                    # Get ball position for pass
-                                    ball_pos = self._extract_ball_position(prev_event)
-
-                                    if passer_name:
-                                        pass_sequence.append({
-                                            'passerName': passer_name,
-                                            'receiverName': receiver_name,
-                                            'time': prev_game.get('startFormattedGameClock', ''),
-                                            'teamId': str(prev_game.get('teamId', '')),
-                                            'ballPosition': ball_pos
-                                        })
-
-                                    # Track involved players and their positions at this moment
-                                    if passer_id:
-                                        involved_player_ids.add(passer_id)
-                                        # Find passer position in this event
-                                        for p in prev_event.get('homePlayers', []) + prev_event.get('awayPlayers', []):
-                                            if p.get('playerId') == passer_id:
-                                                involved_player_positions[passer_id] = {
-                                                    'x': p.get('x', 0),
-                                                    'y': p.get('y', 0),
-                                                    'jerseyNum': p.get('jerseyNum', 0),
-                                                    'playerId': passer_id,
-                                                    'playerName': passer_name,
-                                                    'positionGroupType': p.get('positionGroupType', '')
-                                                }
-                                    if receiver_id:
-                                        involved_player_ids.add(receiver_id)
-                                        for p in prev_event.get('homePlayers', []) + prev_event.get('awayPlayers', []):
-                                            if p.get('playerId') == receiver_id:
-                                                involved_player_positions[receiver_id] = {
-                                                    'x': p.get('x', 0),
-                                                    'y': p.get('y', 0),
-                                                    'jerseyNum': p.get('jerseyNum', 0),
-                                                    'playerId': receiver_id,
-                                                    'playerName': receiver_name,
-                                                    'positionGroupType': p.get('positionGroupType', '')
-                                                }
-
-                # Limit to last 5 passes
-                pass_sequence = pass_sequence[-5:]
+                        passer_id = prev_poss.get('passerPlayerId')
+                        passer_name = prev_poss.get('passerPlayerName', '')
+                        receiver_id = prev_poss.get('receiverPlayerId') or prev_poss.get('targetPlayerId')
+                        receiver_name = prev_poss.get('receiverPlayerName', '') or prev_poss.get('targetPlayerName', '')
+
+                        # Get ball position for pass
+                        ball_pos = self._extract_ball_position(prev_event)
+
+                        if passer_name:
+                            pass_sequence.append({
+                                'passerName': passer_name,
+                                'receiverName': receiver_name,
+                                'time': prev_game.get('startFormattedGameClock', ''),
+                                'teamId': str(prev_game.get('teamId', '')),
+                                'ballPosition': ball_pos
+                            })
+
+                        # Track involved players and their positions at this moment
+                        slots = _player_slots(prev_event)
+                        for player_id, player_name in ((passer_id, passer_name), (receiver_id, receiver_name)):
+                            if not player_id:
+                                continue
+                            involved_player_ids.add(player_id)
+                            slot = slots.get(player_id)
+                            if slot is not None:
+                                p = slot[1]
+                                involved_player_positions[player_id] = {
+                                    'x': p.get('x', 0),
+                                    'y': p.get('y', 0),
+                                    'jerseyNum': p.get('jerseyNum', 0),
+                                    'playerId': player_id,
+                                    'playerName': player_name,
+                                    'positionGroupType': p.get('positionGroupType', '')
+                                }
+
+                # Limit to the last GOAL_PASS_LIMIT passes
+                pass_sequence = pass_sequence[-GOAL_PASS_LIMIT:] if GOAL_PASS_LIMIT else []
 
                 # Get scorer info directly from this shot event
                 scorer_id = poss_events.get('shooterPlayerId')
@@ -592,25 +856,21 @@ class Match:
                 # Build key player lists
                 key_home_players = []
                 key_away_players = []
+                slots = _player_slots(event)
+                scorer_slot = slots.get(scorer_id) if scorer_id else None
 
                 if is_penalty:
                     # For penalties: ONLY shooter and opposing goalkeeper
-                    # Find shooter position
-                    for p in event.get('homePlayers', []) + event.get('awayPlayers', []):
-                        if p.get('playerId') == scorer_id:
-                            player_data = {
-                                'x': p.get('x', 0),
-                                'y': p.get('y', 0),
-                                'jerseyNum': p.get('jerseyNum', 0),
-                                'playerId': scorer_id,
-                                'playerName': scorer_name,
-                                'positionGroupType': 'CF'
-                            }
-                            # Determine which team
-                            if p in event.get('homePlayers', []):
-                                key_home_players.append(player_data)
-                            else:
-                                key_away_players.append(player_data)
+                    if scorer_slot is not None:
+                        is_home, p = scorer_slot
+                        (key_home_players if is_home else key_away_players).append({
+                            'x': p.get('x', 0),
+                            'y': p.get('y', 0),
+                            'jerseyNum': p.get('jerseyNum', 0),
+                            'playerId': scorer_id,
+                            'playerName': scorer_name,
+                            'positionGroupType': 'CF'
+                        })
 
                     # Find goalkeeper (opposing team's GK)
                     home_gk = self._find_goalkeeper(event.get('homePlayers', []), keeper_id, keeper_name)
@@ -631,11 +891,11 @@ class Match:
                     if away_gk:
                         key_away_players.append(away_gk)
 
-                    # Add involved players using their positions from the pass sequence
+                    # Add involved players using their positions from the pass sequence;
+                    # their side comes from the goal event
                     for pid, pdata in involved_player_positions.items():
-                        # Determine if home or away based on the event data
-                        is_home_player = any(p.get('playerId') == pid for p in event.get('homePlayers', []))
-                        if is_home_player:
+                        slot = slots.get(pid)
+                        if slot is not None and slot[0]:
                             if len(key_home_players) < 6:
                                 key_home_players.append(pdata)
                         else:
@@ -644,27 +904,22 @@ class Match:
 
                     # Add scorer if not already included
                     scorer_included = any(p.get('playerId') == scorer_id for p in key_home_players + key_away_players)
-                    if not scorer_included and scorer_id:
-                        for p in event.get('homePlayers', []) + event.get('awayPlayers', []):
-                            if p.get('playerId') == scorer_id:
-                                player_data = {
-                                    'x': p.get('x', 0),
-                                    'y': p.get('y', 0),
-                                    'jerseyNum': p.get('jerseyNum', 0),
-                                    'playerId': scorer_id,
-                                    'playerName': scorer_name,
-                                    'positionGroupType': p.get('positionGroupType', '')
-                                }
-                                if p in event.get('homePlayers', []):
-                                    key_home_players.append(player_data)
-                                else:
-                                    key_away_players.append(player_data)
-                                break
+                    if not scorer_included and scorer_slot is not None:
+                        is_home, p = scorer_slot
+                        (key_home_players if is_home else key_away_players).append({
+                            'x': p.get('x', 0),
+                            'y': p.get('y', 0),
+                            'jerseyNum': p.get('jerseyNum', 0),
+                            'playerId': scorer_id,
+                            'playerName': scorer_name,
+                            'positionGroupType': p.get('positionGroupType', '')
+                        })
 
                 goal_data = {
                     'eventIndex': i,
                     'time': game_events.get('startFormattedGameClock', ''),
                     'period': game_events.get('period', 1),
+                    'scorerId': scorer_id,
                     'scorerName': scorer_name,
                     'scoringTeamId': scoring_team_id,
                     'passSequence': pass_sequence,
@@ -680,32 +935,67 @@ class Match:
 
     def count_goals(self) -> int:
         """Count goals in the match - uses shotOutcomeType and filters out nonEvent (disallowed goals)"""
-        self._load_events()
-        seen_goal_times = set()  # Deduplication
-        count = 0
-        for event in self._events:
-            game_events = event.get('gameEvents', {})
-            poss_events = event.get('possessionEvents', {})
-            # Only count shots with outcome 'G' (Goal) that are NOT marked as nonEvent
-            # nonEvent=True means the goal was disallowed (VAR/offside)
-            is_shot_goal = poss_events.get('shotOutcomeType') == 'G'
-            is_valid = not poss_events.get('nonEvent', False)
-            if is_shot_goal and is_valid:
-                goal_time = game_events.get('startFormattedGameClock', '')
-                shooter_id = poss_events.get('shooterPlayerId', '')
-                goal_key = f"{goal_time}_{shooter_id}"
-                if goal_key not in seen_goal_times:
-                    seen_goal_times.add(goal_key)
-                    count += 1
-        return count
+        return self.summary()['goals']
+
+    def summary(self) -> Dict:
+        """
+        Summary statistics (goals, shots, passes by outcome, crosses, clearances,
+        challenges, sequences, set pieces, home/away splits), computed once in a
+        vectorized pass. Shared dict, do not mutate.
+        """
+        self._refresh_if_changed()
+        summary = self._summary
+        if summary is None:
+            if self._use_prebuilt:
+                from .fifa_store import load_match_summary
+                summary = load_match_summary(self.match_id)
+            if summary is None:
+                from .match_summary import compute_summary
+
+                events, store = self._load_events()
+                summary = compute_summary(
+                    events, store,
+                    self.home_team.team_id if self.home_team else '',
+                    self.away_team.team_id if self.away_team else '',
+                    SETPIECE_LABELS
+                )
+            self._summary = summary
+            self._track_data(loaded=True)
+        else:
+            self._track_data(loaded=False)
+        return summary
+
+    def plays_table(self) -> PlaysTable:
+        """Plays of the match, computed once and rebuilt only when its data files change"""
+        self._refresh_if_changed()
+        table = self._plays_table
+        if table is None:
+            from .ingest import group_plays_by_sequence
+
+            plays = tuple(self._build_plays())
+            groups = tuple(group_plays_by_sequence(plays))
+            sequences = tuple(_api_sequences(groups))
+            table = self._plays_table = PlaysTable(plays, groups, sequences, SequenceWindows.build(sequences))
+            self._track_data(loaded=True)
+        else:
+            self._track_data(loaded=False)
+        return table
 
     def get_all_plays(self) -> List[Dict]:
-        """Get all plays/events in the match grouped by sequence"""
-        self._load_events()
+        """Get all plays/events in the match (shared, read-only play dicts)"""
+        return list(self.plays_table().plays)
+
+    def _build_plays(self) -> List[Dict]:
+        """Build the play dicts from the prebuilt artifact or the raw events"""
+        prebuilt = self._load_prebuilt()
+        if prebuilt is not None:
+            return prebuilt['plays']
+
+        events, store = self._load_events()
 
         plays = []
 
-        for i, event in enumerate(self._events):
+        for i, event in self._iter_events(events, self._play_rows(store)):
             game_events = event.get('gameEvents', {})
             poss_events = event.get('possessionEvents', {})
 
@@ -812,28 +1102,38 @@ class Match:
 class MatchRepository:
     """Repository pattern - encapsulates data access logic"""
 
-    _cache: Dict[str, Match] = {}
+    _cache: Dict[str, Match] = {}  # Every match stays, but only its metadata is guaranteed loaded
+    _data_cache = ByteBudgetLRU(
+        MATCH_CACHE_BYTES, name='MatchRepository',
+        on_evict=lambda match_id, match: match.release_data()
+    )  # Matches whose plays/goals are derived, least recently used evicted first
 
     @classmethod
     def get_all_match_ids(cls) -> List[str]:
         """Get all available match IDs"""
-        metadata_dir = DATA_DIR / 'Metadata'
-        if not metadata_dir.exists():
-            return []
-
-        match_ids = []
-        for f in metadata_dir.glob('*.json'):
-            match_ids.append(f.stem)
-
-        return sorted(match_ids)
+        from . import data_access
+        return data_access.get_all_match_ids()
 
     @classmethod
     def get_match(cls, match_id: str) -> Optional[Match]:
         """Get match by ID with caching"""
         if match_id not in cls._cache:
-            cls._cache[match_id] = Match(match_id)
+            match = Match(match_id)
+            match._budgeted = True
+            cls._cache[match_id] = match
         return cls._cache[match_id]
 
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """Match data cache usage and hit/miss/eviction counters"""
+        return dict(cls._data_cache.stats(), matches=len(cls._cache))
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget every match (metadata included)"""
+        cls._cache.clear()
+        cls._data_cache.clear()
+
     @classmethod
     def get_all_matches(cls) -> List[Match]:
         """Get all matches sorted by date ascending"""
@@ -842,40 +1142,100 @@ class MatchRepository:
         matches.sort(key=lambda m: m._metadata.get('date', '') if m._metadata else '')
         return matches
 
+    @classmethod
+    def dataset_fingerprint(cls) -> str:
+        """
+        Hash of every data file's name, size and modification time.
+        Changes whenever a match is added, removed or re-exported.
+        """
+        return cls.dataset_fingerprint_of(cls.dataset_files())
+
+    @staticmethod
+    def dataset_fingerprint_of(files: List[Tuple[str, str, int, int]]) -> str:
+        """dataset_fingerprint() of a dataset_files() listing"""
+        digest = hashlib.sha1()
+        for folder, name, size, mtime_ns in files:
+            digest.update(f"{folder}/{name}:{size}:{mtime_ns}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    @classmethod
+    def dataset_files(cls) -> List[Tuple[str, str, int, int]]:
+        """(folder, name, size, mtime_ns) of every data file, by folder then name"""
+        files = []
+        for folder in DATA_FOLDERS:
+            directory = DATA_DIR / folder
+            if not directory.exists():
+                continue
+            for path in sorted(directory.glob('*.json')):
+                stat = path.stat()
+                files.append((folder, path.name, stat.st_size, stat.st_mtime_ns))
+        return files
+
 
 # =============================================================================
 # DJANGO VIEWS
 # =============================================================================
 def index(request):
     """Home page view"""
-    matches = MatchRepository.get_all_matches()
-    matches_data = []
-
-    for m in matches:
-        match_dict = m.to_dict()
-        # Count goals for each match (lazy, only load if needed later)
-        # For now, just add the match data
-        matches_data.append(match_dict)
-
-    # Convert to JSON string for template
-    matches_json = json.dumps(matches_data)
+    from .match_manifest import get_match_manifest
 
-    return render(request, 'index.html', {'matches': matches_json})
+    # Match summaries are serialized once per data version
+    return render(request, 'index.html', {'matches': get_match_manifest().matches_json})
 
 
+@conditional_get
 def api_matches(request):
     """API: Get all matches"""
-    matches = MatchRepository.get_all_matches()
-    matches_data = [m.to_dict() for m in matches]
-    return JsonResponse({'matches': matches_data})
+    from .match_manifest import get_match_manifest
 
+    return HttpResponse(get_match_manifest().api_body, content_type='application/json')
 
+
+@conditional_get
+def api_match_summary(request, match_id: str):
+    """API: Summary statistics for a specific match"""
+    from .match_manifest import get_match_manifest
+
+    body = get_match_manifest().statistics_bodies.get(str(match_id))
+    if body is None:
+        return JsonResponse({'error': 'Match not found'}, status=404)
+    return HttpResponse(body, content_type='application/json')
+
+
+@conditional_get
 def api_match_goals(request, match_id: str):
-    """API: Get goals for a specific match"""
+    """
+    API: Get goals for a specific match (served from cached bytes after the first request).
+    Binary frames (see frames_binary) when the client accepts them.
+    """
+    from .frames_binary import cached_frames, wants_frames
+    from .response_cache import bytes_response, cached_body, cached_json_response
+
     match = MatchRepository.get_match(match_id)
     if not match:
         return JsonResponse({'error': 'Match not found'}, status=404)
 
+    if wants_frames(request):
+        return bytes_response(request, cached_body(
+            ('goals-frames', match_id), match.data_version(),
+            lambda: _match_goals_frames(match, match_id), encode=cached_frames))
+    return cached_json_response(request, ('goals', match_id), match.data_version(),
+                                lambda: _match_goals_payload(match, match_id))
+
+
+def _match_goals_frames(match: Match, match_id: str) -> Tuple[List[Dict], Dict]:
+    """Binary frames of api_match_goals: each goal's key-player snapshot"""
+    goals = match.find_goals()
+    meta = {
+        'matchId': match_id,
+        'goals': [{'eventId': g.get('eventIndex'), 'time': g.get('time', ''),
+                   'teamId': g.get('scoringTeamId', ''), 'playerName': g.get('scorerName', '')} for g in goals]
+    }
+    return goals, meta
+
+
+def _match_goals_payload(match: Match, match_id: str) -> Dict:
+    """Body of api_match_goals"""
     goals_raw = match.find_goals()
 
     # Transform goals to expected format for frontend
@@ -917,57 +1277,256 @@ def api_match_goals(request, match_id: str):
 
         goals.append(goal_data)
 
-    return JsonResponse({
+    return {
         'matchId': match_id,
         'match': {
             'homeTeam': match.home_team.to_dict() if match.home_team else None,
             'awayTeam': match.away_team.to_dict() if match.away_team else None
         },
         'goals': goals
-    })
-
-
+    }
+
+
+def _plays_page_params(params) -> Dict[str, Any]:
+    """Filters and paging of api_match_plays; ValueError names the bad parameter"""
+    def integer(name: str, low: Optional[int] = None, high: Optional[int] = None) -> Optional[int]:
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError(f'{name} must be an integer')
+        if (low is not None and value < low) or (high is not None and value > high):
+            raise ValueError(f'{name} must be between {low} and {high}')
+        return value
+
+    def clock(name: str) -> Optional[float]:
+        value = params.get(name)
+        if not value:
+            return None
+        seconds = parse_game_clock(value)
+        if seconds is None:
+            raise ValueError(f"{name} must be a game clock ('MM:SS') or seconds")
+        return seconds
+
+    return {
+        'period': integer('period'),
+        'clock_from': clock('from'),
+        'clock_to': clock('to'),
+        'cursor': integer('cursor'),
+        'offset': integer('offset', 0) or 0,
+        'limit': integer('limit', 1, PLAYS_PAGE_MAX)
+    }
+
+
+def _projection_params(params, list_view: bool = False) -> Tuple[Optional[Tuple[str, ...]], Optional[int]]:
+    """(event fields, coordinate decimals) asked for by fields= and quantize=; ValueError when invalid"""
+    from .plays_projection import LIST_EVENT_FIELDS, QUANTIZE_DECIMALS, parse_fields
+
+    fields = parse_fields(params.get('fields'))
+    if fields is None and list_view:
+        fields = LIST_EVENT_FIELDS
+    quantize = params.get('quantize')
+    if quantize and quantize not in QUANTIZE_DECIMALS:
+        raise ValueError(f"quantize must be one of {', '.join(QUANTIZE_DECIMALS)}")
+    return fields, QUANTIZE_DECIMALS.get(quantize)
+
+
+def _delta_params(params) -> Optional[int]:
+    """Threshold (cm) when encoding=delta was asked for, else None; ValueError when invalid"""
+    from .snapshot_delta import DELTA_THRESHOLD_CM
+
+    encoding = params.get('encoding')
+    if not encoding:
+        return None
+    if encoding != 'delta':
+        raise ValueError('encoding must be delta')
+    threshold = params.get('threshold')
+    if threshold is None or threshold == '':
+        return DELTA_THRESHOLD_CM
+    if isinstance(threshold, str):
+        # Query string
+        try:
+            threshold = int(threshold)
+        except ValueError:
+            raise ValueError('threshold must be an integer (centimetres)')
+    elif not isinstance(threshold, int) or isinstance(threshold, bool):
+        # JSON body: no silent truncation of floats, no booleans
+        raise ValueError('threshold must be an integer (centimetres)')
+    if threshold < 0:
+        raise ValueError('threshold must not be negative')
+    return threshold
+
+
+@conditional_get
 def api_match_plays(request, match_id: str):
-    """API: Get all plays for a specific match, grouped by sequence"""
+    """
+    API: Plays for a specific match, grouped by sequence.
+    Optional filters: period, from/to (game clock 'MM:SS' or seconds; keeps
+    sequences overlapping the range). Optional paging: limit (up to
+    PLAYS_PAGE_MAX) with cursor (the previous page's nextCursor) or offset.
+    Optional trimming: view=list (no player snapshots; see api_match_sequence),
+    fields=a,b,c (event fields kept), quantize=cm (coordinates in centimetres).
+    encoding=delta sends each sequence's first snapshot in full and then only
+    players that moved more than threshold= centimetres (see snapshot_delta).
+    Bodies are cached as bytes per query and data version; stream=1 sends
+    sequences incrementally instead, without caching. Clients accepting
+    binary frames (see frames_binary) get one frame per event of the page.
+    """
+    from .frames_binary import cached_frames, wants_frames
+    from .response_cache import bytes_response, cached_body, cached_json_response
+
     match = MatchRepository.get_match(match_id)
     if not match:
         return JsonResponse({'error': 'Match not found'}, status=404)
 
-    plays = match.get_all_plays()
-
-    # Group plays by sequence for better organization
-    # Skip events without valid sequence
-    sequences_dict = {}
-    for play in plays:
-        seq_id = play.get('sequence')
-        if seq_id is None:
-            continue  # Skip events without sequence
-        if seq_id not in sequences_dict:
-            sequences_dict[seq_id] = {
-                'sequenceId': int(seq_id) if seq_id else 0,
-                'teamId': play.get('teamId'),
-                'setpieceType': play.get('setpieceLabel') or play.get('setpieceType') or 'Open Play',
-                'time': play.get('time') or '',
-                'events': []
-            }
-        sequences_dict[seq_id]['events'].append(play)
-        # Update time to first event's time if not set
-        if not sequences_dict[seq_id]['time'] and play.get('time'):
-            sequences_dict[seq_id]['time'] = play.get('time')
-
-    # Convert to sorted list (handle None sequenceIds)
-    sequences_list = sorted(sequences_dict.values(), key=lambda s: s['sequenceId'] if s['sequenceId'] is not None else -1)
-
-    return JsonResponse({
+    view = request.GET.get('view') or 'full'
+    if view not in ('full', 'list'):
+        return JsonResponse({'error': 'view must be full or list'}, status=400)
+    try:
+        params = _plays_page_params(request.GET)
+        fields, decimals = _projection_params(request.GET, list_view=view == 'list')
+        delta = _delta_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if delta is not None and fields is not None:
+        return JsonResponse({'error': 'encoding=delta needs full snapshots (no view=list or fields)'}, status=400)
+
+    if wants_frames(request):
+        return bytes_response(request, cached_body(
+            ('plays-frames', match_id, tuple(sorted(params.items()))), match.data_version(),
+            lambda: _match_plays_frames(match, match_id, params), encode=cached_frames))
+    if _wants_stream(request):
+        from .json_stream import streaming_json_response
+        return streaming_json_response(
+            request, _match_plays_payload(match, match_id, params, fields, decimals, delta, lazy=True), 'plays')
+
+    key = ('plays', match_id, view, tuple(sorted(params.items())), fields, decimals, delta)
+    return cached_json_response(request, key, match.data_version(),
+                                lambda: _match_plays_payload(match, match_id, params, fields, decimals, delta))
+
+
+def _match_plays_frames(match: Match, match_id: str, params: Dict[str, Any]) -> Tuple[List[Dict], Dict]:
+    """Binary frames of api_match_plays: every event of the page's sequences"""
+    from .frames_binary import sequence_frames, sequence_meta
+
+    sequences_list, total, remaining = match.plays_table().page(**params)
+    meta = {
+        'matchId': match_id,
+        'sequences': sequence_meta(sequences_list),
+        'totalSequences': total,
+        'nextCursor': sequences_list[-1]['sequenceId'] if remaining else None
+    }
+    return sequence_frames(sequences_list), meta
+
+
+def _wants_stream(request) -> bool:
+    """stream=1/true: send the response incrementally instead of from one serialized body"""
+    return request.GET.get('stream', '').lower() in ('1', 'true')
+
+
+def _match_plays_payload(match: Match, match_id: str, params: Dict[str, Any],
+                         fields: Optional[Tuple[str, ...]], decimals: Optional[int],
+                         delta: Optional[int] = None, lazy: bool = False) -> Dict:
+    """
+    Body of api_match_plays; delta = threshold (cm) of delta-encoded snapshots.
+    With lazy=True 'plays' is a generator (for streaming).
+    """
+    from .plays_projection import project_sequence
+    from .snapshot_delta import encoded_sequence
+
+    # Memoized per match: grouping, sorting and the sequence windows happen once per data version
+    table = match.plays_table()
+    sequences_list, total, remaining = table.page(**params)
+    if delta is not None:
+        sequences_list = [encoded_sequence(s, match_id, delta) for s in sequences_list]
+    plays = (project_sequence(s, fields, decimals) for s in sequences_list)
+
+    return {
         'matchId': match_id,
         'match': {
             'homeTeam': match.home_team.to_dict() if match.home_team else None,
             'awayTeam': match.away_team.to_dict() if match.away_team else None
         },
-        'plays': sequences_list,
-        'totalEvents': len(plays),
-        'totalSequences': len(sequences_list)
-    })
+        'plays': plays if lazy else list(plays),
+        'totalEvents': len(table.plays),
+        'totalSequences': total,
+        'nextCursor': sequences_list[-1]['sequenceId'] if remaining else None,
+        'nextOffset': total - remaining if remaining else None  # Into the filtered list, cursor or not
+    }
+
+
+@conditional_get
+def api_match_sequence(request, match_id: str, sequence_id: int):
+    """
+    API: One sequence of a match with full player snapshots (the detail of
+    api_match_plays?view=list). Accepts fields= and quantize= like api_match_plays.
+    """
+    from .plays_projection import project_sequence
+    from .response_cache import bytes_response, cached_body
+
+    match = MatchRepository.get_match(match_id)
+    if not match:
+        return JsonResponse({'error': 'Match not found'}, status=404)
+    try:
+        fields, decimals = _projection_params(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    def build() -> Optional[Dict]:
+        sequence = match.plays_table().sequence(sequence_id)
+        if sequence is None:
+            return None
+        return {'matchId': match_id, 'sequence': project_sequence(sequence, fields, decimals)}
+
+    cached = cached_body(('sequence', match_id, sequence_id, fields, decimals), match.data_version(), build)
+    if cached is None:
+        return JsonResponse({'error': 'Sequence not found'}, status=404)
+    return bytes_response(request, cached)
+
+
+@conditional_get
+def api_goals(request):
+    """
+    API: Goals across all matches from the tournament goals index.
+    Optional filters: team (id or name), player (id or part of the name),
+    period, penalty (true/false). stream=1 sends the goals incrementally.
+    """
+    from .goals_index import filter_goals
+
+    period = request.GET.get('period')
+    if period:
+        try:
+            period = int(period)
+        except ValueError:
+            return JsonResponse({'error': 'period must be an integer'}, status=400)
+    else:
+        period = None
+
+    penalty = request.GET.get('penalty')
+    if penalty:
+        if penalty.lower() not in ('true', 'false', '1', '0'):
+            return JsonResponse({'error': 'penalty must be true or false'}, status=400)
+        penalty = penalty.lower() in ('true', '1')
+    else:
+        penalty = None
+
+    goals = filter_goals(
+        team=request.GET.get('team'),
+        player=request.GET.get('player'),
+        period=period,
+        penalty=penalty
+    )
+    payload = {
+        'goals': goals,
+        'totalGoals': len(goals),
+        'matchCount': len({g['matchId'] for g in goals})
+    }
+    if _wants_stream(request):
+        from .json_stream import streaming_json_response
+        return streaming_json_response(request, payload, 'goals')
+    return JsonResponse(payload)
 
 
 # =============================================================================
@@ -981,35 +1540,85 @@ def _parse_json_body(request) -> Optional[Dict[str, Any]]:
         return None
 
 
-@csrf_exempt
-def api_search_event(request):
-    """API: Search for similar events using TF-IDF"""
-    if request.method != 'POST':
-        return JsonResponse({'error': 'POST required'}, status=405)
+def _search_query(request, int_params: Tuple[str, ...]) -> Tuple[Optional[Dict[str, Any]], Optional[JsonResponse]]:
+    """
+    Search parameters: the JSON body of a POST, or the query string of a
+    reference GET (integers in int_params). Returns (data, error response).
+    """
+    if request.method == 'POST':
+        data = _parse_json_body(request)
+        if data is None:
+            return None, JsonResponse({'error': 'Invalid JSON'}, status=400)
+        for name in SEARCH_COUNT_PARAMS:
+            value = data.get(name)
+            if name in int_params and value is not None and (
+                    not isinstance(value, int) or isinstance(value, bool) or value < 0):
+                return None, JsonResponse({'error': f'{name} must be a non-negative integer'}, status=400)
+        return data, None
+    if request.method not in ('GET', 'HEAD'):
+        return None, JsonResponse({'error': 'GET or POST required'}, status=405)
+
+    data = {k: v for k, v in request.GET.items() if k in ('matchId', 'method')}
+    for name in int_params:
+        value = request.GET.get(name)
+        if value:
+            try:
+                data[name] = int(value)
+            except ValueError:
+                return None, JsonResponse({'error': f'{name} must be an integer'}, status=400)
+            if name in SEARCH_COUNT_PARAMS and data[name] < 0:
+                return None, JsonResponse({'error': f'{name} must be a non-negative integer'}, status=400)
+    return data, None
 
-    from .TF_IDF import search_similar_events
 
-    data = _parse_json_body(request)
-    if data is None:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
-
-    query_event = data.get('event')
-    if not query_event:
-        return JsonResponse({'error': 'event required'}, status=400)
+@csrf_exempt
+@conditional_get
+def api_search_event(request):
+    """
+    API: Search for similar events using TF-IDF.
+    POST either the full 'event' or a reference to an indexed event
+    (matchId, sequenceId, eventIndex) whose stored vector is reused;
+    references can also be sent as a GET query string (cacheable).
+    Results come as binary frames (see frames_binary) when the client accepts them.
+    """
+    from .TF_IDF import search_similar_events, get_indexed_event
+    from .frames_binary import frames_response, wants_frames
+
+    data, error = _search_query(request, ('sequenceId', 'eventIndex', 'topN'))
+    if error is not None:
+        return error
 
     exclude_match_id = data.get('matchId')
     exclude_seq_id = data.get('sequenceId')
     exclude_event_idx = data.get('eventIndex')
     top_n = data.get('topN', 10)
 
+    query_event = data.get('event')
+    query_key = None
+    if not query_event:
+        if exclude_match_id is None or exclude_seq_id is None or exclude_event_idx is None:
+            return JsonResponse({'error': 'event or matchId/sequenceId/eventIndex required'}, status=400)
+        entry = get_indexed_event(exclude_match_id, exclude_seq_id, exclude_event_idx)
+        if entry is None:
+            return JsonResponse({'error': 'Event not found'}, status=404)
+        query_event = entry['event']
+        query_key = (exclude_match_id, exclude_seq_id, exclude_event_idx)
+
     results = search_similar_events(
         query_event=query_event,
         exclude_match_id=exclude_match_id,
         exclude_seq_id=exclude_seq_id,
         exclude_event_idx=exclude_event_idx,
-        top_n=top_n
+        top_n=top_n,
+        query_key=query_key
     )
 
+    if wants_frames(request):
+        return frames_response([r['event'] for r in results], {
+            'results': [{k: r.get(k) for k in ('matchId', 'sequenceId', 'eventIndex', 'similarity')}
+                        for r in results]
+        })
+
     return JsonResponse({
         'query': {
             'eventType': query_event.get('eventLabel', query_event.get('eventType', '')),
@@ -1021,34 +1630,27 @@ def api_search_event(request):
     })
 
 
-@csrf_exempt
-def api_search_sequence(request):
-    """API: Search for similar sequences using DTW, TF-IDF, or Hybrid"""
-    if request.method != 'POST':
-        return JsonResponse({'error': 'POST required'}, status=405)
+def _search_sequences_live(method: str, query_events: List[Dict], query_key: Optional[tuple],
+                           exclude_match_id: Any, exclude_seq_id: Any, top_n: int,
+                           candidate_count: Optional[int]) -> tuple:
+    """Run a sequence search against the in-memory indexes. Returns (results, stats)."""
+    stats = None
 
-    data = _parse_json_body(request)
-    if data is None:
-        return JsonResponse({'error': 'Invalid JSON'}, status=400)
-
-    query_events = data.get('events')
-    if not query_events:
-        return JsonResponse({'error': 'events required'}, status=400)
-
-    exclude_match_id = data.get('matchId')
-    exclude_seq_id = data.get('sequenceId')
-    top_n = data.get('topN', 10)
-    method = data.get('method', 'hybrid')  # Default to hybrid
-
-    if method == 'hybrid':
-        # Use hybrid search (combines DTW + TF-IDF)
+    if method in ('hybrid', 'cascade'):
+        # Use hybrid search (combines DTW + TF-IDF); 'cascade' lets TF-IDF
+        # pick the candidates that DTW re-ranks
         from .TF_IDF import search_similar_sequences_hybrid
 
+        stats = {}
         results = search_similar_sequences_hybrid(
             query_events=query_events,
             exclude_match_id=exclude_match_id,
             exclude_seq_id=exclude_seq_id,
-            top_n=top_n
+            top_n=top_n,
+            mode='cascade' if method == 'cascade' else 'exhaustive',
+            candidate_count=candidate_count,
+            stats=stats,
+            query_key=query_key
         )
     elif method == 'dtw':
         # Use DTW search only
@@ -1059,7 +1661,8 @@ def api_search_sequence(request):
             query_sequence=query_sequence,
             top_n=top_n,
             exclude_match_id=str(exclude_match_id) if exclude_match_id else None,
-            exclude_seq_id=exclude_seq_id
+            exclude_seq_id=exclude_seq_id,
+            query_key=query_key
         )
     else:
         # Use TF-IDF search only
@@ -1069,10 +1672,70 @@ def api_search_sequence(request):
             query_events=query_events,
             exclude_match_id=exclude_match_id,
             exclude_seq_id=exclude_seq_id,
-            top_n=top_n
+            top_n=top_n,
+            query_key=query_key
         )
 
-    return JsonResponse({
+    return results, stats
+
+
+@csrf_exempt
+@conditional_get
+def api_search_sequence(request):
+    """
+    API: Search for similar sequences using DTW, TF-IDF, or Hybrid.
+    POST either the full 'events' list or a reference to an indexed sequence
+    (matchId, sequenceId) whose stored features and vector are reused;
+    references can also be sent as a GET query string (cacheable).
+    Results come as binary frames (see frames_binary) when the client accepts them,
+    or with delta-encoded snapshots for encoding=delta (and optional threshold=).
+    """
+    from .frames_binary import frames_response, sequence_frames, sequence_meta, wants_frames
+    from .snapshot_delta import encode_sequence
+
+    data, error = _search_query(request, ('sequenceId', 'topN', 'candidates'))
+    if error is not None:
+        return error
+    try:
+        delta = _delta_params(request.GET if request.method != 'POST' else data)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    exclude_match_id = data.get('matchId')
+    exclude_seq_id = data.get('sequenceId')
+
+    query_events = data.get('events')
+    query_key = None
+    if not query_events:
+        if exclude_match_id is None or exclude_seq_id is None:
+            return JsonResponse({'error': 'events or matchId/sequenceId required'}, status=400)
+
+        from .TF_IDF import get_indexed_sequence
+
+        entry = get_indexed_sequence(exclude_match_id, exclude_seq_id)
+        if entry is None:
+            return JsonResponse({'error': 'Sequence not found'}, status=404)
+        query_events = entry['events']
+        query_key = (exclude_match_id, exclude_seq_id)
+
+    top_n = data.get('topN', 10)
+    method = data.get('method', 'hybrid')  # Default to hybrid
+    stats = None
+
+    # References are answered from the precomputed neighbour tables when they
+    # are fresh; ad-hoc queries and cascade always scan live
+    results = None
+    if query_key is not None and method in ('hybrid', 'dtw', 'tfidf'):
+        from .neighbors import lookup_similar_sequences
+
+        results = lookup_similar_sequences(method, exclude_match_id, exclude_seq_id, top_n)
+    source = 'precomputed'
+    if results is None:
+        source = 'live'
+        results, stats = _search_sequences_live(method, query_events, query_key, exclude_match_id,
+                                                exclude_seq_id, top_n, data.get('candidates'))
+
+    response = {
         'query': {
             'setpieceType': query_events[0].get('setpieceLabel', '') if query_events else '',
             'eventCount': len(query_events),
@@ -1080,5 +1743,18 @@ def api_search_sequence(request):
             'method': method
         },
         'results': results,
-        'count': len(results)
-    })
\ No newline at end of file
+        'count': len(results),
+        'source': source
+    }
+    if stats is not None:
+        response['stats'] = stats
+
+    if wants_frames(request):
+        meta = [dict(m, matchId=r.get('matchId'), similarity=r.get('similarity'))
+                for m, r in zip(sequence_meta(results), results)]
+        return frames_response(sequence_frames(results), {'results': meta, 'source': source})
+
+    if delta is not None:
+        # Not cached: result event lists are built per search, so there is nothing to reuse
+        response['results'] = [encode_sequence(r, delta) for r in results]
+    return JsonResponse(response)
@@ -0,0 +1,419 @@
+"""
+Prebuilt FIFA Data Store
+Offline ingest that turns the raw Metadata / Event Data / Rosters JSON into
+every derived artifact (event stores, plays and goals per match, search index
+snapshots), rebuilding only what changed since the last run
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Any
+
+from .fifa import CACHE_DIR, DATA_DIR, DATA_FOLDERS, MatchRepository, goal_settings
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+PREBUILT_ENABLED = True             # False = ignore prebuilt artifacts, always compute live
+STORE_DIR = CACHE_DIR / 'store'
+STORE_WORKERS = None                # None = os.cpu_count()
+STORE_VERSION = 3
+
+MANIFEST_NAME = 'manifest.json'
+MATCHES_DIR = 'matches'             # <id>.json: plays and goals (summaries live in the manifest)
+INDEXES_DIR = 'indexes'             # <name>.pkl: search index snapshots
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+# =============================================================================
+# SOURCE FILES
+# =============================================================================
+def _source_files(match_id: str) -> Dict[str, Path]:
+    """Raw files of one match, keyed by 'Folder/<id>.json'."""
+    files = {}
+    for folder in DATA_FOLDERS:
+        path = DATA_DIR / folder / f'{match_id}.json'
+        if path.exists():
+            files[f'{folder}/{path.name}'] = path
+    return files
+
+
+def _file_stamp(path: Path) -> Optional[Dict[str, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return {'size': stat.st_size, 'mtimeNs': stat.st_mtime_ns}
+
+
+def _content_hash(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hash_files(files: Dict[str, Path], known: Dict[str, Dict], rehash: bool) -> Dict[str, Dict]:
+    """
+    Stamp and content hash of each file. A file whose size and mtime match
+    the previous run keeps its recorded hash unless rehash is set.
+    """
+    records = {}
+    for name, path in files.items():
+        stamp = _file_stamp(path)
+        previous = known.get(name)
+        if (not rehash and previous and previous.get('size') == stamp['size']
+                and previous.get('mtimeNs') == stamp['mtimeNs']):
+            records[name] = previous
+        else:
+            records[name] = dict(stamp, sha1=_content_hash(path))
+    return records
+
+
+def _match_digest(names: List[str], files: Dict[str, Dict]) -> str:
+    """Combined content hash of one match's source files."""
+    digest = hashlib.sha1()
+    for name in sorted(names):
+        digest.update(f"{name}:{files[name]['sha1']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+# =============================================================================
+# MANIFEST
+# =============================================================================
+def _write_json_atomic(path: Path, data: Any, indent: Optional[int] = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(store_dir: Path) -> Dict:
+    try:
+        with open(store_dir / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == STORE_VERSION else {}
+
+
+def _match_artifact_path(store_dir: Path, match_id: str) -> Path:
+    return store_dir / MATCHES_DIR / f'{match_id}.json'
+
+
+def _index_snapshot_path(store_dir: Path, name: str) -> Path:
+    return store_dir / INDEXES_DIR / f'{name}.pkl'
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+def _init_store_worker(store_dir: str, event_store_dir: str) -> None:
+    """Worker initializer: set up Django and write where the parent writes."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DSPFinalFIFA.settings')
+    import django
+    django.setup()
+
+    from . import event_store
+
+    global STORE_DIR
+    STORE_DIR = Path(store_dir)
+    event_store.EVENT_STORE_DIR = Path(event_store_dir)
+
+
+def _build_match(match_id: str, store_dir: str) -> Dict[str, Any]:
+    """Work unit: event store, plays and goals of one match. Returns its manifest fields."""
+    from .event_store import build_event_store
+    from .fifa import Match
+
+    build_event_store(match_id)
+    match = Match(match_id, use_prebuilt=False)
+    plays = match.get_all_plays()
+    goals = match.find_goals()
+    summary = match.summary()
+
+    _write_json_atomic(_match_artifact_path(Path(store_dir), match_id), {
+        'matchId': match_id,
+        'plays': plays,
+        'goals': goals,
+        'goalSettings': goal_settings()
+    })
+    return {'plays': len(plays), 'goals': len(goals), 'summary': summary}
+
+
+def _index_settings() -> Dict[str, Dict[str, Any]]:
+    """Settings each index snapshot depends on, by index name."""
+    from . import DTW, TF_IDF, goals_index
+
+    return {
+        'dtw': DTW.index_settings(),
+        'tfidf': TF_IDF.index_settings(),
+        'goals': goals_index.index_settings()
+    }
+
+
+def _content_fingerprint(matches: Dict[str, Dict]) -> str:
+    """Hash of every match's source contents (unlike dataset_fingerprint, ignores mtimes)."""
+    digest = hashlib.sha1()
+    for match_id in sorted(matches):
+        digest.update(f"{match_id}:{matches[match_id]['sha1']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _build_indexes(store_dir: Path, content_fingerprint: str) -> None:
+    """Rebuild the search and goals indexes from the prebuilt plays and snapshot them."""
+    from . import DTW, TF_IDF, goals_index
+    from .ingest import run_ingest
+
+    MatchRepository.clear_cache()
+    run_ingest([TF_IDF.TfidfIndexBuilder(), DTW.SequenceIndexBuilder(), goals_index.GoalsIndexBuilder()])
+
+    settings = _index_settings()
+    save_index_snapshot('tfidf', TF_IDF.export_index(), settings['tfidf'], content_fingerprint, store_dir)
+    save_index_snapshot('dtw', DTW.export_index(), settings['dtw'], content_fingerprint, store_dir)
+    save_index_snapshot('goals', goals_index.export_index(), settings['goals'], content_fingerprint, store_dir)
+
+
+def build_fifa_store(workers: Optional[int] = None,
+                     force: bool = False,
+                     neighbors: bool = False,
+                     store_dir: Optional[Path] = None) -> Dict:
+    """
+    Build every derived artifact, skipping matches whose source files have
+    the same content hashes as in the previous run. Matches are processed by
+    parallel worker processes; the search indexes are re-snapshotted when any
+    match changed (they are global). With neighbors=True the precomputed
+    neighbour tables are brought up to date as well.
+
+    Returns: the written manifest
+    """
+    from . import event_store
+
+    workers = workers or STORE_WORKERS or os.cpu_count() or 1
+    store_dir = Path(store_dir or STORE_DIR)
+
+    previous = _read_manifest(store_dir)
+    match_ids = MatchRepository.get_all_match_ids()
+
+    files = {}
+    matches = {}
+    pending = []
+    for match_id in match_ids:
+        sources = _source_files(match_id)
+        files.update(_hash_files(sources, previous.get('files', {}), rehash=force))
+        digest = _match_digest(list(sources), files)
+        known = previous.get('matches', {}).get(match_id)
+
+        matches[match_id] = {'sources': sorted(sources), 'sha1': digest, 'goalSettings': goal_settings()}
+        up_to_date = (
+            not force and known is not None and known.get('sha1') == digest and
+            known.get('goalSettings') == goal_settings() and
+            _match_artifact_path(store_dir, match_id).exists() and
+            event_store.store_path(match_id).exists()
+        )
+        if up_to_date:
+            matches[match_id].update(plays=known['plays'], goals=known['goals'], summary=known['summary'])
+        else:
+            pending.append(match_id)
+
+    # Matches whose files were removed
+    removed = set(previous.get('matches', {})) - set(match_ids)
+    for match_id in removed:
+        _match_artifact_path(store_dir, match_id).unlink(missing_ok=True)
+        event_store.store_path(match_id).unlink(missing_ok=True)
+
+    print(f"[Store] {len(pending)} of {len(match_ids)} matches to build "
+          f"({len(removed)} removed, {workers} workers)")
+
+    if workers < 2 or len(pending) < 2:
+        for match_id in pending:
+            matches[match_id].update(_build_match(match_id, str(store_dir)))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_store_worker,
+            initargs=(str(store_dir), str(event_store.EVENT_STORE_DIR))
+        ) as pool:
+            futures = {pool.submit(_build_match, match_id, str(store_dir)): match_id for match_id in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                matches[futures[future]].update(future.result())
+                print(f"[Store] {done}/{len(pending)} matches built")
+    event_store.reset_event_stores()
+
+    content = _content_fingerprint(matches)
+    manifest = {
+        'version': STORE_VERSION,
+        'datasetFingerprint': MatchRepository.dataset_fingerprint(),
+        'contentFingerprint': content,
+        'files': files,
+        'matches': matches
+    }
+    _write_json_atomic(store_dir / MANIFEST_NAME, manifest, indent=2)
+    reset_prebuilt()
+
+    # Search indexes are global: rebuilt when any match content changed. Snapshots
+    # of unchanged content are only re-stamped (e.g. after files were touched).
+    settings = _index_settings()
+    snapshots = {name: _read_snapshot(store_dir, name, settings[name]) for name in settings}
+    if force or any(snapshot is None or snapshot.get('contentFingerprint') != content
+                    for snapshot in snapshots.values()):
+        print("[Store] Rebuilding search index snapshots")
+        _build_indexes(store_dir, content)
+    else:
+        for name, snapshot in snapshots.items():
+            if snapshot['datasetFingerprint'] != manifest['datasetFingerprint']:
+                _write_snapshot(store_dir, name, dict(snapshot, datasetFingerprint=manifest['datasetFingerprint']))
+        print("[Store] Search index snapshots up to date")
+
+    if neighbors:
+        from .neighbors import build_neighbor_tables
+        build_neighbor_tables(workers=workers, force=force)
+
+    print(f"[Store] Store written to {store_dir}")
+    return manifest
+
+
+# =============================================================================
+# LOOKUP
+# =============================================================================
+_manifest: Optional[Dict] = None
+_manifest_stamp: Optional[Tuple] = None     # (directory, manifest mtime) the manifest was read for
+_manifest_lock = threading.Lock()
+
+
+def _load_manifest() -> Dict:
+    """The store manifest, re-read only when the file changes."""
+    global _manifest, _manifest_stamp
+
+    manifest_path = STORE_DIR / MANIFEST_NAME
+    try:
+        stamp = (str(STORE_DIR), manifest_path.stat().st_mtime_ns)
+    except OSError:
+        stamp = (str(STORE_DIR), None)
+
+    with _manifest_lock:
+        if stamp != _manifest_stamp:
+            _manifest = _read_manifest(STORE_DIR) if stamp[1] is not None else {}
+            _manifest_stamp = stamp
+        return _manifest
+
+
+def _current_entry(match_id: str) -> Optional[Dict]:
+    """
+    Manifest entry of a match, or None when there is none or any of the
+    match's files changed since it was built.
+    """
+    if not PREBUILT_ENABLED:
+        return None
+
+    manifest = _load_manifest()
+    entry = manifest.get('matches', {}).get(str(match_id))
+    if entry is None:
+        return None
+
+    sources = _source_files(str(match_id))
+    if sorted(sources) != entry['sources']:
+        return None
+    for name, path in sources.items():
+        record = manifest['files'].get(name, {})
+        stamp = _file_stamp(path)
+        if stamp is None or (record.get('size'), record.get('mtimeNs')) != (stamp['size'], stamp['mtimeNs']):
+            return None
+    return entry
+
+
+def load_match_summary(match_id: str) -> Optional[Dict]:
+    """Prebuilt Match.summary() of a match (read from the manifest), None when stale or missing"""
+    entry = _current_entry(match_id)
+    return entry.get('summary') if entry is not None else None
+
+
+def load_match_artifact(match_id: str) -> Optional[Dict]:
+    """
+    Prebuilt plays and goals of a match, or None when there are none or
+    any of the match's files changed since they were built.
+    """
+    if _current_entry(match_id) is None:
+        return None
+
+    try:
+        with open(_match_artifact_path(STORE_DIR, str(match_id)), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def content_fingerprint(dataset_fingerprint: str) -> Optional[str]:
+    """
+    Content hash of the dataset recorded by the last build, or None when the
+    store was built from other files (dataset_fingerprint differs) or not at all.
+    """
+    if not PREBUILT_ENABLED:
+        return None
+    manifest = _load_manifest()
+    if manifest.get('datasetFingerprint') != dataset_fingerprint:
+        return None
+    return manifest.get('contentFingerprint')
+
+
+def save_index_snapshot(name: str, payload: Dict, settings: Dict,
+                        content_fingerprint: str, store_dir: Optional[Path] = None) -> None:
+    """Persist a search index built from the current dataset."""
+    _write_snapshot(Path(store_dir or STORE_DIR), name, {
+        'version': STORE_VERSION,
+        'datasetFingerprint': MatchRepository.dataset_fingerprint(),
+        'contentFingerprint': content_fingerprint,
+        'settings': settings,
+        'index': payload
+    })
+
+
+def _write_snapshot(store_dir: Path, name: str, snapshot: Dict) -> None:
+    path = _index_snapshot_path(store_dir, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(store_dir: Path, name: str, settings: Dict) -> Optional[Dict]:
+    """A snapshot built with these settings (whatever data it was built from)."""
+    try:
+        with open(_index_snapshot_path(store_dir, name), 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if snapshot.get('version') != STORE_VERSION or snapshot.get('settings') != settings:
+        return None
+    return snapshot
+
+
+def load_index_snapshot(name: str, settings: Dict) -> Optional[Dict]:
+    """
+    A prebuilt search index, or None when there is none or it was built
+    from other data files or settings.
+    """
+    if not PREBUILT_ENABLED:
+        return None
+    snapshot = _read_snapshot(STORE_DIR, name, settings)
+    if snapshot is None or snapshot['datasetFingerprint'] != MatchRepository.dataset_fingerprint():
+        return None
+    return snapshot['index']
+
+
+def reset_prebuilt() -> None:
+    """Forget the loaded manifest (re-read on next lookup)"""
+    global _manifest, _manifest_stamp
+    with _manifest_lock:
+        _manifest, _manifest_stamp = None, None
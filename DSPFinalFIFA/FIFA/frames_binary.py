@@ -0,0 +1,132 @@
+"""
+Binary Frames Format
+Compact response format for pitch rendering: one frame per event or
+snapshot (ball position plus player positions), stored as little-endian
+typed arrays that the browser wraps without parsing. Negotiated with
+`Accept: application/vnd.fifa.frames` (or `?format=frames`); JSON stays
+the default.
+
+Layout (all integers little-endian, every array 4-byte aligned):
+    header      48 bytes: magic 'FIFB', uint16 version, uint16 header size,
+                uint32 frameCount, uint32 playerCount, then the uint32 byte
+                offsets of each section below and the uint32 meta length
+    offsets     uint32[frameCount + 1]  first player row of each frame
+    ball        float32[frameCount * 3] x, y, z (NaN when unknown)
+    playerXY    float32[playerCount * 2]
+    playerIds   uint32[playerCount]
+    jerseys     uint8[playerCount]
+    sides       uint8[playerCount]      0 = home, 1 = away
+    meta        UTF-8 JSON: what each frame is (sequence, event, result...)
+"""
+import json
+import struct
+from typing import List, Dict, Any, Iterable
+
+import numpy as np
+from django.http import HttpResponse
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+MEDIA_TYPE = 'application/vnd.fifa.frames'
+FORMAT_VERSION = 1
+MAGIC = b'FIFB'
+HEADER = struct.Struct('<4sHHIIIIIIIIII')  # See module docstring
+
+
+def wants_frames(request) -> bool:
+    """True when the client asked for the binary frames format"""
+    if request.GET.get('format') == 'frames':
+        return True
+    return MEDIA_TYPE in request.META.get('HTTP_ACCEPT', '')
+
+
+def _number(value: Any) -> float:
+    return np.nan if value is None else value
+
+
+def _align(parts: List[bytes], size: int) -> int:
+    """Pad to a 4-byte boundary; returns the new size"""
+    padding = -size % 4
+    if padding:
+        parts.append(b'\0' * padding)
+    return size + padding
+
+
+def encode_frames(frames: Iterable[Dict], meta: Dict[str, Any]) -> bytes:
+    """
+    Binary body of frames: dicts with 'ballPosition' (or 'ball') and
+    'homePlayers' / 'awayPlayers' lists of {x, y, playerId, jerseyNum}.
+    """
+    offsets, ball, xy, ids, jerseys, sides = [0], [], [], [], [], []
+    for frame in frames:
+        position = frame.get('ballPosition') or frame.get('ball') or {}
+        ball.extend((_number(position.get('x')), _number(position.get('y')), _number(position.get('z'))))
+        for side, key in ((0, 'homePlayers'), (1, 'awayPlayers')):
+            for player in frame.get(key) or []:
+                xy.extend((_number(player.get('x')), _number(player.get('y'))))
+                ids.append(player.get('playerId') or 0)
+                jerseys.append(player.get('jerseyNum') or 0)
+                sides.append(side)
+        offsets.append(len(ids))
+
+    sections = [
+        np.array(offsets, dtype='<u4'),
+        np.array(ball, dtype='<f4'),
+        np.array(xy, dtype='<f4'),
+        np.array(ids, dtype='<u4'),
+        np.clip(np.array(jerseys, dtype=np.int64), 0, 255).astype(np.uint8),
+        np.array(sides, dtype=np.uint8),
+        json.dumps(meta).encode('utf-8')
+    ]
+
+    parts, size, section_offsets = [], HEADER.size, []
+    for section in sections:
+        data = section if isinstance(section, bytes) else section.tobytes()
+        section_offsets.append(size)
+        parts.append(data)
+        size = _align(parts, size + len(data))
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, HEADER.size, len(offsets) - 1, len(ids),
+                         *section_offsets, len(sections[-1]))
+    return header + b''.join(parts)
+
+
+def decode_frames(body: bytes) -> Dict[str, Any]:
+    """Arrays and meta of an encode_frames() body (for Python clients and tests)"""
+    (magic, version, _, frame_count, player_count, offsets_at, ball_at, xy_at,
+     ids_at, jerseys_at, sides_at, meta_at, meta_length) = HEADER.unpack_from(body)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError('Not a version %d frames body' % FORMAT_VERSION)
+    return {
+        'offsets': np.frombuffer(body, '<u4', frame_count + 1, offsets_at),
+        'ball': np.frombuffer(body, '<f4', frame_count * 3, ball_at).reshape(-1, 3),
+        'playerXY': np.frombuffer(body, '<f4', player_count * 2, xy_at).reshape(-1, 2),
+        'playerIds': np.frombuffer(body, '<u4', player_count, ids_at),
+        'jerseys': np.frombuffer(body, np.uint8, player_count, jerseys_at),
+        'sides': np.frombuffer(body, np.uint8, player_count, sides_at),
+        'meta': json.loads(body[meta_at:meta_at + meta_length].decode('utf-8'))
+    }
+
+
+def frames_response(frames: Iterable[Dict], meta: Dict[str, Any]) -> HttpResponse:
+    return HttpResponse(encode_frames(frames, meta), content_type=MEDIA_TYPE)
+
+
+def cached_frames(payload) -> 'CachedBody':
+    """response_cache encoder for a (frames, meta) payload"""
+    from .response_cache import CachedBody
+
+    frames, meta = payload
+    return CachedBody(encode_frames(frames, meta), None, MEDIA_TYPE)
+
+
+def sequence_frames(sequences: List[Dict]) -> List[Dict]:
+    """Every event of the sequences, in order (one frame each)"""
+    return [event for sequence in sequences for event in sequence['events']]
+
+
+def sequence_meta(sequences: List[Dict]) -> List[Dict]:
+    """What the frames of sequence_frames() are: each sequence's id and event count"""
+    return [{'sequenceId': s.get('sequenceId'), 'eventCount': len(s['events'])} for s in sequences]
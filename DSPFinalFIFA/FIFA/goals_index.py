@@ -0,0 +1,150 @@
+"""
+Tournament Goals Index
+Every goal of every match, extracted once during the shared ingest together
+with its pass sequence and key-player snapshot, and filterable across matches
+"""
+import threading
+from typing import List, Dict, Optional
+
+from .ingest import IndexBuilder, MatchSequences, run_ingest
+
+
+# =============================================================================
+# GLOBAL STATE
+# =============================================================================
+_goals: List[Dict] = []  # Tournament goals in match date order, then match order
+_index_ready = False
+_index_fingerprint: Optional[str] = None  # MatchRepository.dataset_fingerprint() the index was built for
+_index_lock = threading.Lock()
+
+
+def _goal_entry(match, match_seq: MatchSequences, goal: Dict) -> Dict:
+    """A find_goals() dict plus the match context needed to filter and display it"""
+    home_id = match.home_team.team_id if match.home_team else ''
+    scoring_team = match_seq.home_team if goal['scoringTeamId'] == home_id else match_seq.away_team
+    return dict(
+        goal,
+        matchId=match_seq.match_id,
+        date=match._metadata.get('date', '') if match._metadata else '',
+        homeTeam=match_seq.home_team,
+        awayTeam=match_seq.away_team,
+        teamName=scoring_team.get('name', '') if scoring_team else ''
+    )
+
+
+class GoalsIndexBuilder(IndexBuilder):
+    """Collects the goals of every match during the shared ingest pass"""
+
+    name = 'goals'
+
+    def __init__(self):
+        from .fifa import MatchRepository
+
+        self.goals: List[Dict] = []
+        self.fingerprint = MatchRepository.dataset_fingerprint()  # Taken before reading any match
+
+    def is_ready(self) -> bool:
+        return _index_ready and _index_fingerprint == self.fingerprint
+
+    def load_snapshot(self) -> bool:
+        # Prebuilt snapshot from `manage.py build_fifa_store`, if still valid
+        from .fifa_store import load_index_snapshot
+        snapshot = load_index_snapshot('goals', index_settings())
+        if snapshot is None:
+            return False
+        _install_index(snapshot, self.fingerprint)
+        print(f"[Goals] Loaded prebuilt goals index ({len(_goals)} goals)")
+        return True
+
+    def add_match(self, match: MatchSequences) -> None:
+        from .fifa import MatchRepository
+
+        repo_match = MatchRepository.get_match(match.match_id)
+        self.goals.extend(_goal_entry(repo_match, match, goal) for goal in repo_match.find_goals())
+
+    def finish(self) -> None:
+        _install_index({'goals': self.goals}, self.fingerprint)
+        print(f"[Goals] Indexed {len(self.goals)} goals")
+
+
+def ensure_goals_index() -> None:
+    """
+    Load the prebuilt goals index, or extract it with an ingest pass; rebuilt
+    when the data files changed since (like the per-match goals)
+    """
+    from .http_cache import dataset_version
+
+    fingerprint = dataset_version().files_fingerprint
+    if _index_ready and _index_fingerprint == fingerprint:
+        return
+    with _index_lock:
+        if _index_ready and _index_fingerprint == fingerprint:
+            return
+        if _index_ready:
+            print("[Goals] Data files changed, rebuilding goals index")
+        builder = GoalsIndexBuilder()
+        if not builder.is_ready() and not builder.load_snapshot():
+            run_ingest([builder])
+
+
+# =============================================================================
+# INDEX SNAPSHOTS
+# =============================================================================
+def index_settings() -> Dict:
+    """Settings the index contents depend on (a snapshot is reused only if they match)"""
+    from .fifa import goal_settings
+    return goal_settings()
+
+
+def export_index() -> Dict:
+    """Current index state, for persisting with fifa_store.save_index_snapshot"""
+    ensure_goals_index()
+    return {'goals': _goals}
+
+
+def _install_index(state: Dict, fingerprint: str) -> None:
+    global _goals, _index_ready, _index_fingerprint
+    _goals = state['goals']
+    _index_fingerprint = fingerprint
+    _index_ready = True
+
+
+def reset_goals_index() -> None:
+    """Reset the goals index (rebuilt on next use)"""
+    global _goals, _index_ready, _index_fingerprint
+    _goals = []
+    _index_ready = False
+    _index_fingerprint = None
+
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+def filter_goals(team: Optional[str] = None, player: Optional[str] = None,
+                 period: Optional[int] = None, penalty: Optional[bool] = None) -> List[Dict]:
+    """
+    Goals matching every given filter (shared dicts, do not mutate).
+
+    Args:
+        team: Scoring team id, or team name (case-insensitive)
+        player: Scorer player id, or part of the scorer's name (case-insensitive)
+        period: Match period (1, 2, ...)
+        penalty: True = penalties only, False = no penalties
+    """
+    ensure_goals_index()
+
+    team = team.strip().lower() if team else None
+    player = player.strip().lower() if player else None
+
+    results = []
+    for goal in _goals:
+        if team and team != goal['scoringTeamId'].lower() and team != goal['teamName'].lower():
+            continue
+        if player and player != str(goal['scorerId']).lower() and player not in goal['scorerName'].lower():
+            continue
+        if period is not None and goal['period'] != period:
+            continue
+        if penalty is not None and goal['isPenalty'] != penalty:
+            continue
+        results.append(goal)
+    return results
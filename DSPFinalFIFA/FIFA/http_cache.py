@@ -0,0 +1,155 @@
+"""
+HTTP Validators
+Strong ETags, Last-Modified and Cache-Control for the read-only API
+endpoints, derived from a dataset fingerprint. Conditional GETs are
+answered with 304 before the view runs.
+"""
+import functools
+import hashlib
+import threading
+import time
+from typing import Optional, NamedTuple
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+CACHE_CONTROL = 'public, max-age=60'  # Browsers revalidate (cheaply) after a minute
+FINGERPRINT_TTL_SECONDS = 1.0         # Data files are re-stated at most this often
+GZIP_ETAG_SUFFIX = '-gzip'            # Distinguishes the gzip representation's strong ETag
+VARY_HEADERS = ('Accept', 'Accept-Encoding')  # Representations are negotiated on both
+
+
+class DatasetVersion(NamedTuple):
+    """Fingerprint the validators derive from, and when the data last changed"""
+    fingerprint: str
+    last_modified: int        # Newest data file mtime, in seconds
+    files_fingerprint: str    # MatchRepository.dataset_fingerprint() it was computed for
+    checked: float            # time.monotonic() of the last stat pass
+
+
+_version: Optional[DatasetVersion] = None
+_settings_digest: Optional[str] = None
+_lock = threading.Lock()
+
+
+def _settings() -> str:
+    """Digest of the settings served data depends on (fixed for the process lifetime)"""
+    global _settings_digest
+    if _settings_digest is None:
+        from .fifa import goal_settings
+        from .fifa_store import STORE_VERSION, _index_settings
+
+        _settings_digest = repr((STORE_VERSION, goal_settings(), _index_settings()))
+    return _settings_digest
+
+
+def dataset_version() -> DatasetVersion:
+    """
+    The current dataset version. Its fingerprint is the content hash recorded
+    by build_fifa_store when the store matches the files on disk (mtime and
+    size stamps otherwise), combined with the settings digest.
+    """
+    global _version
+
+    version = _version
+    now = time.monotonic()
+    if version is not None and now - version.checked < FINGERPRINT_TTL_SECONDS:
+        return version
+
+    from .fifa import MatchRepository
+    from .fifa_store import content_fingerprint
+
+    files = MatchRepository.dataset_files()
+    files_fingerprint = MatchRepository.dataset_fingerprint_of(files)
+    with _lock:
+        if _version is not None and _version.files_fingerprint == files_fingerprint:
+            _version = _version._replace(checked=now)
+            return _version
+        content = content_fingerprint(files_fingerprint) or files_fingerprint
+        _version = DatasetVersion(
+            fingerprint=hashlib.sha1(f"{content}\n{_settings()}".encode('utf-8')).hexdigest(),
+            last_modified=max((mtime_ns // 1_000_000_000 for _, _, _, mtime_ns in files), default=0),
+            files_fingerprint=files_fingerprint,
+            checked=now
+        )
+        return _version
+
+
+def reset_dataset_version() -> None:
+    """Recompute the fingerprint on next use"""
+    global _version
+    with _lock:
+        _version = None
+
+
+def request_etag(request, version: DatasetVersion) -> str:
+    """Strong ETag (quoted) of the identity representation of this GET"""
+    from .frames_binary import wants_frames
+
+    query = '&'.join(f'{k}={v}' for k, v in sorted(request.GET.lists()))
+    media = 'frames' if wants_frames(request) else 'json'  # Negotiated by Accept
+    digest = hashlib.sha1(f"{version.fingerprint}\n{request.path}\n{query}\n{media}".encode('utf-8'))
+    return f'"{digest.hexdigest()}"'
+
+
+def _matching_etag(request, etag: str) -> Optional[str]:
+    """The If-None-Match tag naming a representation of etag, if any"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return None
+    if header.strip() == '*':
+        return etag
+    for tag in (t.strip() for t in header.split(',')):
+        if tag.startswith('W/'):
+            continue  # Strong comparison only
+        if tag == etag or tag == etag[:-1] + GZIP_ETAG_SUFFIX + '"':
+            return tag
+    return None
+
+
+def _set_validators(response, etag: str, version: DatasetVersion) -> None:
+    if response.get('Content-Encoding') == 'gzip':
+        etag = etag[:-1] + GZIP_ETAG_SUFFIX + '"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(version.last_modified)
+    response['Cache-Control'] = CACHE_CONTROL
+    patch_vary_headers(response, VARY_HEADERS)
+
+
+def conditional_get(view):
+    """
+    Add validators to a read-only view's successful GET responses and answer
+    If-None-Match / If-Modified-Since with 304 before the view runs.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+
+        version = dataset_version()
+        etag = request_etag(request, version)
+
+        matched = _matching_etag(request, etag)
+        if matched is None and 'HTTP_IF_NONE_MATCH' not in request.META:
+            since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+            if since is not None and version.last_modified <= since:
+                matched = etag
+        if matched is not None:
+            response = HttpResponseNotModified()
+            response['ETag'] = matched
+            response['Last-Modified'] = http_date(version.last_modified)
+            response['Cache-Control'] = CACHE_CONTROL
+            patch_vary_headers(response, VARY_HEADERS)
+            return response
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            _set_validators(response, etag, version)
+        return response
+
+    return wrapper
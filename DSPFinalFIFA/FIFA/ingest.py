@@ -0,0 +1,149 @@
+"""
+Shared Ingest Pipeline
+Walks every match once, groups its plays by sequence, and feeds the result to
+any number of index builders (DTW features, TF-IDF texts, ...)
+"""
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Any, Callable, Iterator
+
+
+# =============================================================================
+# SHARED INGEST RECORDS
+# =============================================================================
+@dataclass
+class MatchSequences:
+    """One match's plays, in event order and grouped by sequence"""
+    match_id: str
+    home_team: Optional[Dict]
+    away_team: Optional[Dict]
+    plays: List[Dict]
+    sequences: List[Dict]  # First-seen order; 'sequenceId' None collects plays without a sequence
+
+
+def group_plays_by_sequence(plays: List[Dict]) -> List[Dict]:
+    """
+    Group plays by their 'sequence' value, in first-seen order. Each group
+    keeps the time, set piece and team of its first play.
+    """
+    groups: Dict[Any, Dict] = {}
+    for play in plays:
+        seq_id = play.get('sequence')
+        group = groups.get(seq_id)
+        if group is None:
+            group = groups[seq_id] = {
+                'sequenceId': seq_id,
+                'events': [],
+                'time': play.get('time', ''),
+                'setpieceLabel': play.get('setpieceLabel', ''),
+                'teamId': play.get('teamId', '')
+            }
+        group['events'].append(play)
+    return list(groups.values())
+
+
+def iter_match_sequences() -> Iterator[MatchSequences]:
+    """Every match (by date), with its memoized plays and sequence groups."""
+    from .fifa import MatchRepository
+
+    for match in MatchRepository.get_all_matches():
+        table = match.plays_table()
+        yield MatchSequences(
+            match_id=str(match.match_id),
+            home_team=match.home_team.to_dict() if match.home_team else None,
+            away_team=match.away_team.to_dict() if match.away_team else None,
+            plays=list(table.plays),
+            sequences=list(table.groups)
+        )
+
+
+# =============================================================================
+# ABSTRACTION: Index builders consume the shared ingest
+# =============================================================================
+class IndexBuilder(ABC):
+    """Builds one search index from the shared per-match ingest"""
+
+    name = ''
+
+    def is_ready(self) -> bool:
+        """True when the index is already built (the builder is skipped)"""
+        return False
+
+    def load_snapshot(self) -> bool:
+        """Install a prebuilt snapshot instead of building; True on success"""
+        return False
+
+    @abstractmethod
+    def add_match(self, match: MatchSequences) -> None:
+        """Consume one match"""
+        pass
+
+    @abstractmethod
+    def finish(self) -> None:
+        """Finalize and install the index after the last match"""
+        pass
+
+
+def _default_builders() -> Dict[str, Callable[[], IndexBuilder]]:
+    from . import DTW, TF_IDF, goals_index
+
+    return {
+        'tfidf': TF_IDF.TfidfIndexBuilder,
+        'dtw': DTW.SequenceIndexBuilder,
+        'goals': goals_index.GoalsIndexBuilder
+    }
+
+
+_extra_builders: Dict[str, Callable[[], IndexBuilder]] = {}
+
+
+def register_index_builder(name: str, factory: Callable[[], IndexBuilder]) -> None:
+    """Add an index built during warm-up alongside DTW and TF-IDF"""
+    _extra_builders[name] = factory
+
+
+def get_index_builders() -> Dict[str, Callable[[], IndexBuilder]]:
+    return {**_default_builders(), **_extra_builders}
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+def run_ingest(builders: List[IndexBuilder]) -> None:
+    """Feed every match to all builders in a single pass, then finish them."""
+    if not builders:
+        return
+
+    names = ', '.join(builder.name for builder in builders)
+    print(f"[Ingest] Building {names} in one pass...")
+    start = time.perf_counter()
+
+    matches = 0
+    for match in iter_match_sequences():
+        for builder in builders:
+            builder.add_match(match)
+        matches += 1
+
+    for builder in builders:
+        builder.finish()
+    print(f"[Ingest] {matches} matches ingested in {time.perf_counter() - start:.1f}s")
+
+
+def warm_indexes(names: Optional[List[str]] = None) -> List[str]:
+    """
+    Make the named indexes (default: all registered) available, loading
+    prebuilt snapshots where valid and building the rest in one shared pass.
+
+    Returns: names of the indexes that had to be built
+    """
+    factories = get_index_builders()
+    builders = []
+    for name in names or list(factories):
+        builder = factories[name]()
+        if builder.is_ready() or builder.load_snapshot():
+            continue
+        builders.append(builder)
+
+    run_ingest(builders)
+    return [builder.name for builder in builders]
@@ -0,0 +1,69 @@
+"""
+Streaming JSON Responses
+Writes a JSON object whose largest array is produced lazily, in chunks, so
+a large response is never held in memory as one document. Output is byte-
+identical to JsonResponse; works under WSGI (sync iterator) and ASGI
+(async iterator, serialized in a worker thread).
+"""
+from typing import Dict, Any, Iterator, AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+STREAM_CHUNK_BYTES = 64 * 1024  # Items are batched into chunks of about this size
+
+
+def iter_json(payload: Dict[str, Any], stream_key: str) -> Iterator[bytes]:
+    """
+    json.dumps(payload) in chunks, where payload[stream_key] is an iterable
+    encoded item by item as it is consumed.
+    """
+    encode = DjangoJSONEncoder().encode
+    parts, size = [], 0
+
+    def flush() -> bytes:
+        nonlocal parts, size
+        chunk = ''.join(parts).encode('utf-8')
+        parts, size = [], 0
+        return chunk
+
+    parts.append('{')
+    for position, (key, value) in enumerate(payload.items()):
+        parts.append(f"{', ' if position else ''}{encode(key)}: ")
+        if key != stream_key:
+            parts.append(encode(value))
+            continue
+        parts.append('[')
+        for index, item in enumerate(value):
+            text = encode(item)
+            parts.append(f', {text}' if index else text)
+            size += len(text)
+            if size >= STREAM_CHUNK_BYTES:
+                yield flush()
+        parts.append(']')
+    parts.append('}')
+    yield flush()
+
+
+async def _aiter_chunks(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Serialize each chunk in a worker thread so the event loop is not blocked"""
+    next_chunk = sync_to_async(lambda: next(chunks, None), thread_sensitive=False)
+    while True:
+        chunk = await next_chunk()
+        if chunk is None:
+            return
+        yield chunk
+
+
+def streaming_json_response(request, payload: Dict[str, Any], stream_key: str) -> StreamingHttpResponse:
+    """Stream payload (see iter_json) with the iterator type the server handler consumes natively"""
+    chunks = iter_json(payload, stream_key)
+    if isinstance(request, ASGIRequest):
+        chunks = _aiter_chunks(chunks)
+    return StreamingHttpResponse(chunks, content_type='application/json')
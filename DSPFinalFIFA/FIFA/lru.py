@@ -0,0 +1,154 @@
+"""
+Byte-Budgeted LRU Cache
+Keeps the most recently used entries while their estimated sizes fit in a
+fixed number of bytes, counting hits, misses and evictions
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Hashable
+
+import numpy as np
+
+
+# =============================================================================
+# SIZE ESTIMATION
+# =============================================================================
+SAMPLE_SIZE = 32  # Items measured per long list/tuple; the rest is extrapolated
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Approximate heap bytes held by a JSON-like object graph. Long lists are
+    sampled, shared objects are counted once, and memory-mapped arrays count
+    nothing (their pages belong to the OS page cache).
+    """
+    seen = set()
+
+    def walk(value: Any) -> int:
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+
+        if isinstance(value, np.ndarray):
+            return 0 if isinstance(value.base, np.memmap) or isinstance(value, np.memmap) else value.nbytes
+        size = sys.getsizeof(value)
+        if isinstance(value, dict):
+            return size + sum(walk(k) + walk(v) for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            n = len(value)
+            if n <= SAMPLE_SIZE:
+                return size + sum(walk(item) for item in value)
+            step = n / SAMPLE_SIZE
+            sampled = sum(walk(value[int(i * step)]) for i in range(SAMPLE_SIZE))
+            return size + int(sampled * n / SAMPLE_SIZE)
+        if hasattr(value, '__dict__') and not isinstance(value, type):
+            return size + walk(vars(value))  # Dataclasses and plain objects
+        return size
+
+    return walk(obj)
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+class ByteBudgetLRU:
+    """
+    LRU mapping bounded by the summed size estimates of its entries.
+    The most recently inserted entry is never evicted, even when it alone
+    exceeds the budget. on_evict(key, value) is called for every eviction.
+    """
+
+    def __init__(self, budget_bytes: int, name: str = 'cache',
+                 sizeof: Callable[[Any], int] = estimate_size,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.budget_bytes = budget_bytes
+        self.name = name
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value for key (marked most recently used), counting a hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        """Insert or replace an entry, then evict down to the budget"""
+        size = self._sizeof(value) if size is None else size
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            evicted = self._evict()
+
+        self._notify(evicted)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry without counting it as an eviction"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def set_budget(self, budget_bytes: int) -> None:
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            evicted = self._evict()
+        self._notify(evicted)
+
+    def _evict(self) -> list:
+        """Drop least recently used entries until within budget (lock held)"""
+        evicted = []
+        while self._bytes > self.budget_bytes and len(self._entries) > 1:
+            key, (value, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+            evicted.append((key, value, size))
+        return evicted
+
+    def _notify(self, evicted: list) -> None:
+        for key, value, size in evicted:
+            print(f"[Cache] {self.name}: evicted {key} ({size / 1024:.0f} KB)")
+            if self._on_evict is not None:
+                self._on_evict(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, bytes in use, budget and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'budgetBytes': self.budget_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hitRate': round(self._hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,31 @@
+"""
+Build every derived data artifact ahead of time
+Usage: python manage.py build_fifa_store [--workers N] [--force] [--neighbors]
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ('Ingest the FIFA data files into event stores, per-match plays and goals, '
+            'and search index snapshots (only changed matches are rebuilt)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: all cores)')
+        parser.add_argument('--force', action='store_true',
+                            help='Re-hash every file and rebuild everything')
+        parser.add_argument('--neighbors', action='store_true',
+                            help='Also bring the precomputed neighbour tables up to date')
+
+    def handle(self, *args, **options):
+        from DSPFinalFIFA.FIFA.fifa_store import build_fifa_store
+
+        manifest = build_fifa_store(
+            workers=options['workers'],
+            force=options['force'],
+            neighbors=options['neighbors']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"FIFA store ready: {len(manifest['matches'])} matches, "
+            f"{sum(m['plays'] for m in manifest['matches'].values())} plays"
+        ))
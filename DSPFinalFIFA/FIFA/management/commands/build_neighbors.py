@@ -0,0 +1,29 @@
+"""
+Precompute nearest-neighbour tables for every indexed sequence
+Usage: python manage.py build_neighbors [--top-k 20] [--workers N] [--force]
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Precompute top-K DTW, TF-IDF and hybrid neighbours for every indexed sequence'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=None,
+                            help='Neighbours stored per sequence (default: NEIGHBOR_TOP_K)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: all cores)')
+        parser.add_argument('--force', action='store_true',
+                            help='Discard existing and partial tables and start over')
+
+    def handle(self, *args, **options):
+        from DSPFinalFIFA.FIFA.neighbors import build_neighbor_tables
+
+        manifest = build_neighbor_tables(
+            top_k=options['top_k'],
+            workers=options['workers'],
+            force=options['force']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Neighbour tables ready: {manifest['sequences']} sequences, top {manifest['topK']}"
+        ))
@@ -0,0 +1,132 @@
+"""
+Match Manifest
+Date-sorted summaries of every match (teams, kits, date, stadium, goal count)
+and per-match statistics with their JSON pre-serialized, so the match listing
+and summary endpoints do no per-request work. Rebuilt only when the data directories' mtime or file set change.
+"""
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Tuple, Optional
+
+from .fifa import DATA_DIR, MatchRepository
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+MANIFEST_FOLDERS = ('Metadata', 'Event Data')  # Summaries read metadata; statistics read events
+
+
+@dataclass(frozen=True)
+class MatchManifest:
+    """Read-only listing of every match, in date order"""
+    version: Tuple                # (folder, name, size, mtime) of every file summarized
+    match_ids: Tuple[str, ...]
+    summaries: Tuple[Dict, ...]   # Match.to_dict() plus 'goalCount'
+    matches_json: str             # json.dumps(summaries), for the index template
+    api_body: bytes               # Body of /api/matches/
+    statistics: Dict[str, Dict]   # match_id -> Match.summary()
+    statistics_bodies: Dict[str, bytes]  # match_id -> body of /api/matches/<id>/summary/
+
+
+_manifest: Optional[MatchManifest] = None
+_dir_stamp: Optional[Tuple] = None  # Directory mtimes when _manifest was last validated
+_lock = threading.Lock()
+
+
+def _directory_stamp() -> Tuple:
+    """mtime of each summarized folder; changes when files are added, removed or renamed"""
+    stamp = []
+    for folder in MANIFEST_FOLDERS:
+        try:
+            stamp.append(os.stat(DATA_DIR / folder).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _file_set() -> Tuple:
+    """(folder, name, size, mtime) of every data file summarized"""
+    files = []
+    for folder in MANIFEST_FOLDERS:
+        directory = DATA_DIR / folder
+        if not directory.exists():
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    files.append((folder, entry.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(files))
+
+
+def _build_manifest(version: Tuple) -> MatchManifest:
+    """
+    Summaries come from the build_fifa_store manifest where it is current;
+    only matches missing there are summarized from their events.
+    """
+    from .fifa_store import load_match_summary
+
+    matches = [MatchRepository.get_match(mid) for mid in MatchRepository.get_all_match_ids()]
+    matches.sort(key=lambda m: m._metadata.get('date', '') if m._metadata else '')
+
+    summaries = []
+    statistics = {}
+    computed = 0
+    for match in matches:
+        stats = load_match_summary(match.match_id)
+        if stats is None:
+            stats = match.summary()
+            computed += 1
+        statistics[str(match.match_id)] = stats
+        summary = match.to_dict()
+        summary['goalCount'] = stats['goals']
+        summaries.append(summary)
+
+    matches_json = json.dumps(summaries)
+    print(f"[Manifest] Summarized {len(summaries)} matches ({computed} from events)")
+    return MatchManifest(
+        version=version,
+        match_ids=tuple(str(m.match_id) for m in matches),
+        summaries=tuple(summaries),
+        matches_json=matches_json,
+        api_body=('{"matches": ' + matches_json + '}').encode('utf-8'),
+        statistics=statistics,
+        statistics_bodies={
+            match_id: json.dumps({'matchId': match_id, 'summary': stats}).encode('utf-8')
+            for match_id, stats in statistics.items()
+        }
+    )
+
+
+def get_match_manifest() -> MatchManifest:
+    """
+    The current manifest. Costs one stat per data folder while nothing
+    changed; a changed directory mtime triggers a rescan, and the manifest
+    is rebuilt only if the scanned file set differs.
+    """
+    global _manifest, _dir_stamp
+
+    dir_stamp = _directory_stamp()
+    manifest = _manifest
+    if manifest is not None and dir_stamp == _dir_stamp:
+        return manifest
+
+    with _lock:
+        if _manifest is not None and dir_stamp == _dir_stamp:
+            return _manifest
+        version = _file_set()
+        if _manifest is None or _manifest.version != version:
+            _manifest = _build_manifest(version)
+        _dir_stamp = dir_stamp
+        return _manifest
+
+
+def reset_match_manifest() -> None:
+    """Force a rebuild on next access (e.g. after editing a file in place)"""
+    global _manifest, _dir_stamp
+    with _lock:
+        _manifest = None
+        _dir_stamp = None
@@ -0,0 +1,122 @@
+"""
+Match Summary Statistics
+Goals, shots, passes by outcome, crosses, clearances, challenges, sequences
+and set pieces of one match, with home/away splits, counted in one
+vectorized pass over the event columns
+"""
+from typing import Dict, Optional, Any
+
+import numpy as np
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# Possession event types counted, by summary key
+SUMMARY_EVENT_TYPES = {
+    'shots': 'SH',
+    'passes': 'PA',
+    'crosses': 'CR',
+    'clearances': 'CL',
+    'challenges': 'CH'
+}
+
+# Event columns read, by short name
+SUMMARY_COLUMNS = {
+    'type': 'possessionEvents.possessionEventType',
+    'team': 'gameEvents.teamId',
+    'sequence': 'sequence',
+    'setpiece': 'gameEvents.setpieceType',
+    'passOutcome': 'possessionEvents.passOutcomeType',
+    'shotOutcome': 'possessionEvents.shotOutcomeType',
+    'clock': 'gameEvents.startFormattedGameClock',
+    'shooter': 'possessionEvents.shooterPlayerId'
+}
+
+
+def _event_columns(events, store) -> Dict[str, np.ndarray]:
+    """Object arrays of the summary columns plus a boolean 'nonEvent' mask"""
+    if store is not None:
+        columns = {
+            name: np.array(store.column(path) if path in store.columns else [None] * len(store), dtype=object)
+            for name, path in SUMMARY_COLUMNS.items()
+        }
+        columns['nonEvent'] = store.truthy('possessionEvents.nonEvent')
+        return columns
+
+    # JSON events: a single pass fills every column
+    values = {name: [] for name in SUMMARY_COLUMNS}
+    non_event = []
+    for event in events:
+        for name, path in SUMMARY_COLUMNS.items():
+            group, _, key = path.rpartition('.')
+            source = (event.get(group) or {}) if group else event
+            values[name].append(source.get(key))
+        non_event.append(bool((event.get('possessionEvents') or {}).get('nonEvent')))
+    columns = {name: np.array(column, dtype=object) for name, column in values.items()}
+    columns['nonEvent'] = np.array(non_event, dtype=bool)
+    return columns
+
+
+def _value_counts(values: np.ndarray) -> Dict[str, int]:
+    """Occurrences of each non-null value, keyed by str(value)"""
+    present = values[values != None]  # noqa: E711 - elementwise comparison
+    if not len(present):
+        return {}
+    keys, counts = np.unique(present.astype(str), return_counts=True)
+    return {str(k): int(c) for k, c in zip(keys, counts)}
+
+
+def _goal_rows(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Valid goal shots, deduplicated by (game clock, shooter) like Match.count_goals"""
+    rows = np.flatnonzero((columns['shotOutcome'] == 'G') & ~columns['nonEvent'])
+    keys = [f"{clock}_{'' if shooter is None else shooter}"
+            for clock, shooter in zip(columns['clock'][rows], columns['shooter'][rows])]
+    _, first = np.unique(np.array(keys, dtype=object).astype(str), return_index=True) if keys else ([], [])
+    return rows[np.sort(np.asarray(first, dtype=np.int64))]
+
+
+def _counts(columns: Dict[str, np.ndarray], mask: np.ndarray, goal_rows: np.ndarray) -> Dict[str, Any]:
+    """Event counts over the rows selected by mask"""
+    played = mask & ~columns['nonEvent']
+    stats = {'goals': int(mask[goal_rows].sum())}
+    for key, event_type in SUMMARY_EVENT_TYPES.items():
+        stats[key] = int((played & (columns['type'] == event_type)).sum())
+    passes = played & (columns['type'] == 'PA')
+    stats['passOutcomes'] = _value_counts(columns['passOutcome'][passes])
+    return stats
+
+
+def compute_summary(events, store, home_team_id: str, away_team_id: str,
+                    setpiece_labels: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Summary statistics of one match.
+
+    Args:
+        events: The match's events (list or store rows)
+        store: Columnar event store backing events, or None
+        home_team_id, away_team_id: Team ids for the home/away splits
+        setpiece_labels: Set piece code -> label, for 'setPieces'
+    """
+    columns = _event_columns(events, store)
+    everything = np.ones(len(columns['type']), dtype=bool)
+    goal_rows = _goal_rows(columns)
+
+    # Sequences and the set piece each one started from
+    sequence = columns['sequence']
+    with_sequence = np.flatnonzero(sequence != None)  # noqa: E711
+    _, first = np.unique(sequence[with_sequence].astype(np.float64), return_index=True)
+    starts = with_sequence[first]
+    setpieces = {
+        (setpiece_labels or {}).get(code, code): count
+        for code, count in _value_counts(columns['setpiece'][starts]).items()
+        if code != 'O'
+    }
+
+    team = columns['team'].astype(str)
+    summary = dict(_counts(columns, everything, goal_rows), sequences=int(len(starts)), setPieces=setpieces)
+    summary['teams'] = {
+        side: dict(_counts(columns, team == str(team_id), goal_rows), teamId=str(team_id))
+        for side, team_id in (('home', home_team_id), ('away', away_team_id))
+    }
+    return summary
@@ -0,0 +1,408 @@
+"""
+Precomputed Nearest-Neighbour Tables
+Offline job that stores the top-K DTW, TF-IDF and hybrid neighbours of every
+indexed sequence, so search-by-reference is answered by a table lookup
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Any
+
+import numpy as np
+
+from .fifa import CACHE_DIR, MatchRepository
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+NEIGHBOR_TOP_K = 20                 # Neighbours stored per sequence (largest servable topN)
+NEIGHBOR_DIR = CACHE_DIR / 'neighbors'
+NEIGHBOR_CHUNK_SIZE = 64            # Sequences per resumable work unit
+NEIGHBOR_WORKERS = None             # None = os.cpu_count()
+NEIGHBOR_METHODS = ('dtw', 'tfidf', 'hybrid')
+
+MANIFEST_NAME = 'manifest.json'
+TABLE_NAME = 'neighbors.npz'
+
+
+# =============================================================================
+# FINGERPRINTS
+# =============================================================================
+def _job_settings() -> Dict[str, Any]:
+    """Scoring settings the tables depend on (workers must score identically)."""
+    from . import DTW, TF_IDF
+
+    return {
+        'backend': DTW.DTW_BACKEND,
+        'weights': dict(DTW.WEIGHTS),
+        'optional_features': dict(DTW.OPTIONAL_FEATURES),
+        'max_distance': DTW.MAX_DISTANCE,
+        'hybrid_weights': [TF_IDF.HYBRID_WEIGHT_DTW, TF_IDF.HYBRID_WEIGHT_TFIDF],
+        'hybrid_internal_top_n': TF_IDF.HYBRID_INTERNAL_TOP_N
+    }
+
+
+def config_fingerprint() -> str:
+    """Hash of the current scoring settings."""
+    encoded = json.dumps(_job_settings(), sort_keys=True).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def _index_signature() -> str:
+    """Hash of the DTW and TF-IDF index orders (table rows refer to positions)."""
+    from . import DTW, TF_IDF
+
+    digest = hashlib.sha1()
+    for index in (DTW._sequence_index, TF_IDF._sequence_index):
+        for entry in index:
+            digest.update(f"{entry['matchId']}:{entry['sequenceId']}\n".encode('utf-8'))
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+# =============================================================================
+# TABLE COMPUTATION
+# =============================================================================
+def _apply_job_settings(settings: Dict[str, Any]) -> None:
+    """Make this process score exactly like the one that started the job."""
+    from . import DTW, TF_IDF
+
+    DTW.DTW_BACKEND = settings['backend']
+    DTW.WEIGHTS.update(settings['weights'])
+    DTW.OPTIONAL_FEATURES.update(settings['optional_features'])
+    DTW.MAX_DISTANCE = settings['max_distance']
+    TF_IDF.HYBRID_WEIGHT_DTW, TF_IDF.HYBRID_WEIGHT_TFIDF = settings['hybrid_weights']
+    TF_IDF.HYBRID_INTERNAL_TOP_N = settings['hybrid_internal_top_n']
+
+
+def _init_job_worker(settings: Dict[str, Any]) -> None:
+    """Worker initializer: set up Django, build both indexes once."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DSPFinalFIFA.settings')
+    import django
+    django.setup()
+
+    from . import DTW, TF_IDF
+
+    _apply_job_settings(settings)
+    DTW.set_workers(1)  # One process per core already
+    TF_IDF.initialize_cache()
+    DTW.ensure_index_initialized()
+
+
+def _empty_rows(count: int, top_k: int) -> Dict[str, np.ndarray]:
+    """Padded arrays for count table rows (-1 = no neighbour)."""
+    shape = (count, top_k)
+    return {
+        'dtw_available': np.zeros(count, dtype=bool),
+        'dtw_pos': np.full(shape, -1, dtype=np.int32),
+        'dtw_distance': np.zeros(shape, dtype=np.float64),
+        'dtw_similarity': np.zeros(shape, dtype=np.float64),
+        'tfidf_row': np.full(shape, -1, dtype=np.int32),
+        'tfidf_score': np.zeros(shape, dtype=np.float64),
+        'hybrid_dtw_pos': np.full(shape, -1, dtype=np.int32),
+        'hybrid_tfidf_row': np.full(shape, -1, dtype=np.int32),
+        'hybrid_score': np.zeros(shape, dtype=np.float64),
+        'hybrid_dtw_similarity': np.zeros(shape, dtype=np.float64),
+        'hybrid_tfidf_similarity': np.zeros(shape, dtype=np.float64)
+    }
+
+
+def _fill_row(arrays: Dict[str, np.ndarray], i: int, row: int, top_k: int) -> None:
+    """
+    Neighbours of TF-IDF row `row`, computed exactly like a live search by
+    reference (the sequence itself excluded).
+    """
+    from . import DTW, TF_IDF
+
+    entry = TF_IDF._sequence_index[row]
+    key = (str(entry['matchId']), entry['sequenceId'])
+    internal = TF_IDF.HYBRID_INTERNAL_TOP_N
+    width = max(top_k, internal)
+
+    # TF-IDF: same ranking as search_similar_sequences
+    tfidf_ranked = TF_IDF._rank_sequences(None, key[0], key[1], limit=width,
+                                          min_score=0.01, query_key=key)
+    for j, (idx, score) in enumerate(tfidf_ranked[:top_k]):
+        arrays['tfidf_row'][i, j] = idx
+        arrays['tfidf_score'][i, j] = score
+
+    # DTW (and therefore hybrid) needs the sequence in the DTW index
+    if DTW._reference_position(key) is None:
+        return
+    arrays['dtw_available'][i] = True
+
+    dtw_results = DTW.search_similar_sequences_dtw(
+        None, top_n=width, exclude_match_id=key[0], exclude_seq_id=key[1],
+        include_paths=False, query_key=key
+    )
+    for j, result in enumerate(dtw_results[:top_k]):
+        arrays['dtw_pos'][i, j] = DTW._reference_position((result['matchId'], result['sequenceId']))
+        arrays['dtw_distance'][i, j] = result['distance']
+        arrays['dtw_similarity'][i, j] = result['similarity']
+
+    # Hybrid: same fusion as the exhaustive hybrid search
+    dtw_map = {(str(r['matchId']), r['sequenceId']): r for r in dtw_results[:internal]}
+    tfidf_map = {}
+    for idx, score in tfidf_ranked[:internal]:
+        neighbour = TF_IDF._sequence_index[idx]
+        tfidf_map[(str(neighbour['matchId']), neighbour['sequenceId'])] = (idx, score)
+
+    for j, (combined, neighbour_key, dtw_sim, tfidf_sim) in enumerate(
+            TF_IDF._hybrid_scores(dtw_map, tfidf_map)[:top_k]):
+        if neighbour_key in dtw_map:
+            arrays['hybrid_dtw_pos'][i, j] = DTW._reference_position(neighbour_key)
+        if neighbour_key in tfidf_map:
+            arrays['hybrid_tfidf_row'][i, j] = tfidf_map[neighbour_key][0]
+        arrays['hybrid_score'][i, j] = combined
+        arrays['hybrid_dtw_similarity'][i, j] = dtw_sim
+        arrays['hybrid_tfidf_similarity'][i, j] = tfidf_sim
+
+
+def _chunk_path(out_dir: Path, chunk_id: int) -> Path:
+    return out_dir / f'chunk_{chunk_id:05d}.npz'
+
+
+def _save_npz_atomic(path: Path, arrays: Dict[str, np.ndarray]) -> None:
+    """Write an .npz so that a crash never leaves a partial file behind."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _write_manifest(out_dir: Path, manifest: Dict) -> None:
+    tmp_path = out_dir / (MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, out_dir / MANIFEST_NAME)
+
+
+def _read_manifest(out_dir: Path) -> Optional[Dict]:
+    try:
+        with open(out_dir / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _compute_chunk(out_dir: str, chunk_id: int, start: int, end: int, top_k: int) -> int:
+    """Work unit: compute rows [start, end) and persist them as one chunk file."""
+    arrays = _empty_rows(end - start, top_k)
+    for i, row in enumerate(range(start, end)):
+        _fill_row(arrays, i, row, top_k)
+    _save_npz_atomic(_chunk_path(Path(out_dir), chunk_id), arrays)
+    return chunk_id
+
+
+def build_neighbor_tables(top_k: Optional[int] = None,
+                          workers: Optional[int] = None,
+                          force: bool = False,
+                          out_dir: Optional[Path] = None) -> Dict:
+    """
+    Compute the neighbour tables for every sequence in the TF-IDF index.
+
+    Work is split into chunks that are persisted as they finish, so an
+    interrupted run resumes where it stopped. Existing output is discarded
+    when the dataset, scoring settings, index order or top_k changed.
+
+    Returns: the manifest of the finished tables
+    """
+    from . import DTW, TF_IDF
+
+    top_k = top_k or NEIGHBOR_TOP_K
+    workers = workers or NEIGHBOR_WORKERS or os.cpu_count() or 1
+    out_dir = Path(out_dir or NEIGHBOR_DIR)
+
+    TF_IDF.initialize_cache()
+    DTW.ensure_index_initialized()
+
+    total = len(TF_IDF._sequence_index)
+    manifest = {
+        'datasetFingerprint': MatchRepository.dataset_fingerprint(),
+        'configFingerprint': config_fingerprint(),
+        'indexSignature': _index_signature(),
+        'topK': top_k,
+        'sequences': total,
+        'chunkSize': NEIGHBOR_CHUNK_SIZE
+    }
+
+    existing = _read_manifest(out_dir)
+    resumable = (
+        not force and existing is not None and
+        all(existing.get(name) == value for name, value in manifest.items())
+    )
+    if resumable and existing.get('complete') and (out_dir / TABLE_NAME).exists():
+        print(f"[Neighbors] Tables up to date ({total} sequences, top {top_k})")
+        return existing
+    if not resumable and out_dir.exists():
+        shutil.rmtree(out_dir)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    _write_manifest(out_dir, dict(manifest, complete=False))
+
+    chunks = [
+        (chunk_id, start, min(start + NEIGHBOR_CHUNK_SIZE, total))
+        for chunk_id, start in enumerate(range(0, total, NEIGHBOR_CHUNK_SIZE))
+    ]
+    pending = [chunk for chunk in chunks if not _chunk_path(out_dir, chunk[0]).exists()]
+    print(f"[Neighbors] Computing {len(pending)} of {len(chunks)} chunks "
+          f"({total} sequences, top {top_k}, {workers} workers)")
+
+    if workers < 2 or len(pending) < 2:
+        for done, (chunk_id, start, end) in enumerate(pending, 1):
+            _compute_chunk(str(out_dir), chunk_id, start, end, top_k)
+            print(f"[Neighbors] {done}/{len(pending)} chunks done")
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_job_worker,
+            initargs=(_job_settings(),)
+        ) as pool:
+            futures = [
+                pool.submit(_compute_chunk, str(out_dir), chunk_id, start, end, top_k)
+                for chunk_id, start, end in pending
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                print(f"[Neighbors] {done}/{len(pending)} chunks done")
+
+    # Merge chunks into the final table
+    parts = []
+    for chunk_id, _, _ in chunks:
+        with np.load(_chunk_path(out_dir, chunk_id)) as part:
+            parts.append({name: part[name] for name in part.files})
+    merged = _empty_rows(0, top_k)
+    if parts:
+        merged = {name: np.concatenate([part[name] for part in parts]) for name in merged}
+    _save_npz_atomic(out_dir / TABLE_NAME, merged)
+
+    for chunk_id, _, _ in chunks:
+        _chunk_path(out_dir, chunk_id).unlink()
+
+    manifest['complete'] = True
+    _write_manifest(out_dir, manifest)
+    print(f"[Neighbors] Tables written to {out_dir}")
+    return manifest
+
+
+# =============================================================================
+# LOOKUP
+# =============================================================================
+_table: Optional[Dict[str, Any]] = None     # {'manifest': ..., 'arrays': ...}
+_table_stamp: Optional[Tuple] = None        # (directory, manifest mtime) the table was loaded for
+_table_lock = threading.Lock()
+
+
+def _load_table() -> Optional[Dict[str, Any]]:
+    """
+    Load the tables if they are complete and match the current dataset and
+    indexes. Reloaded only when the manifest file changes.
+    """
+    global _table, _table_stamp
+
+    manifest_path = NEIGHBOR_DIR / MANIFEST_NAME
+    try:
+        stamp = (str(NEIGHBOR_DIR), manifest_path.stat().st_mtime_ns)
+    except OSError:
+        stamp = (str(NEIGHBOR_DIR), None)
+
+    with _table_lock:
+        if stamp == _table_stamp:
+            return _table
+        _table, _table_stamp = None, stamp
+
+        manifest = _read_manifest(NEIGHBOR_DIR)
+        if not manifest or not manifest.get('complete'):
+            return None
+        if manifest['datasetFingerprint'] != MatchRepository.dataset_fingerprint():
+            print("[Neighbors] Tables are stale (dataset changed); using live search")
+            return None
+        if manifest['indexSignature'] != _index_signature():
+            print("[Neighbors] Tables do not match the loaded indexes; using live search")
+            return None
+
+        with np.load(NEIGHBOR_DIR / TABLE_NAME) as data:
+            arrays = {name: data[name] for name in data.files}
+        _table = {'manifest': manifest, 'arrays': arrays}
+        print(f"[Neighbors] Loaded tables for {manifest['sequences']} sequences")
+        return _table
+
+
+def lookup_similar_sequences(method: str, match_id: Any, seq_id: Any, top_n: int) -> Optional[List[Dict]]:
+    """
+    Precomputed results for a search by reference, shaped like the live
+    search of the same method; None when the tables cannot answer
+    (missing or stale tables, other settings, topN above the stored K).
+    """
+    from . import DTW, TF_IDF
+
+    if method not in NEIGHBOR_METHODS:
+        return None
+
+    TF_IDF.initialize_cache()
+    DTW.ensure_index_initialized()
+
+    table = _load_table()
+    if table is None:
+        return None
+    manifest, arrays = table['manifest'], table['arrays']
+    if top_n > manifest['topK'] or manifest['configFingerprint'] != config_fingerprint():
+        return None
+
+    key = (str(match_id), seq_id)
+    row = TF_IDF._sequence_row(key)
+    if row is None:
+        return None
+
+    if method == 'tfidf':
+        return [
+            TF_IDF._sequence_result(int(idx), float(score))
+            for idx, score in zip(arrays['tfidf_row'][row, :top_n], arrays['tfidf_score'][row, :top_n])
+            if idx >= 0
+        ]
+
+    if not arrays['dtw_available'][row]:
+        return None
+
+    if method == 'dtw':
+        results = [
+            DTW._sequence_result(int(k), float(distance), float(similarity), None)
+            for k, distance, similarity in zip(arrays['dtw_pos'][row, :top_n],
+                                               arrays['dtw_distance'][row, :top_n],
+                                               arrays['dtw_similarity'][row, :top_n])
+            if k >= 0
+        ]
+        return DTW.attach_alignment_paths(None, results, query_key=key)
+
+    results, dtw_backed = [], []
+    for k, idx, combined, dtw_sim, tfidf_sim in zip(arrays['hybrid_dtw_pos'][row, :top_n],
+                                                     arrays['hybrid_tfidf_row'][row, :top_n],
+                                                     arrays['hybrid_score'][row, :top_n],
+                                                     arrays['hybrid_dtw_similarity'][row, :top_n],
+                                                     arrays['hybrid_tfidf_similarity'][row, :top_n]):
+        if k < 0 and idx < 0:
+            continue
+        if k >= 0:
+            base_entry = DTW._sequence_result(int(k), float('nan'), float(dtw_sim), None)
+        else:
+            base_entry = TF_IDF._sequence_result(int(idx), float(tfidf_sim))
+        results.append(TF_IDF._hybrid_result(base_entry, float(combined), float(dtw_sim), float(tfidf_sim)))
+        if k >= 0:
+            dtw_backed.append(results[-1])
+
+    DTW.attach_alignment_paths(None, dtw_backed, query_key=key)
+    return results
+
+
+def reset_neighbor_tables() -> None:
+    """Drop the loaded tables (they are reloaded on the next lookup)"""
+    global _table, _table_stamp
+    with _table_lock:
+        _table, _table_stamp = None, None
@@ -0,0 +1,62 @@
+"""
+Plays Projection
+Trims the sequences served by api_match_plays: a lightweight list view
+without player snapshots, `fields=` projection of event fields, and
+rounding of coordinates to centimetres
+"""
+from typing import Dict, Optional, Tuple, Iterable
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+# Event fields of the list view: enough to list, filter and label events
+LIST_EVENT_FIELDS = (
+    'index', 'eventType', 'eventLabel', 'teamId', 'playerName',
+    'time', 'period', 'outcome', 'isGoal', 'ballPosition'
+)
+
+POSITION_FIELDS = ('ballPosition', 'homePlayers', 'awayPlayers')  # Event fields holding coordinates
+COORDINATE_KEYS = ('x', 'y', 'z')
+QUANTIZE_DECIMALS = {'cm': 2}  # quantize= value -> decimals kept (coordinates are metres)
+
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """'a,b,c' -> ('a', 'b', 'c'); None when no projection was asked for"""
+    if not value:
+        return None
+    return tuple(f for f in (part.strip() for part in value.split(',')) if f)
+
+
+def _round_point(point: Dict, decimals: int) -> Dict:
+    return {
+        k: round(v, decimals) if k in COORDINATE_KEYS and isinstance(v, float) else v
+        for k, v in point.items()
+    }
+
+
+def project_event(play: Dict, fields: Optional[Iterable[str]] = None,
+                  decimals: Optional[int] = None) -> Dict:
+    """
+    The given fields of a play (unknown names are skipped), coordinates rounded
+    to `decimals`. Returns the shared play itself when nothing is trimmed.
+    """
+    if fields is None and decimals is None:
+        return play
+    event = {f: play[f] for f in fields if f in play} if fields is not None else dict(play)
+    if decimals is not None:
+        for key in POSITION_FIELDS:
+            value = event.get(key)
+            if isinstance(value, dict):
+                event[key] = _round_point(value, decimals)
+            elif isinstance(value, list):
+                event[key] = [_round_point(p, decimals) for p in value]
+    return event
+
+
+def project_sequence(sequence: Dict, fields: Optional[Iterable[str]] = None,
+                     decimals: Optional[int] = None) -> Dict:
+    """A served sequence with its events projected; sequence-level keys are kept"""
+    if fields is None and decimals is None:
+        return sequence
+    return dict(sequence, events=[project_event(p, fields, decimals) for p in sequence['events']])
@@ -0,0 +1,91 @@
+"""
+Response Bytes Cache
+Serialized JSON bodies (plus a gzip variant) of the per-match API endpoints,
+keyed by endpoint, match id, query and the match's data version. Repeat
+requests are answered from bytes without building or serializing anything.
+"""
+import gzip
+import json
+from typing import Dict, Any, Callable, Hashable, NamedTuple, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .lru import ByteBudgetLRU
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+RESPONSE_CACHE_BYTES = 128 * 1024 * 1024  # Budget for cached bodies, gzip variants included
+GZIP_MIN_BYTES = 1024                     # Smaller bodies are not worth compressing
+GZIP_LEVEL = 6
+
+
+class CachedBody(NamedTuple):
+    """A serialized response body and its gzip variant (None = not compressed)"""
+    body: bytes
+    gzipped: Optional[bytes]
+    content_type: str = 'application/json'
+
+
+_bodies = ByteBudgetLRU(RESPONSE_CACHE_BYTES, name='ResponseBytes')  # (key, version) -> CachedBody
+
+
+def serialize(payload: Any) -> CachedBody:
+    """JSON body exactly as JsonResponse would write it, plus its gzip variant"""
+    body = json.dumps(payload, cls=DjangoJSONEncoder).encode('utf-8')
+    gzipped = None
+    if len(body) >= GZIP_MIN_BYTES:
+        gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(gzipped) >= len(body):
+            gzipped = None
+    return CachedBody(body, gzipped)
+
+
+def cached_body(key: Hashable, version: Hashable, build: Callable[[], Any],
+                encode: Callable[[Any], CachedBody] = serialize) -> Optional[CachedBody]:
+    """
+    encode(build()) for key at this data version, built on first use.
+    None (not cached) when build() returns None, e.g. for an unknown item.
+    """
+    cache_key = (key, version)
+    cached = _bodies.get(cache_key)
+    if cached is None:
+        payload = build()
+        if payload is None:
+            return None
+        cached = encode(payload)
+        _bodies.put(cache_key, cached, size=len(cached.body) + len(cached.gzipped or b''))
+    return cached
+
+
+def accepts_gzip(request) -> bool:
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '').lower()
+
+
+def bytes_response(request, cached: CachedBody) -> HttpResponse:
+    """Response from cached bytes, gzipped when the client accepts it"""
+    if cached.gzipped is not None and accepts_gzip(request):
+        response = HttpResponse(cached.gzipped, content_type=cached.content_type)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(cached.body, content_type=cached.content_type)
+    if cached.gzipped is not None:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def cached_json_response(request, key: Hashable, version: Hashable, build: Callable[[], Any]) -> HttpResponse:
+    """Response for an endpoint whose payload depends only on key and version"""
+    return bytes_response(request, cached_body(key, version, build))
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Cached body usage and hit/miss/eviction counters"""
+    return _bodies.stats()
+
+
+def clear_cache() -> None:
+    _bodies.clear()
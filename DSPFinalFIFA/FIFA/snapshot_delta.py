@@ -0,0 +1,139 @@
+"""
+Delta-Encoded Player Snapshots
+Optional encoding of a sequence's player positions: the first event keeps
+its full snapshot (the keyframe), later events only list the players that
+moved more than a threshold since they were last sent, as integer
+centimetre deltas. Encoded sequences are cached per sequence.
+
+Encoded events (after the keyframe) carry, instead of full player lists:
+    homePlayers / awayPlayers   Only players entering the snapshot (full records)
+    playerDeltas                [[playerId, dx, dy], ...] in centimetres
+    playersLeft                 [playerId, ...] no longer in the snapshot
+Positions are on a centimetre grid; a decoded position is within the
+threshold of the original. Only plays sequences are cached: search results
+are encoded per request.
+"""
+from typing import Dict, Any
+
+import numpy as np
+
+from .lru import ByteBudgetLRU, estimate_size
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+DELTA_THRESHOLD_CM = 10                   # Default: players that moved less are not resent
+DELTA_CACHE_BYTES = 64 * 1024 * 1024      # Budget for encoded sequences
+PLAYER_SIDES = ('homePlayers', 'awayPlayers')
+
+_encoded = ByteBudgetLRU(DELTA_CACHE_BYTES, name='SnapshotDelta')  # key -> (source events, encoded events)
+
+
+def _cm(value: Any) -> int:
+    return int(round((value or 0) * 100))
+
+
+def _player_at(player: Dict, q: np.ndarray) -> Dict:
+    """A player record with its position snapped to the centimetre grid"""
+    return dict(player, x=int(q[0]) / 100, y=int(q[1]) / 100)
+
+
+def encode_sequence(sequence: Dict, threshold_cm: int = DELTA_THRESHOLD_CM) -> Dict:
+    """Delta-encoded copy of a sequence (the source sequence is not modified)"""
+    events = sequence.get('events') or []
+    if not events:
+        return dict(sequence, encoding='delta', threshold=threshold_cm)
+
+    # Positions of every player of the sequence, on the centimetre grid: (events, players, 2)
+    slots: Dict[Any, int] = {}
+    rows, columns, xy = [], [], []
+    for row, event in enumerate(events):
+        for side in PLAYER_SIDES:
+            for player in event.get(side) or []:
+                rows.append(row)
+                columns.append(slots.setdefault(player.get('playerId'), len(slots)))
+                xy.append((player.get('x') or 0, player.get('y') or 0))
+    positions = np.zeros((len(events), len(slots), 2), dtype=np.int64)
+    present = np.zeros((len(events), len(slots)), dtype=bool)
+    if xy:
+        positions[rows, columns] = np.rint(np.array(xy, dtype=np.float64) * 100).astype(np.int64)
+        present[rows, columns] = True
+    player_ids = list(slots)
+
+    keyframe = events[0]
+    encoded_events = [dict(keyframe, **{
+        side: [_player_at(p, positions[0, slots[p.get('playerId')]]) for p in keyframe.get(side) or []]
+        for side in PLAYER_SIDES
+    })]
+    state = positions[0].copy()
+    sent = present[0].copy()
+
+    for row in range(1, len(events)):
+        event = events[row]
+        delta = positions[row] - state
+        moved = present[row] & sent & (np.abs(delta).max(axis=1) > threshold_cm)
+        entered = present[row] & ~sent
+        left = sent & ~present[row]
+
+        encoded = {k: v for k, v in event.items() if k not in PLAYER_SIDES}
+        for side in PLAYER_SIDES:
+            encoded[side] = [_player_at(p, positions[row, slots[p.get('playerId')]])
+                             for p in event.get(side) or [] if entered[slots[p.get('playerId')]]]
+        encoded['playerDeltas'] = [[player_ids[s], int(delta[s, 0]), int(delta[s, 1])]
+                                   for s in np.flatnonzero(moved).tolist()]
+        encoded['playersLeft'] = [player_ids[s] for s in np.flatnonzero(left).tolist()]
+        encoded_events.append(encoded)
+
+        update = moved | entered
+        state[update] = positions[row, update]
+        sent = present[row].copy()
+
+    return dict(sequence, events=encoded_events, encoding='delta', threshold=threshold_cm)
+
+
+def decode_sequence(encoded: Dict) -> Dict:
+    """Full snapshots of a delta-encoded sequence (for Python clients and tests)"""
+    events = []
+    players: Dict[Any, Dict] = {}  # playerId -> record, with 'side'
+    for row, event in enumerate(encoded.get('events') or []):
+        if row:
+            for player_id in event.get('playersLeft', []):
+                players.pop(player_id, None)
+        for side in PLAYER_SIDES:
+            for player in event.get(side) or []:
+                players[player.get('playerId')] = dict(player, side=side)
+        for player_id, dx, dy in event.get('playerDeltas', []):
+            player = players[player_id]
+            player['x'] = (_cm(player['x']) + dx) / 100
+            player['y'] = (_cm(player['y']) + dy) / 100
+        decoded = {k: v for k, v in event.items() if k not in ('playerDeltas', 'playersLeft')}
+        for side in PLAYER_SIDES:
+            decoded[side] = [{k: v for k, v in p.items() if k != 'side'}
+                             for p in players.values() if p['side'] == side]
+        events.append(decoded)
+    return dict(encoded, events=events)
+
+
+def encoded_sequence(sequence: Dict, match_id: Any, threshold_cm: int = DELTA_THRESHOLD_CM) -> Dict:
+    """
+    encode_sequence() of a match's served sequence (PlaysTable.sequences); the
+    encoded events are cached while the sequence's events are the same objects
+    """
+    source = sequence.get('events')
+    key = (str(match_id), sequence.get('sequenceId'), threshold_cm)
+    entry = _encoded.get(key)
+    if entry is not None and entry[0] is source:
+        events = entry[1]
+    else:
+        events = encode_sequence(sequence, threshold_cm)['events']
+        _encoded.put(key, (source, events), size=estimate_size(events))
+    return dict(sequence, events=events, encoding='delta', threshold=threshold_cm)
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _encoded.stats()
+
+
+def clear_cache() -> None:
+    _encoded.clear()
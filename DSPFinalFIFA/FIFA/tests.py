@@ -1,8 +1,36 @@
 import json
+from contextlib import ExitStack, contextmanager
 
 from django.test import TestCase
 
 
+@contextmanager
+def temporary_data_dir():
+    """
+    Point the data modules at a copy of the dataset (file mtimes preserved),
+    so a test can add or touch data files without modifying FIFA_datan.
+    """
+    import shutil
+    import tempfile
+    from pathlib import Path
+    from unittest import mock
+    from DSPFinalFIFA.FIFA import data_access, event_store, fifa, fifa_store, http_cache, match_manifest
+
+    with tempfile.TemporaryDirectory() as tmp, ExitStack() as patches:
+        data_dir = Path(tmp)
+        for folder in fifa.DATA_FOLDERS:
+            if (fifa.DATA_DIR / folder).exists():
+                shutil.copytree(fifa.DATA_DIR / folder, data_dir / folder)
+        for module in (fifa, data_access, event_store, fifa_store, match_manifest):
+            patches.enter_context(mock.patch.object(module, 'DATA_DIR', data_dir))
+        try:
+            yield data_dir
+        finally:
+            data_access.clear_cache()
+            match_manifest.reset_match_manifest()
+            http_cache.reset_dataset_version()
+
+
 class DTWIntegrationTests(TestCase):
     """Integration tests using real match data from repository."""
 
@@ -81,6 +109,129 @@ class DTWIntegrationTests(TestCase):
         self.assertGreaterEqual(comparison['similarity'], 0)
         self.assertLessEqual(comparison['similarity'], 1)
 
+    def test_exact_backend_matches_reference_dtw(self):
+        from DSPFinalFIFA.FIFA import DTW
+
+        features1 = DTW.extract_sequence_features(self.query_sequence)
+        features2 = list(reversed(features1))
+        if not features1:
+            return
+
+        # Reference: textbook DTW recurrence over event_distance
+        n, m = len(features1), len(features2)
+        acc = [[float('inf')] * (m + 1) for _ in range(n + 1)]
+        acc[0][0] = 0.0
+        for i in range(1, n + 1):
+            for j in range(1, m + 1):
+                acc[i][j] = DTW.event_distance(features1[i - 1], features2[j - 1]) + min(
+                    acc[i - 1][j], acc[i][j - 1], acc[i - 1][j - 1]
+                )
+
+        distance, path = DTW.dtw_distance(features1, features2, backend='exact')
+        self.assertAlmostEqual(distance, acc[n][m], places=6)
+        self.assertEqual(path[0], (0, 0))
+        self.assertEqual(path[-1], (n - 1, m - 1))
+
+        fast_distance, fast_path = DTW.dtw_distance(features1, features2, backend='fastdtw')
+        self.assertGreaterEqual(fast_distance + 1e-6, distance)
+        self.assertTrue(fast_path)
+
+    def test_pruned_search_matches_exhaustive_scan(self):
+        from DSPFinalFIFA.FIFA import DTW
+
+        def run(pruning):
+            DTW.DTW_PRUNING = pruning
+            try:
+                results = DTW.search_similar_sequences_dtw(self.query_sequence, top_n=5)
+            finally:
+                DTW.DTW_PRUNING = True
+            return [(r['matchId'], r['sequenceId'], r['distance']) for r in results]
+
+        exhaustive = run(False)
+        pruned = run(True)
+        self.assertEqual(pruned, exhaustive)
+
+        stats = DTW.get_prune_stats()['last']
+        for key in ['candidates', 'pruned_kim', 'pruned_envelope', 'abandoned', 'full_dtw']:
+            self.assertIn(key, stats)
+        self.assertEqual(
+            stats['candidates'],
+            stats['pruned_kim'] + stats['pruned_envelope'] + stats['abandoned'] + stats['full_dtw']
+        )
+
+    def test_lower_bounds_of_candidate_subset_match_full_store(self):
+        import numpy as np
+        from DSPFinalFIFA.FIFA import DTW
+
+        DTW.search_similar_sequences_dtw(self.query_sequence, top_n=1)  # Builds the index
+        store = DTW._feature_store
+        query = DTW.encode_sequence_features(DTW.extract_sequence_features(self.query_sequence))
+        candidates = np.arange(len(store))[::-3]  # Any order, with gaps
+        for bound in [DTW.lower_bound_kim, DTW.lower_bound_envelope]:
+            np.testing.assert_allclose(bound(query, store, candidates), bound(query, store)[candidates])
+
+    def test_parallel_search_matches_in_process_scan(self):
+        from DSPFinalFIFA.FIFA import DTW
+
+        in_process = DTW.search_similar_sequences_dtw(self.query_sequence, top_n=5)
+
+        workers, min_sequences = DTW.DTW_WORKERS, DTW.PARALLEL_MIN_SEQUENCES
+        DTW.DTW_WORKERS, DTW.PARALLEL_MIN_SEQUENCES = 2, 0
+        try:
+            parallel = DTW.search_similar_sequences_dtw(self.query_sequence, top_n=5)
+        finally:
+            DTW.DTW_WORKERS, DTW.PARALLEL_MIN_SEQUENCES = workers, min_sequences
+            DTW.shutdown_search_pool()
+
+        self.assertEqual(
+            [(r['matchId'], r['sequenceId'], r['distance']) for r in parallel],
+            [(r['matchId'], r['sequenceId'], r['distance']) for r in in_process]
+        )
+
+    def test_parallel_search_falls_back_when_pool_is_shut_down(self):
+        from concurrent.futures import Future
+        from DSPFinalFIFA.FIFA import DTW
+
+        class ShutDownPool:
+            """A pool whose work was cancelled, as by shutdown_search_pool() during a rebuild"""
+            def submit(self, *args):
+                future = Future()
+                future.cancel()
+                return future
+
+        in_process = DTW.search_similar_sequences_dtw(self.query_sequence, top_n=5)
+
+        workers, min_sequences, get_pool = DTW.DTW_WORKERS, DTW.PARALLEL_MIN_SEQUENCES, DTW._get_search_pool
+        DTW.DTW_WORKERS, DTW.PARALLEL_MIN_SEQUENCES, DTW._get_search_pool = 2, 0, ShutDownPool
+        try:
+            cancelled = DTW.search_similar_sequences_dtw(self.query_sequence, top_n=5)
+        finally:
+            DTW.DTW_WORKERS, DTW.PARALLEL_MIN_SEQUENCES, DTW._get_search_pool = workers, min_sequences, get_pool
+
+        self.assertEqual(
+            [(r['matchId'], r['sequenceId'], r['distance']) for r in cancelled],
+            [(r['matchId'], r['sequenceId'], r['distance']) for r in in_process]
+        )
+
+    def test_feature_store_views_match_encoded_features(self):
+        from DSPFinalFIFA.FIFA import DTW
+
+        features = DTW.extract_sequence_features(self.query_sequence)
+        block = DTW.encode_sequence_features(features)
+        store = DTW.SequenceFeatureStore([block, block])
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.sequence_length(1), len(features))
+
+        view = store.sequence(1)
+        self.assertEqual(view.ball.dtype.name, 'float32')
+        self.assertTrue((view.event_type == block.event_type).all())
+        self.assertTrue((view.near_counts == block.near_counts).all())
+
+        decoded = DTW.decode_sequence_arrays(view)
+        self.assertEqual([f['event_type'] for f in decoded], [f['event_type'] for f in features])
+        self.assertEqual([len(f['near_players']) for f in decoded], [len(f['near_players']) for f in features])
+
 
 class TFIDFIntegrationTests(TestCase):
     """Integration tests using real match data for TF-IDF search."""
@@ -147,6 +298,39 @@ class TFIDFIntegrationTests(TestCase):
         for key in ['matchId', 'sequenceId', 'setpieceType', 'teamId', 'time', 'events', 'homeTeam', 'awayTeam', 'eventCount', 'similarity']:
             self.assertIn(key, sample)
 
+    def test_top_k_selection_matches_full_sort(self):
+        import numpy as np
+        from sklearn.metrics.pairwise import cosine_similarity
+        from DSPFinalFIFA.FIFA import TF_IDF
+        from DSPFinalFIFA.FIFA.topk import top_k_indices
+
+        scores = np.array([0.5, 0.9, 0.1, 0.9, 0.7, 0.3])
+        self.assertEqual(top_k_indices(scores, 3).tolist(), [1, 3, 4])
+        self.assertEqual(top_k_indices(scores, 3, exclude=[1]).tolist(), [3, 4, 0])
+        self.assertEqual(top_k_indices(scores, 2, largest=False).tolist(), [2, 5])
+
+        match_id = str(self.match.match_id)
+        results = TF_IDF.search_similar_sequences(
+            self.query_sequence_events,
+            exclude_match_id=match_id,
+            exclude_seq_id=self.sequence_id,
+            top_n=5
+        )
+
+        query_vector = TF_IDF._sequence_vectorizer.transform(
+            [TF_IDF.sequence_to_text(self.query_sequence_events)]
+        )
+        similarities = cosine_similarity(query_vector, TF_IDF._sequence_vectors).flatten()
+        expected = sorted(
+            (round(float(s), 3) for idx, s in enumerate(similarities)
+             if s >= 0.01 and (TF_IDF._sequence_index[idx]['matchId'], TF_IDF._sequence_index[idx]['sequenceId'])
+             != (match_id, self.sequence_id)),
+            reverse=True
+        )[:5]
+
+        self.assertEqual([r['similarity'] for r in results], expected)
+        self.assertNotIn((match_id, self.sequence_id), [(r['matchId'], r['sequenceId']) for r in results])
+
 
 class FIFAIntegrationTests(TestCase):
     """Integration tests for core FIFA data layer and API endpoints."""
@@ -173,6 +357,135 @@ class FIFAIntegrationTests(TestCase):
         ]:
             self.assertIn(key, sample)
 
+    def test_event_store_matches_json_source(self):
+        import tempfile
+        import numpy as np
+        from pathlib import Path
+        from DSPFinalFIFA.FIFA import data_access, event_store
+        from DSPFinalFIFA.FIFA.fifa import DATA_DIR, Match
+
+        match_id = str(self.match.match_id)
+        with open(DATA_DIR / 'Event Data' / f'{match_id}.json', 'r', encoding='utf-8') as f:
+            raw_events = json.load(f)
+
+        original = event_store.EVENT_STORE_DIR
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                event_store.EVENT_STORE_DIR = Path(tmp)
+                event_store.reset_event_stores()
+
+                store = event_store.open_event_store(match_id)
+                self.assertIsNotNone(store)
+                self.assertIsInstance(store.player_xys.base, np.memmap)
+                self.assertEqual(store.player_xys.shape[0], len(raw_events))
+
+                # Byte-identical round trip, key order included
+                self.assertEqual(json.dumps(list(store.rows())), json.dumps(raw_events))
+
+                data_access.clear_cache()
+                stored = Match(match_id)
+                self.assertIsNotNone(stored._load_events().store)
+                expected = (stored.get_all_plays(), stored.find_goals(), stored.count_goals())
+
+                event_store.EVENT_STORE_ENABLED = False
+                data_access.clear_cache()
+                from_json = Match(match_id)
+                self.assertIsNone(from_json._load_events().store)
+                self.assertEqual((from_json.get_all_plays(), from_json.find_goals(), from_json.count_goals()),
+                                 expected)
+        finally:
+            event_store.EVENT_STORE_DIR = original
+            event_store.EVENT_STORE_ENABLED = True
+            event_store.reset_event_stores()
+            data_access.clear_cache()
+
+    def test_event_store_build_failure_falls_back_to_json_once(self):
+        import tempfile
+        from pathlib import Path
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import data_access, event_store
+        from DSPFinalFIFA.FIFA.fifa import Match
+
+        match_id = str(self.match.match_id)
+        expected = Match(match_id, use_prebuilt=False).get_all_plays()
+
+        original = event_store.EVENT_STORE_DIR
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                event_store.EVENT_STORE_DIR = Path(tmp)
+                event_store.reset_event_stores()
+                data_access.clear_cache()
+
+                with mock.patch.object(event_store, 'build_event_store', side_effect=KeyError('x')) as build:
+                    self.assertIsNone(event_store.open_event_store(match_id))
+                    self.assertIsNone(event_store.open_event_store(match_id))
+                    self.assertEqual(build.call_count, 1)  # Not retried for the same source
+
+                    match = Match(match_id, use_prebuilt=False)
+                    self.assertIsNone(match._load_events().store)
+                    self.assertEqual(match.get_all_plays(), expected)
+        finally:
+            event_store.EVENT_STORE_DIR = original
+            event_store.reset_event_stores()
+            data_access.clear_cache()
+
+    def test_build_fifa_store_rebuilds_only_changed_matches(self):
+        import os
+        import tempfile
+        from pathlib import Path
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import event_store, fifa_store, match_manifest
+        from DSPFinalFIFA.FIFA.fifa import Match, MatchRepository
+
+        match_id = str(self.match.match_id)
+        original = (fifa_store.STORE_DIR, event_store.EVENT_STORE_DIR)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                fifa_store.STORE_DIR = Path(tmp) / 'store'
+                event_store.EVENT_STORE_DIR = Path(tmp) / 'events'
+                event_store.reset_event_stores()
+                fifa_store.reset_prebuilt()
+
+                manifest = fifa_store.build_fifa_store(workers=1)
+                self.assertEqual(sorted(manifest['matches']), MatchRepository.get_all_match_ids())
+
+                prebuilt, live = Match(match_id), Match(match_id, use_prebuilt=False)
+                self.assertIsNotNone(prebuilt._load_prebuilt())
+                self.assertEqual(prebuilt.get_all_plays(), live.get_all_plays())
+                self.assertEqual(prebuilt.find_goals(), live.find_goals())
+
+                # Summaries come from the manifest, without reading the plays artifact
+                self.assertEqual(manifest['matches'][match_id]['summary'], live.summary())
+                with mock.patch.object(fifa_store, 'load_match_artifact') as load_artifact:
+                    summarized = Match(match_id)
+                    self.assertEqual(summarized.summary(), live.summary())
+                    self.assertEqual(summarized.count_goals(), live.count_goals())
+                    load_artifact.assert_not_called()
+
+                # The match listing takes its statistics from the store too
+                match_manifest.reset_match_manifest()
+                with mock.patch.object(Match, 'summary') as summarize:
+                    listing = match_manifest.get_match_manifest()
+                    summarize.assert_not_called()
+                self.assertEqual(listing.statistics[match_id], live.summary())
+
+                # Touched but unchanged files: nothing is rebuilt, artifacts stay valid
+                artifact = fifa_store._match_artifact_path(fifa_store.STORE_DIR, match_id)
+                built_at = artifact.stat().st_mtime_ns
+                with temporary_data_dir() as data_dir:
+                    data_file = data_dir / 'Rosters' / f'{match_id}.json'
+                    stat = data_file.stat()
+                    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+                    self.assertIsNone(fifa_store.load_match_artifact(match_id))
+                    fifa_store.build_fifa_store(workers=1)
+                    self.assertEqual(artifact.stat().st_mtime_ns, built_at)
+                    self.assertIsNotNone(fifa_store.load_match_artifact(match_id))
+        finally:
+            fifa_store.STORE_DIR, event_store.EVENT_STORE_DIR = original
+            event_store.reset_event_stores()
+            fifa_store.reset_prebuilt()
+            match_manifest.reset_match_manifest()
+
     def test_api_match_plays(self):
         response = self.client.get(f"/api/matches/{self.match.match_id}/plays/")
         self.assertEqual(response.status_code, 200)
@@ -181,6 +494,49 @@ class FIFAIntegrationTests(TestCase):
         for key in ['matchId', 'match', 'plays', 'totalEvents', 'totalSequences']:
             self.assertIn(key, data)
 
+    def test_plays_table_is_memoized_until_data_changes(self):
+        import os
+        from unittest import mock
+        from DSPFinalFIFA.FIFA.fifa import Match
+
+        match = Match(self.match.match_id)
+        table = match.plays_table()
+        self.assertIs(match.plays_table(), table)
+
+        plays = match.get_all_plays()
+        plays.clear()  # Callers get their own list
+        self.assertEqual(len(match.get_all_plays()), len(table.plays))
+
+        # Same grouping api_match_plays used to build per request
+        expected = {}
+        for play in table.plays:
+            if play.get('sequence') is None:
+                continue
+            group = expected.setdefault(play['sequence'], {
+                'sequenceId': int(play['sequence']) if play['sequence'] else 0,
+                'teamId': play.get('teamId'),
+                'setpieceType': play.get('setpieceLabel') or play.get('setpieceType') or 'Open Play',
+                'time': '',
+                'events': []
+            })
+            group['events'].append(play)
+            group['time'] = group['time'] or play.get('time') or ''
+        expected = sorted(expected.values(), key=lambda s: s['sequenceId'])
+        self.assertEqual(list(table.sequences), expected)
+
+        with mock.patch.object(Match, '_build_plays', autospec=True) as build_plays:
+            for _ in range(2):
+                response = self.client.get(f"/api/matches/{self.match.match_id}/plays/")
+                self.assertEqual(response.status_code, 200)
+            build_plays.assert_not_called()
+
+        with temporary_data_dir() as data_dir:
+            data_file = data_dir / 'Event Data' / f'{match.match_id}.json'
+            stat = data_file.stat()
+            os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            self.assertIsNot(match.plays_table(), table)
+            self.assertEqual(match.plays_table().plays, table.plays)
+
     def test_api_match_goals(self):
         response = self.client.get(f"/api/matches/{self.match.match_id}/goals/")
         self.assertEqual(response.status_code, 200)
@@ -188,6 +544,504 @@ class FIFAIntegrationTests(TestCase):
         for key in ['matchId', 'match', 'goals']:
             self.assertIn(key, data)
 
+    def test_goal_context_slices_match_lookback_scan(self):
+        from DSPFinalFIFA.FIFA import fifa
+
+        match = fifa.Match(self.match.match_id, use_prebuilt=False)
+        events, store = match._load_events()
+        index = match._get_sequence_index(events, store)
+        goals = match.find_goals()
+
+        # Reference: the event-by-event lookback the index replaces
+        for goal in goals:
+            i = goal['eventIndex']
+            sequence = events[i].get('sequence')
+            if sequence is None:
+                continue
+            expected = [
+                j for j in range(max(0, i - 20), i)
+                if events[j].get('sequence') is not None and sequence - 3 <= events[j]['sequence'] <= sequence
+                and events[j].get('possessionEvents', {}).get('possessionEventType') == 'PA'
+            ]
+            self.assertEqual(index.context_pass_rows(i, sequence, 3, 20).tolist(), expected)
+
+        original = (fifa.GOAL_PRECEDING_SEQUENCES, fifa.GOAL_LOOKBACK_EVENTS, fifa.GOAL_PASS_LIMIT)
+        try:
+            fifa.GOAL_PRECEDING_SEQUENCES, fifa.GOAL_LOOKBACK_EVENTS, fifa.GOAL_PASS_LIMIT = 5, None, 2
+            wider = fifa.Match(self.match.match_id).find_goals()
+            self.assertEqual([g['eventIndex'] for g in wider], [g['eventIndex'] for g in goals])
+            self.assertTrue(all(len(g['passSequence']) <= 2 for g in wider))
+        finally:
+            fifa.GOAL_PRECEDING_SEQUENCES, fifa.GOAL_LOOKBACK_EVENTS, fifa.GOAL_PASS_LIMIT = original
+
+    def test_match_manifest_serves_listing_until_file_set_changes(self):
+        import shutil
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import match_manifest
+        from DSPFinalFIFA.FIFA.fifa import MatchRepository
+
+        match_manifest.reset_match_manifest()
+        expected = []
+        for match in MatchRepository.get_all_matches():
+            expected.append(dict(match.to_dict(), goalCount=match.count_goals()))
+
+        response = self.client.get('/api/matches/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'matches': expected})
+        response = self.client.get('/')
+        self.assertEqual(response.context['matches'], json.dumps(expected))
+
+        manifest = match_manifest.get_match_manifest()
+        with mock.patch.object(match_manifest, '_file_set', wraps=match_manifest._file_set) as file_set:
+            self.assertIs(match_manifest.get_match_manifest(), manifest)
+            file_set.assert_not_called()
+
+        # A new file changes the directory mtime and the file set
+        with temporary_data_dir() as data_dir:
+            self.assertIs(match_manifest.get_match_manifest(), manifest)  # Same mtimes as the original
+            source = data_dir / 'Metadata' / f'{self.match.match_id}.json'
+            shutil.copyfile(source, data_dir / 'Metadata' / '999999.json')
+            try:
+                refreshed = match_manifest.get_match_manifest()
+                self.assertIsNot(refreshed, manifest)
+                self.assertIn('999999', refreshed.match_ids)
+            finally:
+                MatchRepository._cache.pop('999999', None)
+        self.assertEqual(match_manifest.get_match_manifest().match_ids, manifest.match_ids)
+
+    def test_memory_budget_evicts_match_data_but_keeps_metadata(self):
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import data_access
+        from DSPFinalFIFA.FIFA.fifa import MatchRepository
+        from DSPFinalFIFA.FIFA.lru import ByteBudgetLRU
+        from DSPFinalFIFA.FIFA.views import DataLoader
+
+        # Room for one match's data at a time
+        repo_cache = ByteBudgetLRU(1, on_evict=lambda match_id, match: match.release_data())
+        with mock.patch.dict(MatchRepository._cache, clear=True), \
+                mock.patch.object(MatchRepository, '_data_cache', repo_cache):
+            first, second = MatchRepository.get_all_matches()[:2]
+            expected = first.get_all_plays()
+
+            second.get_all_plays()
+            stats = MatchRepository.cache_stats()
+            self.assertEqual(stats['entries'], 1)
+            self.assertGreaterEqual(stats['evictions'], 1)
+            self.assertIsNone(first._plays_table)
+            self.assertIsNotNone(first.home_team)  # Metadata survives eviction
+
+            self.assertEqual(first.get_all_plays(), expected)  # Reloaded on demand
+
+        with mock.patch.dict(data_access._metadata, clear=True), \
+                mock.patch.object(data_access, '_data', ByteBudgetLRU(1)):
+            loader = DataLoader()
+            ids = loader.get_all_match_ids()[:2]
+            for match_id in ids:
+                loader.load_metadata(match_id)
+                loader.load_roster(match_id)
+            loader.load_roster(ids[1])
+            stats = DataLoader.cache_stats()
+            self.assertEqual(stats['entries'], 1)
+            self.assertEqual(stats['metadata'], 2)
+            self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 2, 1))
+
+    def test_data_layer_is_shared_and_loads_each_file_once(self):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import data_access
+        from DSPFinalFIFA.FIFA.fifa import Match
+        from DSPFinalFIFA.FIFA.views import DataLoader, MatchService
+
+        match_id = str(self.match.match_id)
+        data_access.clear_cache()
+        read_json = data_access._read_json
+        reads = []
+        start = threading.Barrier(8)
+
+        def slow_read(folder, mid):
+            reads.append((folder, mid))
+            time.sleep(0.05)  # Keep the first load in flight while the others arrive
+            return read_json(folder, mid)
+
+        def load(_):
+            start.wait()
+            return data_access.load_roster(match_id)
+
+        try:
+            with mock.patch.object(data_access, '_read_json', side_effect=slow_read):
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    rosters = list(pool.map(load, range(8)))
+            self.assertEqual(reads, [('Rosters', match_id)])
+            self.assertTrue(all(roster is rosters[0] for roster in rosters))
+
+            # Both service layers read the same parsed objects
+            loader = DataLoader()
+            self.assertIs(loader.load_roster(match_id), rosters[0])
+            self.assertIs(loader.load_events(match_id), Match(match_id)._load_events().events)
+            self.assertIs(loader.load_metadata(match_id), Match(match_id)._metadata)
+            self.assertEqual(MatchService().get_match(match_id).home_team.name, self.match.home_team.name)
+        finally:
+            data_access.clear_cache()
+
+    def test_goal_sequences_are_memoized_by_file_stamp(self):
+        import os
+        from unittest import mock
+        from DSPFinalFIFA.FIFA.views import DataLoader, MatchService
+
+        match_id = str(self.match.match_id)
+        service = MatchService()
+        goals = service.get_match_goals(match_id)
+
+        # Hits need neither the events nor a reference to them
+        with mock.patch.object(DataLoader, 'load_events') as load_events:
+            self.assertIs(service.get_match_goals(match_id), goals)
+            load_events.assert_not_called()
+        stamp, _ = MatchService._goals.get((match_id, 5))
+        self.assertIsInstance(stamp, tuple)
+
+        with temporary_data_dir() as data_dir:
+            data_file = data_dir / 'Event Data' / f'{match_id}.json'
+            stat = data_file.stat()
+            os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            rebuilt = service.get_match_goals(match_id)
+            self.assertIsNot(rebuilt, goals)
+            self.assertEqual([g.to_dict() for g in rebuilt], [g.to_dict() for g in goals])
+
+    def test_api_goals_filters_tournament_index(self):
+        from DSPFinalFIFA.FIFA import goals_index, http_cache
+        from DSPFinalFIFA.FIFA.fifa import MatchRepository
+
+        goals_index.reset_goals_index()
+        expected = []
+        for match in MatchRepository.get_all_matches():
+            expected.extend((str(match.match_id), g['eventIndex']) for g in match.find_goals())
+
+        data = self.client.get('/api/goals/').json()
+        self.assertEqual([(g['matchId'], g['eventIndex']) for g in data['goals']], expected)
+        self.assertEqual(data['totalGoals'], len(expected))
+        if not expected:
+            return
+
+        goal = data['goals'][0]
+        for key in ['matchId', 'date', 'homeTeam', 'awayTeam', 'teamName', 'scorerId', 'scorerName',
+                    'scoringTeamId', 'period', 'isPenalty', 'passSequence', 'homePlayers', 'awayPlayers']:
+            self.assertIn(key, goal)
+
+        def fetch(**params):
+            return self.client.get('/api/goals/', params).json()['goals']
+
+        by_team = fetch(team=goal['teamName'].upper())
+        self.assertTrue(by_team)
+        self.assertTrue(all(g['scoringTeamId'] == goal['scoringTeamId'] for g in by_team))
+        self.assertEqual(fetch(team=goal['scoringTeamId']), by_team)
+        self.assertTrue(all(g['scorerId'] == goal['scorerId'] for g in fetch(player=str(goal['scorerId']))))
+        self.assertTrue(all(g['period'] == 2 for g in fetch(period=2)))
+        self.assertEqual(len(fetch(penalty='true')) + len(fetch(penalty='false')), len(expected))
+        self.assertEqual(self.client.get('/api/goals/', {'period': 'x'}).status_code, 400)
+
+        # Changed data files rebuild the index, which stays in step with the per-match goals
+        with temporary_data_dir() as data_dir:
+            (data_dir / 'Event Data' / f"{goal['matchId']}.json").unlink()
+            http_cache.reset_dataset_version()
+            self.assertNotIn(goal['matchId'], {g['matchId'] for g in fetch()})
+            self.assertEqual(self.client.get(f"/api/matches/{goal['matchId']}/goals/").json()['goals'], [])
+        self.assertEqual(fetch(), data['goals'])
+
+    def test_api_match_plays_pages_and_filters_sequences(self):
+        from DSPFinalFIFA.FIFA.fifa import parse_game_clock
+
+        url = f"/api/matches/{self.match.match_id}/plays/"
+        full = self.client.get(url).json()
+        self.assertIsNone(full['nextCursor'])
+
+        # Cursor pages concatenate to the unpaged list; nextOffset indexes the full list either way
+        pages, params = [], {'limit': 7}
+        while True:
+            data = self.client.get(url, params).json()
+            self.assertLessEqual(len(data['plays']), 7)
+            self.assertEqual(data['totalSequences'], full['totalSequences'])
+            pages.extend(data['plays'])
+            if data['nextCursor'] is None:
+                self.assertIsNone(data['nextOffset'])
+                break
+            self.assertEqual(data['nextOffset'], len(pages))
+            params['cursor'] = data['nextCursor']
+        self.assertEqual(pages, full['plays'])
+        self.assertEqual(self.client.get(url, {'limit': 7, 'offset': 7}).json()['plays'], full['plays'][7:14])
+
+        def clocks(sequence):
+            return [c for c in (parse_game_clock(e['time']) for e in sequence['events']) if c is not None]
+
+        windowed = self.client.get(url, {'period': 1, 'from': '05:00', 'to': 600}).json()['plays']
+        expected = [s for s in full['plays']
+                    if s['events'][0]['period'] == 1 and clocks(s) and max(clocks(s)) >= 300 and min(clocks(s)) <= 600]
+        self.assertEqual(windowed, expected)
+        self.assertEqual(self.client.get(url, {'period': 9}).json()['plays'], [])
+        for bad in [{'limit': 0}, {'from': 'soon'}, {'cursor': 'x'}]:
+            self.assertEqual(self.client.get(url, bad).status_code, 400)
+
+    def test_api_match_plays_list_view_and_sequence_detail(self):
+        from DSPFinalFIFA.FIFA.plays_projection import LIST_EVENT_FIELDS
+
+        url = f"/api/matches/{self.match.match_id}/plays/"
+        full = self.client.get(url)
+        listing = self.client.get(url, {'view': 'list', 'quantize': 'cm'})
+        self.assertLess(len(listing.content) * 10, len(full.content))
+
+        full_plays, list_plays = full.json()['plays'], listing.json()['plays']
+        self.assertEqual([s['sequenceId'] for s in list_plays], [s['sequenceId'] for s in full_plays])
+        event = list_plays[0]['events'][0]
+        self.assertTrue(set(event) <= set(LIST_EVENT_FIELDS))
+        self.assertNotIn('homePlayers', event)
+
+        # Detail endpoint serves the full sequence; quantize rounds to centimetres
+        sequence = full_plays[0]
+        detail_url = f"/api/matches/{self.match.match_id}/sequences/{sequence['sequenceId']}/"
+        self.assertEqual(self.client.get(detail_url).json()['sequence'], sequence)
+        rounded = self.client.get(detail_url, {'quantize': 'cm'}).json()['sequence']['events'][0]
+        original = sequence['events'][0]
+        for key in ['homePlayers', 'awayPlayers']:
+            for a, b in zip(rounded[key], original[key]):
+                self.assertEqual(a['x'], round(b['x'], 2))
+                self.assertEqual(a['playerId'], b['playerId'])
+
+        projected = self.client.get(detail_url, {'fields': 'time, isGoal,bogus'}).json()['sequence']
+        self.assertEqual(projected['events'], [{'time': e['time'], 'isGoal': e['isGoal']} for e in sequence['events']])
+        self.assertEqual(self.client.get(f"/api/matches/{self.match.match_id}/sequences/999999/").status_code, 404)
+        self.assertEqual(self.client.get(url, {'quantize': 'mm'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'view': 'compact'}).status_code, 400)
+
+    def test_match_endpoints_serve_cached_bytes_and_gzip(self):
+        import gzip
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import response_cache
+        from DSPFinalFIFA.FIFA.fifa import Match
+
+        response_cache.clear_cache()
+        url = f"/api/matches/{self.match.match_id}/goals/"
+        first = self.client.get(url)
+        self.assertEqual(first['Content-Type'], 'application/json')
+        with mock.patch.object(Match, 'find_goals', side_effect=AssertionError('rebuilt')):
+            again = self.client.get(url)
+            zipped = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(zipped['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', zipped['Vary'])
+        self.assertEqual(gzip.decompress(zipped.content), first.content)
+
+        # A new data version is a new key
+        with mock.patch.object(Match, 'data_version', return_value=('changed',)):
+            with mock.patch.object(Match, 'find_goals', return_value=[]) as find_goals:
+                self.assertEqual(self.client.get(url).json()['goals'], [])
+            self.assertEqual(find_goals.call_count, 1)
+
+        plays_url = f"/api/matches/{self.match.match_id}/plays/"
+        self.client.get(plays_url, {'view': 'list'})
+        hits = response_cache.cache_stats()['hits']
+        self.client.get(plays_url, {'view': 'list'})
+        self.assertEqual(response_cache.cache_stats()['hits'], hits + 1)
+
+    def test_api_endpoints_answer_conditional_gets_with_304(self):
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import fifa, http_cache
+
+        http_cache.reset_dataset_version()
+        url = f"/api/matches/{self.match.match_id}/goals/"
+        first = self.client.get(url)
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertEqual(first['Cache-Control'], http_cache.CACHE_CONTROL)
+        self.assertIn('Last-Modified', first)
+
+        # Validated before the view runs
+        with mock.patch.object(fifa.MatchRepository, 'get_match', side_effect=AssertionError('view ran')):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+        zipped = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(zipped['ETag'], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=zipped['ETag']).status_code, 304)
+
+        # Tags differ per query and change with the dataset
+        self.assertNotEqual(self.client.get(url.replace('goals', 'plays'))['ETag'], etag)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+        with mock.patch.object(fifa.MatchRepository, 'dataset_fingerprint_of', return_value='changed'):
+            http_cache.reset_dataset_version()
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        http_cache.reset_dataset_version()
+
+        # Reference searches are cacheable GETs
+        sequence_id = self.client.get(url.replace('goals', 'plays'), {'limit': 1}).json()['plays'][0]['sequenceId']
+        search = self.client.get('/api/search/sequence/', {
+            'matchId': self.match.match_id, 'sequenceId': sequence_id, 'method': 'tfidf', 'topN': 3})
+        self.assertEqual(search.status_code, 200)
+        self.assertLessEqual(search.json()['count'], 3)
+        self.assertEqual(self.client.get('/api/search/sequence/', {
+            'matchId': self.match.match_id, 'sequenceId': sequence_id, 'method': 'tfidf', 'topN': 3},
+            HTTP_IF_NONE_MATCH=search['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/api/search/event/', {'sequenceId': 'x'}).status_code, 400)
+
+    def test_streaming_mode_matches_serialized_bodies_under_wsgi_and_asgi(self):
+        from unittest import mock
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncClient
+        from DSPFinalFIFA.FIFA import json_stream
+
+        async def fetch_async(url, params):
+            response = await AsyncClient().get(url, params)
+            self.assertTrue(response.streaming)
+            return [chunk async for chunk in response.streaming_content]
+
+        url = f"/api/matches/{self.match.match_id}/plays/"
+        with mock.patch.object(json_stream, 'STREAM_CHUNK_BYTES', 4096):
+            for path, params in [(url, {}), (url, {'view': 'list', 'limit': 5}), ('/api/goals/', {})]:
+                expected = self.client.get(path, params).content
+                streamed = self.client.get(path, dict(params, stream=1))
+                self.assertTrue(streamed.streaming)
+                chunks = list(streamed.streaming_content)
+                self.assertEqual(b''.join(chunks), expected)
+                self.assertEqual(b''.join(async_to_sync(fetch_async)(path, dict(params, stream=1))), expected)
+                if len(expected) > 3 * 4096:
+                    self.assertGreater(len(chunks), 2)
+
+    def test_binary_frames_are_negotiated_and_round_trip(self):
+        import numpy as np
+        from DSPFinalFIFA.FIFA.frames_binary import MEDIA_TYPE, decode_frames
+
+        url = f"/api/matches/{self.match.match_id}/plays/"
+        params = {'limit': 4}
+        json_body = self.client.get(url, params)
+        self.assertEqual(json_body['Content-Type'], 'application/json')
+        binary = self.client.get(url, params, HTTP_ACCEPT=MEDIA_TYPE)
+        self.assertEqual(binary['Content-Type'], MEDIA_TYPE)
+        self.assertNotEqual(binary['ETag'], json_body['ETag'])
+        self.assertIn('Accept', binary['Vary'])
+        self.assertLess(len(binary.content) * 3, len(json_body.content))
+
+        frames = decode_frames(binary.content)
+        events = [e for s in json_body.json()['plays'] for e in s['events']]
+        self.assertEqual([m['eventCount'] for m in frames['meta']['sequences']],
+                         [len(s['events']) for s in json_body.json()['plays']])
+        self.assertEqual(len(frames['offsets']), len(events) + 1)
+        for i in [0, len(events) - 1]:
+            event = events[i]
+            players = event['homePlayers'] + event['awayPlayers']
+            lo, hi = frames['offsets'][i], frames['offsets'][i + 1]
+            self.assertEqual(frames['playerIds'][lo:hi].tolist(), [p['playerId'] for p in players])
+            self.assertEqual(frames['jerseys'][lo:hi].tolist(), [p['jerseyNum'] for p in players])
+            self.assertEqual(frames['sides'][lo:hi].tolist(),
+                             [0] * len(event['homePlayers']) + [1] * len(event['awayPlayers']))
+            np.testing.assert_allclose(frames['playerXY'][lo:hi], [[p['x'], p['y']] for p in players], atol=1e-4)
+            if event['ballPosition']:
+                np.testing.assert_allclose(frames['ball'][i][:2], [event['ballPosition']['x'], event['ballPosition']['y']],
+                                           atol=1e-4)
+
+        goals = decode_frames(self.client.get(f"/api/matches/{self.match.match_id}/goals/", {'format': 'frames'}).content)
+        self.assertEqual(len(goals['meta']['goals']), len(self.match.find_goals()))
+        search = self.client.get('/api/search/sequence/', {
+            'matchId': self.match.match_id, 'sequenceId': json_body.json()['plays'][0]['sequenceId'],
+            'method': 'tfidf', 'topN': 2, 'format': 'frames'})
+        results = decode_frames(search.content)
+        self.assertEqual(len(results['offsets']) - 1, sum(m['eventCount'] for m in results['meta']['results']))
+
+    def test_delta_encoded_snapshots_decode_within_threshold(self):
+        from DSPFinalFIFA.FIFA import snapshot_delta
+
+        url = f"/api/matches/{self.match.match_id}/plays/"
+        full = self.client.get(url)
+        encoded = self.client.get(url, {'encoding': 'delta', 'threshold': 25})
+        self.assertLess(len(encoded.content), len(full.content))
+
+        for original, sequence in zip(full.json()['plays'], encoded.json()['plays']):
+            self.assertEqual(sequence['encoding'], 'delta')
+            decoded = snapshot_delta.decode_sequence(sequence)
+            for before, after in zip(original['events'], decoded['events']):
+                self.assertEqual(after['ballPosition'], before['ballPosition'])
+                for side in ['homePlayers', 'awayPlayers']:
+                    positions = {p['playerId']: (p['x'], p['y']) for p in after[side]}
+                    self.assertEqual(set(positions), {p['playerId'] for p in before[side]})
+                    for p in before[side]:
+                        x, y = positions[p['playerId']]
+                        self.assertLessEqual(max(abs(x - p['x']), abs(y - p['y'])), 0.255)
+
+        # Exact to the centimetre with threshold 0; encoded events are cached per sequence
+        sequence = self.match.plays_table().sequences[0]
+        exact = snapshot_delta.decode_sequence(snapshot_delta.encode_sequence(sequence, 0))
+        for before, after in zip(sequence['events'], exact['events']):
+            self.assertEqual(sorted((p['playerId'], p['x']) for p in after['homePlayers']),
+                             sorted((p['playerId'], round(p['x'], 2)) for p in before['homePlayers']))
+        first = snapshot_delta.encoded_sequence(sequence, self.match.match_id, 5)
+        self.assertIs(snapshot_delta.encoded_sequence(sequence, self.match.match_id, 5)['events'], first['events'])
+
+        self.assertEqual(self.client.get(url, {'encoding': 'zip'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'encoding': 'delta', 'view': 'list'}).status_code, 400)
+
+        # Search results are encoded per request, without filling the plays cache
+        snapshot_delta.clear_cache()
+        search = {'matchId': str(self.match.match_id), 'sequenceId': sequence['sequenceId'],
+                  'method': 'tfidf', 'topN': 3, 'encoding': 'delta'}
+        results = self.client.get('/api/search/sequence/', search).json()['results']
+        self.assertTrue(all(r['encoding'] == 'delta' for r in results))
+        self.assertEqual(snapshot_delta.cache_stats()['entries'], 0)
+        for threshold in [[1], {'cm': 1}, 'near', 2.7, True]:
+            response = self.client.post('/api/search/sequence/', data=json.dumps(dict(search, threshold=threshold)),
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/search/sequence/', data=json.dumps(dict(search, threshold=0)),
+                                    content_type='application/json')
+        self.assertTrue(all(r['threshold'] == 0 for r in response.json()['results']))
+
+    def test_match_summary_counts_match_event_scan(self):
+        from DSPFinalFIFA.FIFA import data_access
+        from DSPFinalFIFA.FIFA.fifa import Match, SETPIECE_LABELS
+
+        match_id = str(self.match.match_id)
+        events = data_access._read_json('Event Data', match_id)
+        home_id = self.match.home_team.team_id
+
+        # Reference: plain loop over the raw events
+        expected = {'shots': 0, 'passes': 0, 'crosses': 0, 'home': 0}
+        outcomes, set_pieces, seen_sequences, goal_keys = {}, {}, set(), set()
+        types = {'SH': 'shots', 'PA': 'passes', 'CR': 'crosses'}
+        for event in events:
+            game, poss = event.get('gameEvents') or {}, event.get('possessionEvents') or {}
+            sequence = event.get('sequence')
+            if sequence is not None and sequence not in seen_sequences:
+                seen_sequences.add(sequence)
+                code = game.get('setpieceType')
+                if code not in (None, 'O'):
+                    label = SETPIECE_LABELS.get(code, code)
+                    set_pieces[label] = set_pieces.get(label, 0) + 1
+            if poss.get('nonEvent'):
+                continue
+            if poss.get('shotOutcomeType') == 'G':
+                goal_keys.add(f"{game.get('startFormattedGameClock')}_{poss.get('shooterPlayerId')}")
+            key = types.get(poss.get('possessionEventType'))
+            if key:
+                expected[key] += 1
+                if key == 'passes':
+                    expected['home'] += str(game.get('teamId')) == str(home_id)
+                    if poss.get('passOutcomeType') is not None:
+                        outcome = str(poss['passOutcomeType'])
+                        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        summary = Match(match_id, use_prebuilt=False).summary()
+        self.assertEqual(summary['goals'], len(goal_keys))
+        self.assertEqual(summary['goals'], self.match.count_goals())
+        for key in ['shots', 'passes', 'crosses']:
+            self.assertEqual(summary[key], expected[key])
+        self.assertEqual(summary['passOutcomes'], outcomes)
+        self.assertEqual(summary['sequences'], len(seen_sequences))
+        self.assertEqual(summary['setPieces'], set_pieces)
+        self.assertEqual(summary['teams']['home']['passes'], expected['home'])
+        self.assertEqual(summary['teams']['home']['goals'] + summary['teams']['away']['goals'], summary['goals'])
+
+        response = self.client.get(f'/api/matches/{match_id}/summary/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'matchId': match_id, 'summary': summary})
+        self.assertEqual(self.client.get('/api/matches/missing/summary/').status_code, 404)
+
 
 class ViewsServiceIntegrationTests(TestCase):
     """Integration tests for MatchService in views.py."""
@@ -256,6 +1110,53 @@ class SearchApiIntegrationTests(TestCase):
                 cls.query_events = events
                 break
 
+    def test_shared_ingest_builds_all_indexes_in_one_pass(self):
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import DTW, TF_IDF, fifa_store, ingest
+        from DSPFinalFIFA.FIFA.fifa import Match, MatchRepository
+
+        TF_IDF.initialize_cache()
+        DTW.ensure_index_initialized()
+        before = (
+            [(e['matchId'], e['sequenceId']) for e in TF_IDF._sequence_index],
+            len(TF_IDF._event_index),
+            [(e['matchId'], e['sequenceId']) for e in DTW._sequence_index]
+        )
+
+        class CountingBuilder(ingest.IndexBuilder):
+            name = 'counting'
+            seen = []
+
+            def add_match(self, match):
+                self.seen.append(match.match_id)
+
+            def finish(self):
+                pass
+
+        ingest.register_index_builder('counting', CountingBuilder)
+        fifa_store.PREBUILT_ENABLED = False
+        try:
+            TF_IDF.reset_cache()
+            DTW.reset_cache()
+            with mock.patch.object(Match, 'plays_table', autospec=True,
+                                   side_effect=Match.plays_table) as plays_table:
+                built = ingest.warm_indexes()
+        finally:
+            ingest._extra_builders.pop('counting')
+            fifa_store.PREBUILT_ENABLED = True
+
+        match_count = len(MatchRepository.get_all_match_ids())
+        self.assertEqual(sorted(built), ['counting', 'dtw', 'tfidf'])
+        self.assertEqual(plays_table.call_count, match_count)
+        self.assertEqual(len(CountingBuilder.seen), match_count)
+
+        after = (
+            [(e['matchId'], e['sequenceId']) for e in TF_IDF._sequence_index],
+            len(TF_IDF._event_index),
+            [(e['matchId'], e['sequenceId']) for e in DTW._sequence_index]
+        )
+        self.assertEqual(after, before)
+
     def test_api_search_event(self):
         payload = {
             'event': self.query_event,
@@ -291,3 +1192,119 @@ class SearchApiIntegrationTests(TestCase):
         data = response.json()
         for key in ['query', 'results', 'count']:
             self.assertIn(key, data)
+
+    def test_api_search_sequence_cascade_reports_stats(self):
+        from unittest import mock
+        from DSPFinalFIFA.FIFA import DTW
+
+        payload = {
+            'events': self.query_events,
+            'matchId': str(self.match.match_id),
+            'sequenceId': self.sequence_id,
+            'method': 'cascade',
+            'candidates': 50,
+            'topN': 3
+        }
+        # Lower bounds are computed for the cascade's candidates only, not the whole index
+        with mock.patch.object(DTW, 'lower_bound_envelope', wraps=DTW.lower_bound_envelope) as envelope:
+            response = self.client.post(
+                '/api/search/sequence/',
+                data=json.dumps(payload),
+                content_type='application/json'
+            )
+        self.assertTrue(envelope.called)
+        self.assertTrue(all(len(call.args[2]) <= 50 for call in envelope.call_args_list))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertLessEqual(len(data['results']), 3)
+        self.assertEqual(data['stats']['mode'], 'cascade')
+        self.assertLessEqual(data['stats']['candidateCount'], 50)
+        for key in ['tfidfMs', 'dtwMs', 'fusionMs', 'totalMs']:
+            self.assertIn(key, data['stats']['timings'])
+
+        for invalid in [{'candidates': '50'}, {'candidates': 2.5}, {'candidates': [50]}, {'topN': -1}]:
+            response = self.client.post(
+                '/api/search/sequence/',
+                data=json.dumps(dict(payload, **invalid)),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_api_search_sequence_by_reference_matches_raw_events(self):
+        reference = {
+            'matchId': str(self.match.match_id),
+            'sequenceId': self.sequence_id,
+            'topN': 5
+        }
+
+        for method in ['dtw', 'tfidf', 'hybrid']:
+            responses = [
+                self.client.post(
+                    '/api/search/sequence/',
+                    data=json.dumps(dict(reference, method=method, **extra)),
+                    content_type='application/json'
+                )
+                for extra in ({'events': self.query_events}, {})
+            ]
+            raw, by_reference = [r.json() for r in responses]
+            self.assertEqual(responses[1].status_code, 200)
+            self.assertEqual(
+                [(r['matchId'], r['sequenceId']) for r in by_reference['results']],
+                [(r['matchId'], r['sequenceId']) for r in raw['results']]
+            )
+            for a, b in zip(by_reference['results'], raw['results']):
+                self.assertAlmostEqual(a['similarity'], b['similarity'], places=3)
+            self.assertEqual(by_reference['query']['eventCount'], len(self.query_events))
+
+        response = self.client.post(
+            '/api/search/sequence/',
+            data=json.dumps({'matchId': 'missing', 'sequenceId': 0}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_precomputed_neighbors_match_live_search(self):
+        import os
+        import tempfile
+        from pathlib import Path
+        from DSPFinalFIFA.FIFA import TF_IDF, neighbors
+        from DSPFinalFIFA.FIFA.fifa import _search_sequences_live
+
+        original = (neighbors.NEIGHBOR_DIR, TF_IDF.HYBRID_INTERNAL_TOP_N)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                neighbors.NEIGHBOR_DIR = Path(tmp)
+                TF_IDF.HYBRID_INTERNAL_TOP_N = 5  # Keeps the build fast
+                manifest = neighbors.build_neighbor_tables(top_k=5, workers=1)
+                self.assertTrue(manifest['complete'])
+
+                # Up-to-date tables are not rebuilt
+                stamp = (Path(tmp) / neighbors.MANIFEST_NAME).stat().st_mtime_ns
+                neighbors.build_neighbor_tables(top_k=5, workers=1)
+                self.assertEqual((Path(tmp) / neighbors.MANIFEST_NAME).stat().st_mtime_ns, stamp)
+
+                match_id = str(self.match.match_id)
+                for method in ['dtw', 'tfidf', 'hybrid']:
+                    response = self.client.post(
+                        '/api/search/sequence/',
+                        data=json.dumps({'matchId': match_id, 'sequenceId': self.sequence_id,
+                                         'method': method, 'topN': 5}),
+                        content_type='application/json'
+                    )
+                    data = response.json()
+                    self.assertEqual(data['source'], 'precomputed')
+
+                    live, _ = _search_sequences_live(method, self.query_events, (match_id, self.sequence_id),
+                                                     match_id, self.sequence_id, 5, None)
+                    self.assertEqual(data['results'], json.loads(json.dumps(live)))
+
+                # A changed data file invalidates the tables
+                with temporary_data_dir() as data_dir:
+                    data_file = next((data_dir / 'Metadata').glob('*.json'))
+                    stat = data_file.stat()
+                    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+                    neighbors.reset_neighbor_tables()
+                    self.assertIsNone(neighbors.lookup_similar_sequences('dtw', match_id, self.sequence_id, 5))
+        finally:
+            neighbors.NEIGHBOR_DIR, TF_IDF.HYBRID_INTERNAL_TOP_N = original
+            neighbors.reset_neighbor_tables()
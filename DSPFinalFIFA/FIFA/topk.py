@@ -0,0 +1,79 @@
+"""
+Top-k selection shared by the DTW and TF-IDF searches
+Keeps only the k best candidates instead of sorting every score
+"""
+import heapq
+import itertools
+from typing import Any, Iterable, List, Tuple
+
+import numpy as np
+
+
+class BoundedHeap:
+    """
+    Keeps the k items with the smallest keys seen so far.
+    Keys are tuples of numbers, e.g. (distance, index) so ties break by index.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[Tuple, int, Any]] = []  # (negated key, counter, item)
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def full(self) -> bool:
+        """True once k items are held."""
+        return len(self._heap) >= self.k
+
+    @property
+    def worst_key(self) -> Tuple:
+        """Largest key currently held (the k-th best once full)."""
+        return tuple(-x for x in self._heap[0][0])
+
+    def push(self, key: Tuple, item: Any = None) -> bool:
+        """Offer an item; returns True if it was kept."""
+        if self.k <= 0:
+            return False
+        entry = (tuple(-x for x in key), next(self._counter), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def items(self) -> List[Tuple[Tuple, Any]]:
+        """Held (key, item) pairs, best first."""
+        pairs = [(tuple(-x for x in neg_key), item) for neg_key, _, item in self._heap]
+        pairs.sort(key=lambda pair: pair[0])
+        return pairs
+
+
+def top_k_indices(scores: np.ndarray, k: int, exclude: Iterable[int] = (),
+                  largest: bool = True) -> np.ndarray:
+    """
+    Indices of the k best scores, best first, skipping excluded positions.
+    Uses np.argpartition instead of a full sort; ties break by lower index.
+    """
+    exclude = set(int(i) for i in exclude)
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    keyed = -np.asarray(scores) if largest else np.asarray(scores)
+    m = min(n, k + len(exclude))
+    if m < n:
+        # Keep everything tied with the m-th best so tie-breaking stays stable
+        cutoff = keyed[np.argpartition(keyed, m - 1)[m - 1]]
+        selected = np.flatnonzero(keyed <= cutoff)
+    else:
+        selected = np.arange(n)
+
+    ordered = selected[np.lexsort((selected, keyed[selected]))]
+    if exclude:
+        ordered = ordered[~np.isin(ordered, list(exclude))]
+    return ordered[:k]
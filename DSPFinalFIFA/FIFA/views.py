@@ -6,10 +6,9 @@ This module provides three key components:
 3. Django Views: HTTP endpoints for web UI and REST API
 
 Architecture:
-- DataLoader handles file I/O and caching
+- DataLoader is a facade over the shared data_access layer (file I/O and caching)
 - MatchService transforms raw JSON into domain models
 - Views orchestrate requests and return HTTP responses"""
-import json
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
@@ -17,6 +16,8 @@ from django.conf import settings
 from django.http import JsonResponse
 from django.shortcuts import render
 
+from . import data_access
+from .lru import ByteBudgetLRU
 from .models import (
     Match, Team, Stadium,
     GoalEvent, GoalSequence, EventFactory
@@ -28,23 +29,19 @@ class DataLoader:
     
     Responsibilities:
     - Load metadata, events, and roster JSON files from disk
-    - Cache loaded data in memory to avoid repeated file I/O
     - Provide unified interface for accessing match data
     
+    File I/O and caching are delegated to the shared data_access layer,
+    so fifa.Match and this loader never parse or hold a file twice.
+    
     Design Pattern: Singleton
-    Only one instance exists per server process, ensuring a single
-    shared cache across all requests.
+    Only one instance exists per server process.
     """
     
     _instance = None  # Singleton instance
-    _cache: Dict[str, Any] = {}  # In-memory cache: {cache_key: data}
     
     def __new__(cls):
-        """Singleton constructor - always returns the same instance.
-        
-        This ensures the cache is shared across all DataLoader usages,
-        preventing memory bloat from multiple caches.
-        """
+        """Singleton constructor - always returns the same instance."""
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
@@ -62,62 +59,29 @@ class DataLoader:
         
         Returns:
             Dict with match metadata or None if file not found
-        
-        Cache Strategy:
-            Uses cache key 'metadata_{match_id}' to avoid reloading
         """
-        cache_key = f"metadata_{match_id}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        filepath = self.data_dir / 'Metadata' / f'{match_id}.json'
-        if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Metadata format: single object wrapped in array
-                result = data[0] if isinstance(data, list) and len(data) > 0 else data
-                self._cache[cache_key] = result
-                return result
-        return None
+        return data_access.load_metadata(match_id)
     
     def load_events(self, match_id: str) -> List[Dict]:
         """Load match events"""
-        cache_key = f"events_{match_id}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        filepath = self.data_dir / 'Event Data' / f'{match_id}.json'
-        if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self._cache[cache_key] = data
-                return data
-        return []
+        return data_access.load_events(match_id).events
     
     def load_roster(self, match_id: str) -> List[Dict]:
         """Load match roster"""
-        cache_key = f"roster_{match_id}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        filepath = self.data_dir / 'Rosters' / f'{match_id}.json'
-        if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self._cache[cache_key] = data
-                return data
-        return []
+        return data_access.load_roster(match_id)
     
     def get_all_match_ids(self) -> List[str]:
         """Get all available match IDs"""
-        metadata_dir = self.data_dir / 'Metadata'
-        if metadata_dir.exists():
-            return [f.stem for f in metadata_dir.glob('*.json')]
-        return []
+        return data_access.get_all_match_ids()
     
     def clear_cache(self):
         """Clear the data cache"""
-        self._cache.clear()
+        data_access.clear_cache()
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """Events/roster cache usage and hit/miss/eviction counters"""
+        return data_access.cache_stats()
 
 
 class MatchService:
@@ -133,6 +97,13 @@ class MatchService:
     - MatchService handles business logic
     - Views orchestrate HTTP requests
     """
+
+    # Built models per match, reused while the data layer returns the same metadata object
+    _models: Dict[str, Any] = {}  # {match_id: (metadata, Match)}
+    # Goal sequences per match, reused while the match's event and roster files are unchanged;
+    # bounded, and holds no reference to the events themselves
+    GOAL_CACHE_BYTES = 32 * 1024 * 1024
+    _goals = ByteBudgetLRU(GOAL_CACHE_BYTES, name='GoalSequences')  # {(match_id, num_preceding): (stamp, [GoalSequence])}
     
     def __init__(self):
         """Initialize with singleton DataLoader instance."""
@@ -162,17 +133,15 @@ class MatchService:
         )
     
     def get_all_matches(self) -> List[Match]:
-        """Get all matches with basic info"""
+        """Get all matches with basic info, sorted by date"""
+        from .match_manifest import get_match_manifest
+
         matches = []
-        match_ids = self.loader.get_all_match_ids()
-        
-        for match_id in match_ids:
+        # The manifest lists match IDs already in date order
+        for match_id in get_match_manifest().match_ids:
             match = self.get_match(match_id)
             if match:
                 matches.append(match)
-        
-        # Sort by date
-        matches.sort(key=lambda m: m.date)
         return matches
     
     def get_match(self, match_id: str) -> Optional[Match]:
@@ -180,6 +149,10 @@ class MatchService:
         metadata = self.loader.load_metadata(match_id)
         if not metadata:
             return None
+
+        cached = self._models.get(match_id)
+        if cached is not None and cached[0] is metadata:
+            return cached[1]
         
         # Build teams
         home_team_data = metadata.get('homeTeam', {})
@@ -212,6 +185,7 @@ class MatchService:
             stadium=stadium
         )
         
+        self._models[match_id] = (metadata, match)
         return match
     
     def get_match_goals(self, match_id: str, num_preceding: int = 5) -> List[GoalSequence]:
@@ -235,6 +209,11 @@ class MatchService:
         if not match:
             return []
         
+        key = (str(match_id), num_preceding)
+        stamp = (data_access.file_stamp('Event Data', str(match_id)), data_access.file_stamp('Rosters', str(match_id)))
+        cached = self._goals.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
         events_data = self.loader.load_events(match_id)
         roster_data = self.loader.load_roster(match_id)
         
@@ -273,6 +252,7 @@ class MatchService:
                     )
                     goals.append(goal_seq)
         
+        self._goals.put(key, (stamp, goals))
         return goals
 
 
@@ -33,6 +33,12 @@ const SETPIECE_ICONS = {
     'Free Kick': '🎯'
 };
 
+// Plays are fetched in pages: a small first page renders immediately
+const PLAYS_FIRST_PAGE = 30;
+const PLAYS_PAGE = 200;
+// Listing needs no player snapshots: they are fetched per sequence when it is opened
+const PLAYS_LIST_QUERY = 'view=list&quantize=cm';
+
 // =============================================================================
 // INHERITANCE: EventVisualizer uses composition with PitchRenderer
 // =============================================================================
@@ -570,7 +576,7 @@ class App {
         this._openGoalsModal();
 
         try {
-            const response = await fetch(`/api/matches/${matchId}/plays/`);
+            const response = await fetch(`/api/matches/${matchId}/plays/?${PLAYS_LIST_QUERY}&limit=${PLAYS_FIRST_PAGE}`);
             const data = await response.json();
 
             this._plays = data.plays || [];
@@ -582,13 +588,14 @@ class App {
             if (this.matchTitle) {
                 this.matchTitle.textContent = `${homeName} vs ${awayName}`;
             }
-            if (this.matchGoalCount) {
-                const totalEvents = this._plays.reduce((sum, seq) => sum + seq.events.length, 0);
-                this.matchGoalCount.textContent = `${this._plays.length} Sequences • ${totalEvents} Events`;
-            }
+            this._updatePlaysCount();
 
             this._renderPlays();
 
+            if (data.nextCursor !== null && data.nextCursor !== undefined) {
+                await this._loadRemainingPlays(matchId, data.nextCursor);
+            }
+
         } catch (error) {
             console.error('Error loading plays:', error);
             if (this.goalsGrid) {
@@ -603,6 +610,35 @@ class App {
         }
     }
 
+    async _loadRemainingPlays(matchId, cursor) {
+        // Later pages are appended while the first one is already on screen
+        while (cursor !== null && cursor !== undefined && this._selectedMatchId === matchId) {
+            const response = await fetch(`/api/matches/${matchId}/plays/?${PLAYS_LIST_QUERY}&limit=${PLAYS_PAGE}&cursor=${cursor}`);
+            const data = await response.json();
+            if (this._selectedMatchId !== matchId) return;
+
+            const playsList = document.getElementById('playsList');
+            const fragment = document.createDocumentFragment();
+            (data.plays || []).forEach(sequence => {
+                fragment.appendChild(this._createSequenceElement(sequence, this._plays.length));
+                this._plays.push(sequence);
+            });
+            if (playsList) {
+                playsList.appendChild(fragment);
+                this._filterPlays(this._activeFilter);
+            }
+            this._updatePlaysCount();
+            cursor = data.nextCursor;
+        }
+    }
+
+    _updatePlaysCount() {
+        if (this.matchGoalCount) {
+            const totalEvents = this._plays.reduce((sum, seq) => sum + seq.events.length, 0);
+            this.matchGoalCount.textContent = `${this._plays.length} Sequences • ${totalEvents} Events`;
+        }
+    }
+
     _openGoalsModal() {
         if (this.goalsModal) {
             this.goalsModal.classList.add('active');
@@ -631,6 +667,7 @@ class App {
             return;
         }
 
+        this._activeFilter = 'all';
         const filterBar = document.createElement('div');
         filterBar.className = 'filter-bar';
         filterBar.innerHTML = `
@@ -697,9 +734,10 @@ class App {
         container._sequence = sequence;
         container.appendChild(header);
 
-        header.addEventListener('click', () => {
+        header.addEventListener('click', async () => {
             if (sequence.events && sequence.events.length > 0) {
-                this._openPitchModal(sequence.events[0], sequence);
+                const detail = await this._loadSequenceDetail(sequence);
+                this._openPitchModal(detail.events[0], detail);
             }
         });
 
@@ -711,6 +749,16 @@ class App {
         return container;
     }
 
+    async _loadSequenceDetail(sequence) {
+        // Full snapshots of a listed sequence, fetched once
+        if (!sequence._detail) {
+            const matchId = this._selectedMatchId;
+            const response = await fetch(`/api/matches/${matchId}/sequences/${sequence.sequenceId}/`);
+            sequence._detail = (await response.json()).sequence;
+        }
+        return sequence._detail;
+    }
+
     _filterPlays(filter) {
         this._activeFilter = filter;
         const playsList = document.getElementById('playsList');
@@ -926,17 +974,22 @@ class App {
         this._showSearchLoading();
 
         try {
-            const response = await fetch('/api/search/sequence/', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    events: this._currentSequence.events,
-                    matchId: this._currentMatch.id,
-                    sequenceId: this._currentSequence.sequenceId,
-                    method: method,
-                    topN: 10
-                })
-            });
+            // Search by reference; send the full events only if the sequence is not indexed
+            const query = {
+                matchId: this._currentMatch.id,
+                sequenceId: this._currentSequence.sequenceId,
+                method: method,
+                topN: 10
+            };
+            // References go as a GET so the browser can revalidate them with the ETag
+            let response = await fetch(`/api/search/sequence/?${new URLSearchParams(query)}`);
+            if (response.status === 404) {
+                response = await fetch('/api/search/sequence/', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ ...query, events: this._currentSequence.events })
+                });
+            }
 
             const data = await response.json();
             this._enterSearchMode('sequence', data.results);